@@ -0,0 +1,32 @@
+"""users.is_admin
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19 18:05:41.204518
+
+"""
+import os
+from typing import Sequence, Union
+from alembic import op
+import sqlalchemy as sa
+
+
+
+revision: str = '0005'
+down_revision: Union[str, None] = '0004'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('is_admin', sa.Boolean(), server_default=sa.false(), nullable=False))
+    # Carry over admins from the old ADMIN_USERNAMES setting, for accounts that already exist
+    usernames = [u.strip() for u in os.getenv("ADMIN_USERNAMES", "").split(",") if u.strip()]
+    if usernames:
+        users = sa.table('users', sa.column('username', sa.String()), sa.column('is_admin', sa.Boolean()))
+        op.execute(users.update().where(users.c.username.in_(usernames)).values(is_admin=True))
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.drop_column('is_admin')
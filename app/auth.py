@@ -1,9 +1,13 @@
 from datetime import datetime, timedelta, timezone
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from app.config import SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.config import (
+    SECRET_KEY, ALGORITHM, ACCESS_TOKEN_EXPIRE_MINUTES,
+    PASSWORD_HASH_ROUNDS, PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING,
+)
+from app.executors import BoundedExecutor, register
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=PASSWORD_HASH_ROUNDS)
 
 
 def hash_password(password: str) -> str:
@@ -14,6 +18,23 @@ def verify_password(plain: str, hashed: str) -> bool:
     return pwd_context.verify(plain, hashed)
 
 
+class PasswordHasher(BoundedExecutor):
+    """Runs bcrypt on a dedicated, bounded thread pool so logins never block the event loop.
+
+    bcrypt releases the GIL, so threads give real parallelism. Work beyond
+    ``max_pending`` outstanding calls is rejected instead of queueing without bound.
+    """
+
+    async def hash(self, password: str) -> str:
+        return await self.run(hash_password, password)
+
+    async def verify(self, plain: str, hashed: str) -> bool:
+        return await self.run(verify_password, plain, hashed)
+
+
+password_hasher = register(PasswordHasher("bcrypt", PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_PENDING))
+
+
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
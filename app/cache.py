@@ -1,12 +1,19 @@
 import json
 import os
+from collections import Counter
 from typing import Optional
 import logging
 
+from app.metrics import cache_requests
+from app.timing import timed
+
 logger = logging.getLogger(__name__)
 
 _redis = None
 
+# Per-key read counts, consumed (and decayed) by the refresh-ahead scheduler
+key_hits: Counter = Counter()
+
 
 async def get_redis():
     global _redis
@@ -26,23 +33,51 @@ async def get_redis():
 
 
 async def cache_get(key: str) -> Optional[str]:
+    key_hits[key] += 1
+    value = None
+    r = await get_redis()
+    if r is not None:
+        try:
+            with timed("cache"):
+                value = await r.get(key)
+        except Exception:
+            pass
+    cache_requests.labels(key.split(":", 1)[0], "miss" if value is None else "hit").inc()
+    return value
+
+
+async def cache_set(key: str, value: str, ttl: int = 60):
+    r = await get_redis()
+    if r is None:
+        return
+    try:
+        with timed("cache"):
+            await r.set(key, value, ex=ttl)
+    except Exception:
+        pass
+
+
+async def cache_ttl(key: str) -> Optional[int]:
+    """Remaining TTL in seconds, or None if the key is missing or Redis is down."""
     r = await get_redis()
     if r is None:
         return None
     try:
-        return await r.get(key)
+        ttl = await r.ttl(key)
     except Exception:
         return None
+    return ttl if ttl >= 0 else None
 
 
-async def cache_set(key: str, value: str, ttl: int = 60):
+async def cache_lock(key: str, ttl: int) -> bool:
+    """Best-effort cross-worker lock; always granted when Redis is unavailable."""
     r = await get_redis()
     if r is None:
-        return
+        return True
     try:
-        await r.set(key, value, ex=ttl)
+        return bool(await r.set(key, "1", ex=ttl, nx=True))
     except Exception:
-        pass
+        return True
 
 
 async def cache_get_json(key: str):
@@ -9,8 +9,25 @@ SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret-key-change-in-production")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "1440"))
 ALGORITHM = "HS256"
 
+# Password hashing (bcrypt cost factor and dedicated pool limits)
+PASSWORD_HASH_ROUNDS = int(os.getenv("PASSWORD_HASH_ROUNDS", "12"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+# Authenticated-user cache (seconds / entries)
+PRINCIPAL_CACHE_TTL = int(os.getenv("PRINCIPAL_CACHE_TTL", "60"))
+PRINCIPAL_CACHE_MAX_SIZE = int(os.getenv("PRINCIPAL_CACHE_MAX_SIZE", "10000"))
+
 # Database
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./data/market_values.db")
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+DB_STATEMENT_CACHE_SIZE = int(os.getenv("DB_STATEMENT_CACHE_SIZE", "256"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
 
 # Redis
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
@@ -81,13 +98,159 @@ TIMEFRAME_PRESETS = {
     "1mo": {"interval": "1mo", "period": "5y"},
 }
 
+# Every interval is resampled from one cached base series per resolution, so
+# switching timeframes doesn't refetch: interval -> (base interval, base period).
+# Longer periods than the base covers are extended from the candle store.
+RESAMPLE_BASE = {
+    "1m": ("1m", "5d"),
+    "5m": ("1m", "5d"),
+    "15m": ("1m", "5d"),
+    "1h": ("1m", "5d"),
+    "1d": ("1d", "5y"),
+    "1wk": ("1d", "5y"),
+    "1mo": ("1d", "5y"),
+}
+
+# Company fundamentals: refetched in bulk once a day at this IST time, after the close
+FUNDAMENTALS_REFRESH_AT = os.getenv("FUNDAMENTALS_REFRESH_AT", "18:00")
+FUNDAMENTALS_CONCURRENCY = int(os.getenv("FUNDAMENTALS_CONCURRENCY", "4"))
+FUNDAMENTALS_MAX_SYMBOLS = 100  # per request
+# Symbols outside the tracked universe: how many records to keep and for how
+# long, and how long a symbol upstream has nothing for is remembered as such
+FUNDAMENTALS_MAX_EXTRA = 256
+FUNDAMENTALS_EXTRA_TTL = 86400
+FUNDAMENTALS_MISS_TTL = 600
+
+# Screener: daily sessions kept per symbol (the longest usable window) and
+# seconds before the universe is rebuilt in the background
+SCREENER_SESSIONS = int(os.getenv("SCREENER_SESSIONS", "300"))
+SCREENER_MAX_AGE = float(os.getenv("SCREENER_MAX_AGE", "300"))
+SCREENER_FETCH_CONCURRENCY = 8
+# Fields other than the common ones kept per universe (each is symbols x sessions floats)
+SCREENER_MAX_FIELDS = int(os.getenv("SCREENER_MAX_FIELDS", "32"))
+
+# Backtests: worker processes for parameter sweeps, chunks allowed in flight,
+# the largest grid and combinations x bars one request may ask for, and
+# requests per user per minute
+BACKTEST_WORKERS = int(os.getenv("BACKTEST_WORKERS", str(min(4, os.cpu_count() or 1))))
+BACKTEST_MAX_PENDING = int(os.getenv("BACKTEST_MAX_PENDING", "16"))
+BACKTEST_MAX_COMBINATIONS = int(os.getenv("BACKTEST_MAX_COMBINATIONS", "5000"))
+BACKTEST_MAX_CELLS = int(os.getenv("BACKTEST_MAX_CELLS", "100000000"))
+BACKTEST_RATE_LIMIT = int(os.getenv("BACKTEST_RATE_LIMIT", "10"))
+
+# Dashboard sparklines: today's session on a fixed grid of SPARKLINE_POINTS
+# closes per symbol, rebuilt every SPARKLINE_REFRESH_INTERVAL seconds
+SPARKLINE_POINTS = int(os.getenv("SPARKLINE_POINTS", "25"))
+SPARKLINE_REFRESH_INTERVAL = float(os.getenv("SPARKLINE_REFRESH_INTERVAL", "60"))
+SPARKLINE_MAX_SYMBOLS = 100  # per request
+
 # Cache TTLs (seconds)
 CACHE_TTL_LIVE = 15
 CACHE_TTL_CANDLES_INTRADAY = 60
 CACHE_TTL_CANDLES_DAILY = 300
-CACHE_TTL_STOCK_INFO = 3600
 CACHE_TTL_SEARCH = 600
 
+# Dedicated thread pools per blocking workload: workers and the most calls
+# allowed in flight (running + queued) before new work is rejected with 503
+EXECUTOR_POOLS = {
+    "market_data": {
+        "workers": int(os.getenv("EXECUTOR_MARKET_DATA_WORKERS", "16")),
+        "max_pending": int(os.getenv("EXECUTOR_MARKET_DATA_MAX_PENDING", "256")),
+    },
+    "ml": {
+        "workers": int(os.getenv("EXECUTOR_ML_WORKERS", "1")),
+        "max_pending": int(os.getenv("EXECUTOR_ML_MAX_PENDING", "4")),
+    },
+    # One thread per live Upstox streamer for its whole lifetime, so no queueing
+    "streams": {
+        "workers": int(os.getenv("EXECUTOR_STREAMS_WORKERS", "32")),
+        "max_pending": int(os.getenv("EXECUTOR_STREAMS_WORKERS", "32")),
+    },
+    "news": {
+        "workers": int(os.getenv("EXECUTOR_NEWS_WORKERS", "2")),
+        "max_pending": int(os.getenv("EXECUTOR_NEWS_MAX_PENDING", "32")),
+    },
+    # NumPy work over whole universes (screener rebuilds)
+    "analytics": {
+        "workers": int(os.getenv("EXECUTOR_ANALYTICS_WORKERS", "2")),
+        "max_pending": int(os.getenv("EXECUTOR_ANALYTICS_MAX_PENDING", "8")),
+    },
+    # Upstox history requests during a backfill; sized to BACKFILL_CONCURRENCY
+    "backfill": {
+        "workers": int(os.getenv("BACKFILL_CONCURRENCY", "8")),
+        "max_pending": int(os.getenv("BACKFILL_CONCURRENCY", "8")),
+    },
+}
+
+# Yahoo Finance access: shared rate limit, retries and circuit breaker
+YAHOO_RATE_LIMIT = float(os.getenv("YAHOO_RATE_LIMIT", "20"))  # requests per second
+YAHOO_BURST = int(os.getenv("YAHOO_BURST", "40"))
+YAHOO_RETRIES = int(os.getenv("YAHOO_RETRIES", "2"))
+YAHOO_BACKOFF_BASE = 0.5
+YAHOO_BACKOFF_MAX = 8.0
+YAHOO_BREAKER_THRESHOLD = int(os.getenv("YAHOO_BREAKER_THRESHOLD", "5"))
+YAHOO_BREAKER_RESET = float(os.getenv("YAHOO_BREAKER_RESET", "30"))
+YAHOO_TIMEOUT = float(os.getenv("YAHOO_TIMEOUT", "10"))
+YAHOO_MAX_CONNECTIONS = int(os.getenv("YAHOO_MAX_CONNECTIONS", "32"))
+YAHOO_BATCH_SIZE = int(os.getenv("YAHOO_BATCH_SIZE", "20"))  # symbols per spark request
+
+# Market-data provider routing. With a hedge delay set, a read that hasn't
+# answered within that many seconds is raced against the next provider.
+MARKET_DATA_HEDGE_DELAY = float(os.getenv("MARKET_DATA_HEDGE_DELAY", "0"))  # 0 disables hedging
+MARKET_DATA_LATENCY_ALPHA = 0.2  # weight of the newest sample in each provider's latency average
+
+# Intraday bars built from streamed Upstox ticks: bar length in seconds per
+# interval, and bars kept per instrument and interval (375 1m bars per session)
+LIVE_CANDLE_INTERVALS = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600}
+LIVE_CANDLE_CAPACITY = int(os.getenv("LIVE_CANDLE_CAPACITY", "512"))
+# (symbol, interval) pairs one /ws/candles connection may follow at once
+LIVE_CANDLE_MAX_SUBSCRIPTIONS = int(os.getenv("LIVE_CANDLE_MAX_SUBSCRIPTIONS", "20"))
+
+# Historical backfill into the candles table through the Upstox history API.
+# Each request may span at most UPSTOX_HISTORY_CHUNK_DAYS for its interval.
+BACKFILL_CONCURRENCY = int(os.getenv("BACKFILL_CONCURRENCY", "8"))
+BACKFILL_RATE_LIMIT = float(os.getenv("BACKFILL_RATE_LIMIT", "10"))  # requests per second
+BACKFILL_RETRIES = int(os.getenv("BACKFILL_RETRIES", "2"))
+# Scheduled incremental backfill with an admin's linked Upstox token: seconds
+# between runs (0 = off), intervals kept current, and days loaded for a
+# symbol with nothing stored yet
+BACKFILL_UPDATE_INTERVAL = float(os.getenv("BACKFILL_UPDATE_INTERVAL", "21600"))
+BACKFILL_UPDATE_INTERVALS = [i for i in os.getenv("BACKFILL_UPDATE_INTERVALS", "1d").split(",") if i]
+BACKFILL_UPDATE_DAYS = int(os.getenv("BACKFILL_UPDATE_DAYS", "365"))
+UPSTOX_HISTORY_CHUNK_DAYS = {"1minute": 30, "30minute": 90, "day": 3650, "week": 3650, "month": 3650}
+CANDLE_STORE_WRITE_BATCH = 5000  # rows per bulk insert
+
+# Durable market-data store (stock_cache table) behind Redis
+STOCK_STORE_ENABLED = os.getenv("STOCK_STORE_ENABLED", "true").lower() == "true"
+STOCK_STORE_MAX_STALE = int(os.getenv("STOCK_STORE_MAX_STALE", str(3 * 24 * 3600)))  # served when upstream fails
+STOCK_STORE_PREFETCH_AGE = int(os.getenv("STOCK_STORE_PREFETCH_AGE", "900"))
+
+# Refresh-ahead: popular keys are re-fetched before they expire
+CACHE_REFRESH_INTERVAL = float(os.getenv("CACHE_REFRESH_INTERVAL", "2"))
+CACHE_REFRESH_AHEAD_RATIO = float(os.getenv("CACHE_REFRESH_AHEAD_RATIO", "0.25"))
+CACHE_REFRESH_HIT_DECAY = 0.9
+CACHE_REFRESH_MIN_SCORE = float(os.getenv("CACHE_REFRESH_MIN_SCORE", "3"))
+CACHE_REFRESH_MAX_KEYS = int(os.getenv("CACHE_REFRESH_MAX_KEYS", "256"))
+CACHE_WARM_KEYS = [
+    k.strip()
+    for k in os.getenv(
+        "CACHE_WARM_KEYS",
+        "market:overview,market:sectors,stocks:live,candles:RELIANCE.NS:5m:5d",
+    ).split(",")
+    if k.strip()
+]
+
+# News ingestion
+NEWS_INGEST_INTERVAL = int(os.getenv("NEWS_INGEST_INTERVAL", "300"))
+NEWS_FETCH_TIMEOUT = 10
+NEWS_RETENTION_DAYS = int(os.getenv("NEWS_RETENTION_DAYS", "7"))
+
+PROFILER_MAX_SECONDS = 300
+
+# Access logging: every error and slow request, plus a sample of the rest
+LOG_REQUEST_SAMPLE_RATE = float(os.getenv("LOG_REQUEST_SAMPLE_RATE", "0.01"))
+LOG_SLOW_REQUEST_MS = float(os.getenv("LOG_SLOW_REQUEST_MS", "1000"))
+
 # Rate limits
 RATE_LIMIT_ANONYMOUS = "30/minute"
 RATE_LIMIT_AUTHENTICATED = "100/minute"
@@ -96,3 +259,5 @@ RATE_LIMIT_AUTHENTICATED = "100/minute"
 UPSTOX_API_KEY = os.getenv("UPSTOX_API_KEY", "")
 UPSTOX_API_SECRET = os.getenv("UPSTOX_API_SECRET", "")
 UPSTOX_REDIRECT_URI = os.getenv("UPSTOX_REDIRECT_URI", "http://localhost:3000/upstox/callback")
+UPSTOX_BREAKER_THRESHOLD = int(os.getenv("UPSTOX_BREAKER_THRESHOLD", "5"))
+UPSTOX_BREAKER_RESET = float(os.getenv("UPSTOX_BREAKER_RESET", "30"))
@@ -1,10 +1,99 @@
-from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
+from sqlalchemy import event, inspect
+from sqlalchemy.engine import URL, Engine, make_url
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
+import logging
 import os
+from time import perf_counter_ns
 
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///./data/market_values.db")
+from app.timing import record_timing
+from app.config import (
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+    DB_POOL_PRE_PING,
+    DB_STATEMENT_CACHE_SIZE,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_SYNCHRONOUS,
+)
 
-engine = create_async_engine(DATABASE_URL, echo=False)
+logger = logging.getLogger(__name__)
+
+
+def _is_sqlite_memory(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def engine_options(database_url: str) -> tuple[URL, dict]:
+    """Backend-specific URL and keyword arguments for ``create_async_engine``."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    options = {"echo": False, "pool_pre_ping": DB_POOL_PRE_PING}
+
+    # In-memory SQLite runs on a StaticPool, which takes no sizing arguments
+    if not _is_sqlite_memory(url):
+        options.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+        )
+
+    if backend == "sqlite":
+        options["connect_args"] = {
+            "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000,
+            "cached_statements": DB_STATEMENT_CACHE_SIZE,
+        }
+    elif backend == "postgresql":
+        # asyncpg's server-side prepared statement cache, plus SQLAlchemy's
+        # dialect-level cache of prepared statement handles
+        options["connect_args"] = {"statement_cache_size": DB_STATEMENT_CACHE_SIZE}
+        if "prepared_statement_cache_size" not in url.query:
+            url = url.update_query_dict({"prepared_statement_cache_size": str(DB_STATEMENT_CACHE_SIZE)})
+
+    return url, options
+
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers proceed while a writer holds the lock; NORMAL sync is safe under WAL
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.close()
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_query_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(perf_counter_ns())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query_time(conn, cursor, statement, parameters, context, executemany):
+    record_timing("db", perf_counter_ns() - conn.info["query_start"].pop())
+
+
+@event.listens_for(Engine, "handle_error")
+def _drop_query_timer(context):
+    # after_cursor_execute never runs for a statement that raised; without this
+    # the start times pile up on the pooled connection
+    if context.execution_context is not None and context.connection is not None:
+        starts = context.connection.info.get("query_start")
+        if starts:
+            starts.pop()
+
+
+def create_engine(database_url: str) -> AsyncEngine:
+    url, options = engine_options(database_url)
+    engine = create_async_engine(url, **options)
+    if url.get_backend_name() == "sqlite" and not _is_sqlite_memory(url):
+        event.listen(engine.sync_engine, "connect", _apply_sqlite_pragmas)
+    return engine
+
+
+engine = create_engine(DATABASE_URL)
 async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
 
 
@@ -18,6 +107,24 @@ async def get_db():
 
 
 async def init_db():
-    os.makedirs("data", exist_ok=True)
+    url = make_url(DATABASE_URL)
+    if url.get_backend_name() == "sqlite" and not _is_sqlite_memory(url):
+        os.makedirs(os.path.dirname(os.path.abspath(url.database)), exist_ok=True)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        missing = await conn.run_sync(_missing_columns)
+    if missing:
+        # create_all never adds columns to existing tables; queries on them would fail on every request
+        raise RuntimeError(
+            f"Database schema is behind the models (missing {', '.join(missing)}); run `alembic upgrade head`"
+        )
+
+
+def _missing_columns(conn) -> list[str]:
+    inspector = inspect(conn)
+    return [
+        f"{table.name}.{column.name}"
+        for table in Base.metadata.sorted_tables
+        for column in table.columns
+        if column.name not in {c["name"] for c in inspector.get_columns(table.name)}
+    ]
@@ -1,3 +1,6 @@
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -6,10 +9,56 @@ from typing import Optional
 
 from app.database import get_db
 from app.auth import decode_access_token
-from app.models import User
+from app.config import PRINCIPAL_CACHE_TTL, PRINCIPAL_CACHE_MAX_SIZE
+from app.models import User, UpstoxToken
 
 security = HTTPBearer(auto_error=False)
 
+_NOT_LOADED = object()
+
+
+@dataclass
+class _Principal:
+    user: User
+    expires_at: float
+    upstox_token: object = _NOT_LOADED  # str, None (not linked) or _NOT_LOADED
+
+
+class PrincipalCache:
+    """Short-lived LRU of authenticated users (and their Upstox token) keyed by user id."""
+
+    def __init__(self, ttl: float, max_size: int):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._entries: OrderedDict[int, _Principal] = OrderedDict()
+
+    def get(self, user_id: int) -> Optional[_Principal]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            del self._entries[user_id]
+            return None
+        self._entries.move_to_end(user_id)
+        return entry
+
+    def put(self, user: User) -> _Principal:
+        entry = _Principal(user=user, expires_at=time.monotonic() + self.ttl)
+        self._entries[user.id] = entry
+        self._entries.move_to_end(user.id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, user_id: int):
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+
+principal_cache = PrincipalCache(PRINCIPAL_CACHE_TTL, PRINCIPAL_CACHE_MAX_SIZE)
+
 
 async def get_current_user(
     credentials: Optional[HTTPAuthorizationCredentials] = Depends(security),
@@ -26,11 +75,16 @@ async def get_current_user(
     if user_id is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
 
+    cached = principal_cache.get(int(user_id))
+    if cached is not None:
+        return cached.user
+
     result = await db.execute(select(User).where(User.id == int(user_id)))
     user = result.scalar_one_or_none()
     if user is None:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found")
 
+    principal_cache.put(user)
     return user
 
 
@@ -44,3 +98,49 @@ async def get_optional_user(
         return await get_current_user(credentials, db)
     except HTTPException:
         return None
+
+
+async def get_admin_user(user: User = Depends(get_current_user)) -> User:
+    if not user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin access required")
+    return user
+
+
+class UserRateLimit:
+    """Dependency that lets each user make ``limit`` calls per ``window`` seconds (per worker)."""
+
+    def __init__(self, limit: int, window: float = 60):
+        self.limit = limit
+        self.window = window
+        self._calls: dict[int, deque] = {}
+
+    async def __call__(self, user: User = Depends(get_current_user)) -> User:
+        now = time.monotonic()
+        calls = self._calls.setdefault(user.id, deque())
+        while calls and calls[0] <= now - self.window:
+            calls.popleft()
+        if len(calls) >= self.limit:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail=f"At most {self.limit} requests per {self.window:g} seconds",
+                headers={"Retry-After": str(int(calls[0] + self.window - now) + 1)},
+            )
+        calls.append(now)
+        # Forget users who have gone quiet so the table stays small
+        if len(self._calls) > 1024:
+            self._calls = {uid: c for uid, c in self._calls.items() if c and c[-1] > now - self.window}
+        return user
+
+
+async def get_cached_upstox_token(db: AsyncSession, user_id: int) -> Optional[str]:
+    entry = principal_cache.get(user_id)
+    if entry is not None and entry.upstox_token is not _NOT_LOADED:
+        return entry.upstox_token
+
+    result = await db.execute(
+        select(UpstoxToken.access_token).where(UpstoxToken.user_id == user_id)
+    )
+    token = result.scalar_one_or_none()
+    if entry is not None:
+        entry.upstox_token = token
+    return token
@@ -18,5 +18,25 @@ class InvalidInterval(AppException):
         super().__init__(400, f"Invalid interval: {interval}")
 
 
+class InvalidScreen(AppException):
+    def __init__(self, detail: str):
+        super().__init__(400, f"Invalid screen: {detail}")
+
+
+class InvalidBacktest(AppException):
+    def __init__(self, detail: str):
+        super().__init__(400, f"Invalid backtest: {detail}")
+
+
+class ServiceBusy(AppException):
+    def __init__(self, detail: str):
+        super().__init__(503, detail)
+
+
+class UpstreamUnavailable(AppException):
+    def __init__(self, upstream: str):
+        super().__init__(503, f"{upstream} is temporarily unavailable")
+
+
 async def app_exception_handler(request: Request, exc: AppException):
     return JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import multiprocessing
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Optional
+
+from app.config import EXECUTOR_POOLS
+from app.exceptions import ServiceBusy
+from app.metrics import register_collector
+
+logger = logging.getLogger(__name__)
+
+
+class BoundedExecutor:
+    """Named thread pool that tracks its own load and rejects work past ``max_pending``.
+
+    Each blocking workload gets its own pool so a burst in one (model training,
+    a stuck upstream) can only exhaust its own threads.
+    """
+
+    def __init__(self, name: str, workers: int, max_pending: int):
+        self.name = name
+        self.workers = workers
+        self.max_pending = max_pending
+        self.pending = 0
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[Executor] = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.name)
+        return self._executor
+
+    def _tracked(self, fn, *args):
+        with self._lock:
+            self.active += 1
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self.active -= 1
+
+    def _done(self, _future):
+        self.pending -= 1
+        self.completed += 1
+
+    def submit(self, fn, *args) -> asyncio.Future:
+        """Schedule ``fn(*args)``; raises ServiceBusy right away if the pool is saturated."""
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            logger.warning(f"Executor {self.name} full ({self.pending} pending)")
+            raise ServiceBusy(f"{self.name} workers are busy, please retry")
+        self.pending += 1
+        future = self._dispatch(asyncio.get_running_loop(), fn, *args)
+        future.add_done_callback(self._done)
+        return future
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop, fn, *args) -> asyncio.Future:
+        return loop.run_in_executor(self._get_executor(), self._tracked, fn, *args)
+
+    async def run(self, fn, *args):
+        return await self.submit(fn, *args)
+
+    def stats(self) -> dict:
+        return {
+            "workers": self.workers,
+            "active": self.active,
+            "queued": max(0, self.pending - self.active),
+            "utilization": round(self.active / self.workers, 3),
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+    def start(self):
+        self._get_executor()
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+class BoundedProcessExecutor(BoundedExecutor):
+    """The same bounds over a process pool, for pure-Python CPU work that would hold the GIL.
+
+    ``fn`` and its arguments are pickled to the worker, so ``fn`` must be a
+    module-level function. Workers are spawned, not forked, so they don't
+    inherit the event loop or open connections.
+    """
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers, mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    def _dispatch(self, loop: asyncio.AbstractEventLoop, fn, *args) -> asyncio.Future:
+        # A worker process can't report back when it starts a call, so count
+        # every call in flight as running until the pool is full
+        self.active = min(self.pending, self.workers)
+        return loop.run_in_executor(self._get_executor(), fn, *args)
+
+    def _done(self, future):
+        super()._done(future)
+        self.active = min(self.pending, self.workers)
+
+
+executors: dict[str, BoundedExecutor] = {
+    name: BoundedExecutor(name, **sizes) for name, sizes in EXECUTOR_POOLS.items()
+}
+
+
+def register(pool: BoundedExecutor) -> BoundedExecutor:
+    """Add a pool defined elsewhere (e.g. the bcrypt hasher) to stats and lifespan handling."""
+    executors[pool.name] = pool
+    return pool
+
+
+async def run_in(pool: str, fn, *args):
+    return await executors[pool].run(fn, *args)
+
+
+def executor_stats() -> dict:
+    return {name: pool.stats() for name, pool in executors.items()}
+
+
+def start_executors():
+    for pool in executors.values():
+        pool.start()
+    logger.info(f"Executors started: {', '.join(f'{n}={p.workers}' for n, p in executors.items())}")
+
+
+def shutdown_executors():
+    for pool in executors.values():
+        pool.shutdown()
+
+
+@register_collector
+def _executor_samples():
+    for name, pool in executors.items():
+        stats = pool.stats()
+        labels = {"pool": name}
+        yield "executor_workers", "gauge", "Thread pool size", labels, stats["workers"]
+        yield "executor_active", "gauge", "Calls currently running", labels, stats["active"]
+        yield "executor_queued", "gauge", "Calls waiting for a thread", labels, stats["queued"]
+        yield "executor_completed_total", "counter", "Calls finished", labels, stats["completed"]
+        yield "executor_rejected_total", "counter", "Calls rejected because the pool was full", labels, stats["rejected"]
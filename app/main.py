@@ -1,18 +1,33 @@
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import asyncio
 import logging
+import time
 
 from app.database import init_db, async_session
 from app.logging_config import setup_logging
-from app.middleware import RequestLoggingMiddleware
+from app.middleware import RequestTimingMiddleware
 from app.exceptions import AppException, app_exception_handler
-from app.config import STOCK_CODES
+from app.config import INDEX_SYMBOLS, STOCK_CODES, LIVE_CANDLE_INTERVALS, LIVE_CANDLE_MAX_SUBSCRIPTIONS
 from app.services.stocks import fetch_all_stocks
 from app.services.alerts import check_alerts
-
-from app.routers import auth, stocks, watchlists, portfolio, alerts, news, market, preferences, upstox, prediction
+from app.services.refresh import refresh_scheduler
+from app.services.news import news_ingester
+from app.services.sparklines import sparkline_snapshot
+from app.services.fundamentals import fundamentals
+from app.services.backfill import backfill
+from app.services.stock_store import prefetch as prefetch_stock_store
+from app.services.symbols import SYMBOL_MASTER
+from app.services.providers import market_data
+from app.services.ticks import tick_aggregator
+from app.services.yahoo import yahoo_client
+from app.executors import start_executors, shutdown_executors, executor_stats
+from app.profiling import profiler
+from app.metrics import render as render_metrics, websocket_clients, websocket_send_lag
+
+from app.routers import auth, stocks, watchlists, portfolio, alerts, news, market, preferences, upstox, prediction, admin, backtest
 
 setup_logging()
 logger = logging.getLogger(__name__)
@@ -21,10 +36,25 @@ logger = logging.getLogger(__name__)
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     logger.info("Starting Market Values API")
+    start_executors()
     await init_db()
     logger.info("Database initialized")
+    await prefetch_stock_store()
+    refresh_scheduler.start()
+    news_ingester.start()
+    sparkline_snapshot.start()
+    fundamentals.start()
+    backfill.start_updates()
     yield
     logger.info("Shutting down Market Values API")
+    await refresh_scheduler.stop()
+    await news_ingester.stop()
+    await sparkline_snapshot.stop()
+    await fundamentals.stop()
+    await backfill.stop_updates()
+    await yahoo_client.close()
+    profiler.stop()
+    shutdown_executors()
 
 
 app = FastAPI(title="Indian Market Live API", lifespan=lifespan)
@@ -37,7 +67,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-app.add_middleware(RequestLoggingMiddleware)
+app.add_middleware(RequestTimingMiddleware)
 
 # Exception handlers
 app.add_exception_handler(AppException, app_exception_handler)
@@ -65,6 +95,8 @@ app.include_router(market.router)
 app.include_router(preferences.router)
 app.include_router(upstox.router)
 app.include_router(prediction.router)
+app.include_router(admin.router)
+app.include_router(backtest.router)
 
 
 @app.get("/")
@@ -72,6 +104,16 @@ def root():
     return {"message": "Stock Market API Running"}
 
 
+@app.get("/health")
+def health():
+    return {"status": "ok", "executors": executor_stats(), "providers": market_data.stats()}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
 # Legacy endpoints for backward compatibility
 @app.get("/stocks")
 async def get_stocks_legacy():
@@ -89,9 +131,11 @@ async def get_candles_legacy(symbol: str):
 @app.websocket("/ws/stocks")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
+    websocket_clients.labels("stocks").inc()
     try:
         while True:
             data = await fetch_all_stocks(STOCK_CODES)
+            ready = time.perf_counter()
             price_map = {s["symbol"]: s["current_price"] for s in data}
 
             # Check alerts
@@ -106,6 +150,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 "type": "prices",
                 "data": data,
             })
+            websocket_send_lag.labels("stocks").observe(time.perf_counter() - ready)
 
             for alert in triggered_alerts:
                 await websocket.send_json({
@@ -118,17 +163,75 @@ async def websocket_endpoint(websocket: WebSocket):
         logger.debug("Client disconnected")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
+    finally:
+        websocket_clients.labels("stocks").dec()
+
+
+# Symbols /ws/candles accepts subscriptions for
+LIVE_CANDLE_SYMBOLS = frozenset(INDEX_SYMBOLS + STOCK_CODES + list(SYMBOL_MASTER))
+
+
+@app.websocket("/ws/candles")
+async def candles_websocket_endpoint(websocket: WebSocket):
+    """Pushes live bar updates built from the Upstox tick feed.
+
+    Clients send ``{"type": "subscribe", "symbol": "RELIANCE.NS", "interval": "5m"}``
+    (or ``"unsubscribe"``) and receive ``{"type": "bar", ...}`` whenever that bar changes.
+    Symbols outside the tracked universe, and subscriptions beyond
+    ``LIVE_CANDLE_MAX_SUBSCRIPTIONS`` per connection, get an error instead.
+    """
+    await websocket.accept()
+    websocket_clients.labels("candles").inc()
+    listener = tick_aggregator.listen()
+
+    async def receive_subscriptions():
+        while True:
+            msg = await websocket.receive_json()
+            key = (msg.get("symbol"), msg.get("interval"))
+            if key[1] not in LIVE_CANDLE_INTERVALS:
+                await websocket.send_json({"type": "error", "message": f"Invalid interval: {key[1]}"})
+            elif msg.get("type") == "subscribe":
+                if key[0] not in LIVE_CANDLE_SYMBOLS:
+                    await websocket.send_json({"type": "error", "message": f"Unknown symbol: {key[0]}"})
+                elif key not in listener.keys and len(listener.keys) >= LIVE_CANDLE_MAX_SUBSCRIPTIONS:
+                    await websocket.send_json({
+                        "type": "error",
+                        "message": f"At most {LIVE_CANDLE_MAX_SUBSCRIPTIONS} subscriptions per connection",
+                    })
+                else:
+                    listener.keys.add(key)
+            elif msg.get("type") == "unsubscribe":
+                listener.keys.discard(key)
+
+    receiver = asyncio.create_task(receive_subscriptions())
+    try:
+        while True:
+            getter = asyncio.create_task(listener.get())
+            done, _ = await asyncio.wait({getter, receiver}, return_when=asyncio.FIRST_COMPLETED)
+            if receiver in done:
+                getter.cancel()
+                receiver.result()  # re-raises the disconnect
+            for (symbol, interval), bar in getter.result().items():
+                await websocket.send_json({"type": "bar", "symbol": symbol, "interval": interval, "data": bar})
+    except WebSocketDisconnect:
+        logger.debug("Candle WebSocket client disconnected")
+    except Exception as e:
+        logger.error(f"Candle WebSocket error: {e}")
+    finally:
+        receiver.cancel()
+        tick_aggregator.unlisten(listener)
+        websocket_clients.labels("candles").dec()
 
 
 @app.websocket("/ws/upstox")
 async def upstox_websocket_endpoint(websocket: WebSocket):
     await websocket.accept()
+    websocket_clients.labels("upstox").inc()
     user_id = None
     try:
         from app.services.upstox_ws import streamer_manager
         from app.auth import decode_access_token
-        from sqlalchemy import select
-        from app.models import UpstoxToken
+        from app.dependencies import get_cached_upstox_token
 
         # Wait for auth message from client
         auth_msg = await asyncio.wait_for(websocket.receive_json(), timeout=10)
@@ -147,17 +250,14 @@ async def upstox_websocket_endpoint(websocket: WebSocket):
         user_id = int(payload.get("sub", 0))
 
         async with async_session() as db:
-            result = await db.execute(
-                select(UpstoxToken).where(UpstoxToken.user_id == user_id)
-            )
-            upstox_token = result.scalar_one_or_none()
+            upstox_token = await get_cached_upstox_token(db, user_id)
 
         if not upstox_token:
             await websocket.send_json({"type": "error", "message": "Upstox not linked"})
             await websocket.close()
             return
 
-        await streamer_manager.connect_user(user_id, upstox_token.access_token, websocket)
+        await streamer_manager.connect_user(user_id, upstox_token, websocket)
         await websocket.send_json({"type": "connected", "message": "Upstox stream connected"})
 
         # Handle incoming messages (subscribe/unsubscribe)
@@ -173,6 +273,7 @@ async def upstox_websocket_endpoint(websocket: WebSocket):
     except Exception as e:
         logger.error(f"Upstox WebSocket error: {e}")
     finally:
+        websocket_clients.labels("upstox").dec()
         if user_id is not None:
             from app.services.upstox_ws import streamer_manager
             await streamer_manager.disconnect_user(user_id, websocket)
@@ -0,0 +1,207 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Iterable
+
+# Minimal Prometheus-compatible metrics: label children are created once and
+# cached, so the hot path is a dict lookup plus an uncontended lock. Rendered
+# in the text exposition format at /metrics.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_registry: list = []
+_collectors: list[Callable[[], Iterable[tuple[str, str, str, dict, float]]]] = []
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.label_names = tuple(labels)
+        self._children: dict = {}
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def labels(self, *values):
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        lines.extend(self._samples())
+        return "\n".join(lines)
+
+
+class _Value:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = value
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1):
+        self.labels().inc(amount)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_format_labels(self.label_names, values)} {_format_value(child.value)}"
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def dec(self, amount: float = 1):
+        self.labels().dec(amount)
+
+    def set(self, value: float):
+        self.labels().set(value)
+
+
+class _HistogramChild:
+    __slots__ = ("bounds", "counts", "sum", "_lock")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        i = bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help: str, labels: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, help, labels)
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def time(self):
+        return self.labels().time()
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), child.counts):
+                cumulative += count
+                le = f'le="{_format_value(bound)}"'
+                yield f"{self.name}_bucket{_format_labels(self.label_names, values, le)} {cumulative}"
+            labels = _format_labels(self.label_names, values)
+            yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+def register_collector(fn: Callable[[], Iterable[tuple[str, str, str, dict, float]]]):
+    """Add a callback sampled at scrape time, yielding (name, type, help, labels, value)."""
+    _collectors.append(fn)
+    return fn
+
+
+def render() -> str:
+    parts = [metric.render() for metric in _registry]
+    # Samples of one metric must be contiguous, whatever order collectors yield them in
+    families: dict[str, list[str]] = {}
+    for collector in _collectors:
+        for name, type_, help_, labels, value in collector():
+            lines = families.setdefault(name, [f"# HELP {name} {help_}", f"# TYPE {name} {type_}"])
+            lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {_format_value(value)}")
+    parts.extend("\n".join(lines) for lines in families.values())
+    return "\n".join(parts) + "\n"
+
+
+# Application metrics
+
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template", ("method", "route", "status"),
+)
+upstream_request_duration = Histogram(
+    "upstream_request_duration_seconds", "Latency of calls to external data sources", ("upstream", "outcome"),
+)
+provider_requests = Counter(
+    "market_data_provider_requests_total", "Market-data reads by provider, operation and outcome",
+    ("provider", "operation", "outcome"),
+)
+provider_hedges = Counter(
+    "market_data_hedges_total", "Reads raced against a backup provider after the hedge delay", ("operation",),
+)
+cache_requests = Counter(
+    "cache_requests_total", "Redis cache lookups by key family", ("family", "result"),
+)
+model_training_duration = Histogram(
+    "model_training_duration_seconds", "LSTM training time per symbol",
+    buckets=(1, 5, 10, 30, 60, 120, 300, 600),
+)
+alert_evaluation_duration = Histogram(
+    "alert_evaluation_duration_seconds", "Time to evaluate active alerts against a price snapshot",
+)
+websocket_clients = Gauge(
+    "websocket_clients", "Connected WebSocket clients", ("endpoint",),
+)
+websocket_send_lag = Histogram(
+    "websocket_send_lag_seconds", "Time from a price snapshot being ready to it being sent", ("endpoint",),
+)
@@ -1,15 +1,71 @@
 import logging
-import time
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
+import random
+from time import perf_counter_ns
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.config import LOG_REQUEST_SAMPLE_RATE, LOG_SLOW_REQUEST_MS
+from app.metrics import http_request_duration
+from app.timing import start_request, end_request, server_timing
 
 logger = logging.getLogger(__name__)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start = time.time()
-        response = await call_next(request)
-        duration = round((time.time() - start) * 1000, 1)
-        logger.info(f"{request.method} {request.url.path} {response.status_code} {duration}ms")
-        return response
+class RequestTimingMiddleware:
+    """Pure ASGI request timing: metrics, a ``Server-Timing`` header and sampled access logs.
+
+    Unlike ``BaseHTTPMiddleware`` this wraps ``send`` directly, so it adds no
+    extra task per request and streaming responses keep their backpressure.
+    Errors and requests slower than ``LOG_SLOW_REQUEST_MS`` are always logged;
+    other requests at ``LOG_REQUEST_SAMPLE_RATE``.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter_ns()
+        timings, token = start_request()
+        status = 500
+
+        async def send_with_timing(message: Message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append("Server-Timing", server_timing(timings, perf_counter_ns() - start))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            end_request(token)
+            elapsed_ns = perf_counter_ns() - start
+            # Label by route template so /api/stocks/{symbol} stays one series
+            route = scope.get("route")
+            route_path = getattr(route, "path", "unmatched")
+            http_request_duration.labels(scope["method"], route_path, str(status)).observe(elapsed_ns / 1e9)
+            self._log(scope, route_path, status, elapsed_ns, timings)
+
+    @staticmethod
+    def _log(scope: Scope, route_path: str, status: int, elapsed_ns: int, timings: dict):
+        elapsed_ms = elapsed_ns / 1e6
+        if status >= 500 or elapsed_ms >= LOG_SLOW_REQUEST_MS:
+            level = logging.WARNING
+        elif random.random() < LOG_REQUEST_SAMPLE_RATE:
+            level = logging.INFO
+        else:
+            return
+        if not logger.isEnabledFor(level):
+            return
+        breakdown = " ".join(f"{name}={ns / 1e6:.1f}ms" for name, ns in timings.items())
+        logger.log(
+            level,
+            f"{scope['method']} {scope['path']} route={route_path} status={status} "
+            f"duration={elapsed_ms:.1f}ms {breakdown}".rstrip(),
+        )
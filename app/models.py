@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import BigInteger, Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Index, false
 from sqlalchemy.orm import relationship
 from datetime import datetime, timezone
 from app.database import Base
@@ -12,7 +12,9 @@ class User(Base):
     username = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    # Granted by hand in the database, never through the API
+    is_admin = Column(Boolean, default=False, server_default=false(), nullable=False)
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     watchlists = relationship("Watchlist", back_populates="user", cascade="all, delete-orphan")
     portfolio_entries = relationship("PortfolioEntry", back_populates="user", cascade="all, delete-orphan")
@@ -25,9 +27,9 @@ class Watchlist(Base):
     __tablename__ = "watchlists"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
     name = Column(String, nullable=False)
-    created_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    created_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     user = relationship("User", back_populates="watchlists")
     items = relationship("WatchlistItem", back_populates="watchlist", cascade="all, delete-orphan")
@@ -37,9 +39,9 @@ class WatchlistItem(Base):
     __tablename__ = "watchlist_items"
 
     id = Column(Integer, primary_key=True, index=True)
-    watchlist_id = Column(Integer, ForeignKey("watchlists.id"), nullable=False)
+    watchlist_id = Column(Integer, ForeignKey("watchlists.id"), index=True, nullable=False)
     symbol = Column(String, nullable=False)
-    added_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    added_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     watchlist = relationship("Watchlist", back_populates="items")
 
@@ -48,7 +50,7 @@ class PortfolioEntry(Base):
     __tablename__ = "portfolio_entries"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
     symbol = Column(String, nullable=False)
     buy_price = Column(Float, nullable=False)
     quantity = Column(Integer, nullable=False)
@@ -60,14 +62,16 @@ class PortfolioEntry(Base):
 
 class Alert(Base):
     __tablename__ = "alerts"
+    # The price checker scans active alerts for the symbols it has quotes for
+    __table_args__ = (Index("ix_alerts_active_symbol", "is_active", "symbol"),)
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), index=True, nullable=False)
     symbol = Column(String, nullable=False)
     condition = Column(String, nullable=False)  # "above" or "below"
     target_price = Column(Float, nullable=False)
     is_active = Column(Boolean, default=True)
-    triggered_at = Column(DateTime, nullable=True)
+    triggered_at = Column(DateTime(timezone=True), nullable=True)
 
     user = relationship("User", back_populates="alerts")
 
@@ -90,16 +94,62 @@ class UpstoxToken(Base):
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), unique=True, nullable=False)
     access_token = Column(String, nullable=False)
-    token_date = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    token_date = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
     user = relationship("User", back_populates="upstox_token")
 
 
 class StockCache(Base):
+    """Durable copy of fetched market data, one row per (symbol, series)."""
+
     __tablename__ = "stock_cache"
+    __table_args__ = (Index("ix_stock_cache_symbol_interval", "symbol", "interval", unique=True),)
 
     id = Column(Integer, primary_key=True, index=True)
-    symbol = Column(String, index=True, nullable=False)
+    symbol = Column(String, nullable=False)
     data_json = Column(Text, nullable=False)
-    interval = Column(String, nullable=True)
-    fetched_at = Column(DateTime, default=lambda: datetime.now(timezone.utc))
+    interval = Column(String, nullable=False)  # "quote", "info", "candles:<interval>:<period>", "prediction:<days>"
+    fetched_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+
+class Candle(Base):
+    """One stored OHLCV bar. Bars are keyed by what they are, so re-fetched ranges overwrite in place."""
+
+    __tablename__ = "candles"
+
+    symbol = Column(String, primary_key=True)
+    interval = Column(String, primary_key=True)  # "1m", "1d", ...
+    ts = Column(BigInteger, primary_key=True)  # bar start, unix seconds
+    open = Column(Float, nullable=False)
+    high = Column(Float, nullable=False)
+    low = Column(Float, nullable=False)
+    close = Column(Float, nullable=False)
+    volume = Column(BigInteger, nullable=False, default=0)
+
+
+class NewsArticle(Base):
+    __tablename__ = "news_articles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    guid = Column(String, unique=True, index=True, nullable=False)
+    title = Column(String, nullable=False)
+    link = Column(String, nullable=False)
+    summary = Column(Text, default="")
+    source = Column(String, nullable=False)
+    published = Column(String, default="")  # raw feed timestamp, returned as-is
+    published_at = Column(DateTime(timezone=True), index=True, nullable=False)
+    fetched_at = Column(DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
+
+    symbols = relationship("NewsArticleSymbol", back_populates="article", cascade="all, delete-orphan")
+
+
+class NewsArticleSymbol(Base):
+    """Inverted index: one row per (symbol, article) mention, built at ingestion."""
+
+    __tablename__ = "news_article_symbols"
+    __table_args__ = (Index("ix_news_article_symbols_symbol_article", "symbol", "article_id"),)
+
+    article_id = Column(Integer, ForeignKey("news_articles.id", ondelete="CASCADE"), primary_key=True)
+    symbol = Column(String, primary_key=True)
+
+    article = relationship("NewsArticle", back_populates="symbols")
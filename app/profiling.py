@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# On-demand profiling for a live worker. Nothing here runs until an admin starts
+# a session: the sampler thread and the task-timing factory exist only for its
+# duration, so leaving this compiled in costs nothing.
+
+
+def _frame_label(code) -> str:
+    path = code.co_filename
+    short = os.path.join(os.path.basename(os.path.dirname(path)), os.path.basename(path))
+    return f"{code.co_name} ({short}:{code.co_firstlineno})"
+
+
+def _coroutine_name(coro) -> str:
+    return getattr(coro, "__qualname__", type(coro).__name__)
+
+
+class SamplingProfiler:
+    """Samples every thread's stack at a fixed interval and aggregates folded stacks.
+
+    Alongside the samples, the event loop's task factory is swapped for one that
+    records each task's wall time by coroutine, so time spent awaiting (which a
+    stack sampler can't see) is accounted for too.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._previous_factory = None
+        self.stacks: Counter = Counter()
+        self.coroutines: dict[str, list[float]] = {}  # name -> [count, total_s, max_s]
+        self.samples = 0
+        self.started_at: Optional[datetime] = None
+        self.seconds = 0.0
+        self.interval = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float, interval: float) -> bool:
+        """Start a session on the running loop; returns False if one is already active."""
+        with self._lock:
+            if self.running:
+                return False
+            self.stacks = Counter()
+            self.coroutines = {}
+            self.samples = 0
+            self.started_at = datetime.now(timezone.utc)
+            self.seconds = seconds
+            self.interval = interval
+            self._stop.clear()
+            self._loop = asyncio.get_running_loop()
+            self._install_task_factory()
+            self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+            self._thread.start()
+        logger.info(f"Profiler started for {seconds}s at {interval * 1000:.1f}ms intervals")
+        return True
+
+    def stop(self):
+        """Stop the session and wait for the sampler; blocking, so call it off the event loop."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        deadline = time.monotonic() + self.seconds
+        try:
+            while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+                names = {t.ident: t.name for t in threading.enumerate()}
+                sampled = []
+                for ident, frame in sys._current_frames().items():
+                    if ident == own:
+                        continue
+                    stack = []
+                    while frame is not None:
+                        stack.append(_frame_label(frame.f_code))
+                        frame = frame.f_back
+                    stack.append(names.get(ident, f"thread-{ident}"))
+                    sampled.append(";".join(reversed(stack)))
+                # Readers copy the counter under the same lock
+                with self._lock:
+                    self.stacks.update(sampled)
+                    self.samples += 1
+        finally:
+            if self._loop is not None and not self._loop.is_closed():
+                self._loop.call_soon_threadsafe(self._restore_task_factory)
+            logger.info(f"Profiler stopped after {self.samples} samples")
+
+    def _install_task_factory(self):
+        loop = self._loop
+        previous = loop.get_task_factory()
+        self._previous_factory = previous
+
+        def factory(loop, coro, **kwargs):
+            if previous is not None:
+                task = previous(loop, coro, **kwargs)
+            else:
+                task = asyncio.Task(coro, loop=loop, **kwargs)
+            name = _coroutine_name(coro)
+            started = time.perf_counter()
+            task.add_done_callback(lambda _: self._record_task(name, time.perf_counter() - started))
+            return task
+
+        loop.set_task_factory(factory)
+
+    def _restore_task_factory(self):
+        if self._loop is not None:
+            self._loop.set_task_factory(self._previous_factory)
+
+    def _record_task(self, name: str, elapsed: float):
+        entry = self.coroutines.setdefault(name, [0, 0.0, 0.0])
+        entry[0] += 1
+        entry[1] += elapsed
+        entry[2] = max(entry[2], elapsed)
+
+    def _snapshot(self) -> Counter:
+        with self._lock:
+            return self.stacks.copy()
+
+    def folded(self) -> str:
+        """Collapsed stacks (``frame;frame;frame count``) for flamegraph.pl or speedscope."""
+        return "\n".join(f"{stack} {count}" for stack, count in self._snapshot().most_common()) + "\n"
+
+    def summary(self, top: int = 25) -> dict:
+        leaves: Counter = Counter()
+        for stack, count in self._snapshot().items():
+            leaves[stack.rsplit(";", 1)[-1]] += count
+        total = sum(leaves.values()) or 1
+        return {
+            "running": self.running,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "seconds": self.seconds,
+            "interval_ms": round(self.interval * 1000, 3),
+            "samples": self.samples,
+            "top_frames": [
+                {"frame": frame, "samples": count, "percent": round(100 * count / total, 1)}
+                for frame, count in leaves.most_common(top)
+            ],
+            "coroutines": sorted(
+                (
+                    {"coroutine": name, "count": count, "total_ms": round(total_s * 1000, 1),
+                     "max_ms": round(max_s * 1000, 1)}
+                    for name, (count, total_s, max_s) in self.coroutines.items()
+                ),
+                key=lambda c: c["total_ms"],
+                reverse=True,
+            )[:top],
+        }
+
+
+def task_snapshot() -> list[dict]:
+    """Every asyncio task on the running loop with the frames it is suspended in."""
+    tasks = []
+    for task in asyncio.all_tasks():
+        tasks.append({
+            "name": task.get_name(),
+            "coroutine": _coroutine_name(task.get_coro()),
+            "done": task.done(),
+            "stack": [_frame_label(frame.f_code) for frame in task.get_stack(limit=8)],
+        })
+    return sorted(tasks, key=lambda t: t["coroutine"])
+
+
+def thread_snapshot(prefixes: Optional[list[str]] = None) -> dict[str, list[dict]]:
+    """Current stack of each thread, grouped by name prefix (executor threads are ``<pool>_<n>``)."""
+    names = {t.ident: t.name for t in threading.enumerate()}
+    groups: dict[str, list[dict]] = {}
+    for ident, frame in sys._current_frames().items():
+        name = names.get(ident, f"thread-{ident}")
+        group = next((p for p in prefixes or [] if name.startswith(f"{p}_")), "other")
+        groups.setdefault(group, []).append({
+            "thread": name,
+            "stack": [line.rstrip() for line in traceback.format_stack(frame, limit=12)],
+        })
+    return groups
+
+
+profiler = SamplingProfiler()
@@ -0,0 +1,41 @@
+import json
+import logging
+from datetime import date, datetime
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+
+    _ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+except ImportError:
+    orjson = None
+    logger.warning("orjson not available, FastJSONResponse falls back to json")
+
+
+def _default(obj: Any):
+    if hasattr(obj, "tolist"):  # NumPy arrays and scalars
+        return obj.tolist()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    return str(obj)
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=_ORJSON_OPTIONS)
+    return json.dumps(content, default=_default, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response rendered straight from plain dicts/lists/NumPy arrays.
+
+    Returning an instance from an endpoint skips FastAPI's ``jsonable_encoder``
+    walk, so use it only for payloads that are already JSON-shaped.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
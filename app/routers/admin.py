@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import INDEX_SYMBOLS, PROFILER_MAX_SECONDS, STOCK_CODES
+from app.database import get_db
+from app.dependencies import get_admin_user, get_cached_upstox_token
+from app.executors import executors, run_in
+from app.models import User
+from app.profiling import profiler, task_snapshot, thread_snapshot
+from app.services.backfill import HISTORY_INTERVALS, backfill
+from app.services.providers import IST
+
+router = APIRouter(prefix="/api/admin", tags=["admin"], dependencies=[Depends(get_admin_user)])
+
+
+@router.post("/profile/start")
+async def start_profile(
+    seconds: float = Query(10, gt=0, le=PROFILER_MAX_SECONDS),
+    interval_ms: float = Query(5, ge=1, le=1000),
+):
+    if not profiler.start(seconds, interval_ms / 1000):
+        raise HTTPException(status_code=409, detail="A profiling session is already running")
+    return {"started": True, "seconds": seconds, "interval_ms": interval_ms}
+
+
+@router.post("/profile/stop")
+async def stop_profile():
+    # Joining the sampler thread blocks until its current sample finishes
+    await run_in("analytics", profiler.stop)
+    return profiler.summary()
+
+
+@router.get("/profile")
+async def profile_summary(top: int = Query(25, ge=1, le=500)):
+    return profiler.summary(top)
+
+
+@router.get("/profile/folded", response_class=PlainTextResponse)
+async def profile_folded():
+    return PlainTextResponse(profiler.folded())
+
+
+@router.get("/tasks")
+async def tasks():
+    return {"tasks": task_snapshot()}
+
+
+@router.get("/threads")
+async def threads():
+    return {"threads": thread_snapshot(list(executors))}
+
+
+@router.post("/backfill")
+async def start_backfill(
+    interval: str = Query("1d"),
+    days: int = Query(365, ge=1, le=3650),
+    symbols: Optional[str] = Query(None, description="Comma-separated; defaults to every tracked stock and index"),
+    user: User = Depends(get_admin_user),
+    db: AsyncSession = Depends(get_db),
+):
+    if interval not in HISTORY_INTERVALS:
+        raise HTTPException(status_code=400, detail=f"Backfill supports intervals: {', '.join(HISTORY_INTERVALS)}")
+    access_token = await get_cached_upstox_token(db, user.id)
+    if not access_token:
+        raise HTTPException(status_code=400, detail="Link Upstox to run a backfill")
+
+    symbol_list = [s.strip() for s in symbols.split(",") if s.strip()] if symbols else STOCK_CODES + INDEX_SYMBOLS
+    end = datetime.now(IST).date()
+    if not backfill.start(access_token, symbol_list, interval, end - timedelta(days=days - 1), end):
+        raise HTTPException(status_code=409, detail="A backfill is already running")
+    return {"started": True, "interval": interval, "symbols": len(symbol_list), "days": days}
+
+
+@router.get("/backfill")
+async def backfill_status():
+    return backfill.status
@@ -5,8 +5,8 @@ from sqlalchemy import select
 from app.database import get_db
 from app.models import User, UserPreference
 from app.schemas import UserCreate, UserLogin, UserResponse, Token
-from app.auth import hash_password, verify_password, create_access_token
-from app.dependencies import get_current_user
+from app.auth import password_hasher, create_access_token
+from app.dependencies import get_current_user, principal_cache
 
 router = APIRouter(prefix="/api/auth", tags=["auth"])
 
@@ -22,10 +22,12 @@ async def register(data: UserCreate, db: AsyncSession = Depends(get_db)):
     user = User(
         email=data.email,
         username=data.username,
-        hashed_password=hash_password(data.password),
+        hashed_password=await password_hasher.hash(data.password),
     )
     db.add(user)
     await db.flush()
+    # Ids can be reused after a delete, so never serve a stale principal for them
+    principal_cache.invalidate(user.id)
 
     prefs = UserPreference(user_id=user.id)
     db.add(prefs)
@@ -40,7 +42,7 @@ async def login(data: UserLogin, db: AsyncSession = Depends(get_db)):
     result = await db.execute(select(User).where(User.username == data.username))
     user = result.scalar_one_or_none()
 
-    if not user or not verify_password(data.password, user.hashed_password):
+    if not user or not await password_hasher.verify(data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     token = create_access_token({"sub": str(user.id)})
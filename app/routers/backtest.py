@@ -0,0 +1,20 @@
+from fastapi import APIRouter, Depends
+
+from app.config import BACKTEST_RATE_LIMIT
+from app.dependencies import UserRateLimit
+from app.models import User
+from app.schemas import BacktestRequest
+from app.services.backtest import run_backtest
+from app.responses import FastJSONResponse
+
+router = APIRouter(prefix="/api/backtest", tags=["backtest"])
+
+backtest_limit = UserRateLimit(BACKTEST_RATE_LIMIT)
+
+
+@router.post("")
+async def backtest(data: BacktestRequest, user: User = Depends(backtest_limit)):
+    return FastJSONResponse(await run_backtest(
+        data.symbol.upper(), data.strategy, data.params, data.interval, data.period,
+        data.fee_bps, data.sort, data.limit,
+    ))
@@ -1,22 +1,37 @@
 from fastapi import APIRouter, Query
+from typing import Optional
 from app.services.market import get_market_overview, get_sector_performance, compare_stocks
+from app.services.screener import screener
+from app.responses import FastJSONResponse
 
 router = APIRouter(prefix="/api/market", tags=["market"])
 
 
 @router.get("/overview")
 async def market_overview():
-    return await get_market_overview()
+    return FastJSONResponse(await get_market_overview())
 
 
 @router.get("/sectors")
 async def sectors():
-    return await get_sector_performance()
+    return FastJSONResponse(await get_sector_performance())
 
 
 @router.get("/compare")
-async def compare(symbols: str = Query(..., description="Comma-separated symbols")):
+async def compare(
+    symbols: str = Query(..., description="Comma-separated symbols"),
+    max_points: Optional[int] = Query(None, ge=3, le=10000, description="Thin each series to at most this many points"),
+):
     symbol_list = [s.strip() for s in symbols.split(",") if s.strip()]
     if len(symbol_list) < 2:
         return {"error": "Provide at least 2 symbols"}
-    return {"data": await compare_stocks(symbol_list)}
+    return FastJSONResponse({"data": await compare_stocks(symbol_list, max_points)})
+
+
+@router.get("/screener")
+async def screen(
+    expression: str = Query(..., alias="filter", description="e.g. close > sma_200 and rsi_14 < 30"),
+    sort: Optional[str] = Query(None, description="Field to sort by; prefix with - for descending"),
+    limit: int = Query(100, ge=1, le=1000),
+):
+    return FastJSONResponse(await screener.screen(expression, sort, limit))
@@ -1,14 +1,20 @@
-from fastapi import APIRouter, Query
+from fastapi import APIRouter, Depends, Query
 from typing import Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_db
 from app.services.news import fetch_news
+from app.responses import FastJSONResponse
 
 router = APIRouter(prefix="/api/news", tags=["news"])
 
 
 @router.get("")
 async def get_news(
-    symbol: Optional[str] = None,
+    symbol: Optional[str] = Query(None, description="Comma-separated symbols, e.g. a whole watchlist"),
     limit: int = Query(20, ge=1, le=50),
+    db: AsyncSession = Depends(get_db),
 ):
-    articles = await fetch_news(limit=limit, symbol=symbol)
-    return {"articles": articles}
+    symbols = [s.strip() for s in symbol.split(",") if s.strip()] if symbol else None
+    articles = await fetch_news(db, limit=limit, symbols=symbols)
+    return FastJSONResponse({"articles": articles})
@@ -1,6 +1,10 @@
 from fastapi import APIRouter, HTTPException, Query
+from typing import Optional
 
+from app.services.downsample import downsample_points
 from app.services.prediction import predict_stock
+from app.responses import FastJSONResponse
+from app.exceptions import AppException
 
 router = APIRouter(prefix="/api/predictions", tags=["predictions"])
 
@@ -9,6 +13,7 @@ router = APIRouter(prefix="/api/predictions", tags=["predictions"])
 async def get_prediction(
     symbol: str,
     days: int = Query(14, ge=7, le=30, description="Forecast horizon: 7, 14, or 30"),
+    max_points: Optional[int] = Query(None, ge=3, le=10000, description="Thin each series to at most this many points"),
 ):
     if days not in (7, 14, 30):
         raise HTTPException(status_code=400, detail="days must be 7, 14, or 30")
@@ -17,10 +22,19 @@ async def get_prediction(
         result = await predict_stock(symbol.upper(), forecast_days=days)
     except ValueError as e:
         raise HTTPException(status_code=422, detail=str(e))
+    except AppException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Prediction failed: {str(e)}")
 
     if result is None:
         raise HTTPException(status_code=404, detail=f"No data available for {symbol}")
 
-    return result
+    if max_points is not None:
+        result = {
+            **result,
+            "historical": downsample_points(result["historical"], max_points),
+            "predicted": downsample_points(result["predicted"], max_points),
+            "confidence_band": downsample_points(result["confidence_band"], max_points, ("upper", "lower")),
+        }
+    return FastJSONResponse(result)
@@ -1,10 +1,17 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.config import STOCK_CODES, VALID_INTERVALS, TIMEFRAME_PRESETS
-from app.services.stocks import fetch_all_stocks, get_candlestick_data_cached, search_stock, get_stock_info, get_upstox_token_for_user
+from app.config import STOCK_CODES, VALID_INTERVALS, TIMEFRAME_PRESETS, LIVE_CANDLE_INTERVALS, SPARKLINE_MAX_SYMBOLS, FUNDAMENTALS_MAX_SYMBOLS
+from app.services.stocks import fetch_all_stocks, get_candlestick_data_cached, search_stock, get_stock_info, get_stock_infos, get_upstox_token_for_user
 from app.services.indicators import calculate_indicators
+from app.services.providers import Provider, market_data
+from app.services.sparklines import sparkline_snapshot
+from app.services.ticks import tick_aggregator
+from app.services.candles import paginate_candles, clip_indicators, iter_candle_frames
+from app.services.downsample import downsample_chart
+from app.responses import FastJSONResponse
 from app.exceptions import InvalidInterval
 from app.dependencies import get_optional_user
 from app.database import get_db
@@ -18,45 +25,30 @@ async def get_stocks(
     user: Optional[User] = Depends(get_optional_user),
     db: AsyncSession = Depends(get_db),
 ):
-    upstox_token = None
-    if user:
-        upstox_token = await get_upstox_token_for_user(db, user.id)
-
-    if upstox_token:
-        try:
-            from app.services.upstox import get_market_quote
-            symbols = ",".join([f"NSE_EQ|{s.replace('.NS', '')}" for s in STOCK_CODES])
-            quotes = get_market_quote(upstox_token, symbols)
-            if quotes:
-                data = []
-                for key, quote in quotes.items():
-                    ohlc = quote.get("ohlc", {})
-                    ltp = quote.get("last_price", ohlc.get("close", 0))
-                    prev_close = ohlc.get("close", ltp)
-                    change = ltp - prev_close
-                    pct = (change / prev_close * 100) if prev_close else 0
-                    symbol_name = key.split("|")[-1] + ".NS" if "|" in key else key
-                    data.append({
-                        "symbol": symbol_name,
-                        "current_price": round(float(ltp), 2),
-                        "previous_close": round(float(prev_close), 2),
-                        "change": round(float(change), 2),
-                        "percent_change": round(float(pct), 2),
-                    })
-                if data:
-                    return {"data": data}
-        except Exception as e:
-            import logging
-            logging.getLogger(__name__).warning(f"Upstox quote fallback: {e}")
-
-    data = await fetch_all_stocks(STOCK_CODES)
-    return {"data": data}
+    data = await fetch_all_stocks(STOCK_CODES, await _user_providers(user, db))
+    return FastJSONResponse({"data": data})
+
+
+async def _user_providers(user: Optional[User], db: AsyncSession) -> Optional[list[Provider]]:
+    # Users with Upstox linked get it as an extra source; everyone else uses the defaults
+    if user is None:
+        return None
+    upstox_token = await get_upstox_token_for_user(db, user.id)
+    return market_data.providers(upstox_token) if upstox_token else None
 
 
 @router.get("/search")
 async def search(q: str = Query(..., min_length=1)):
     results = await search_stock(q)
-    return {"results": results}
+    return FastJSONResponse({"results": results})
+
+
+@router.get("/sparklines")
+async def sparklines(symbols: Optional[str] = Query(None, description="Comma-separated symbols; defaults to all tracked stocks")):
+    symbol_list = [s.strip() for s in symbols.split(",") if s.strip()] if symbols else STOCK_CODES
+    if len(symbol_list) > SPARKLINE_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {SPARKLINE_MAX_SYMBOLS} symbols per request")
+    return FastJSONResponse(await sparkline_snapshot.get(list(dict.fromkeys(symbol_list))))
 
 
 @router.get("/candles/{symbol}")
@@ -65,6 +57,13 @@ async def get_candles(
     interval: str = Query("5m"),
     period: Optional[str] = None,
     indicators: Optional[str] = Query(None, description="Comma-separated: sma_20,rsi_14,macd,bollinger"),
+    before: Optional[int] = Query(None, description="Only bars strictly before this unix timestamp"),
+    after: Optional[int] = Query(None, description="Only bars strictly after this unix timestamp"),
+    limit: Optional[int] = Query(None, ge=1, le=10000),
+    max_points: Optional[int] = Query(None, ge=3, le=10000, description="Aggregate candles and thin indicators to at most this many points"),
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+    user: Optional[User] = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_db),
 ):
     if interval not in VALID_INTERVALS:
         raise InvalidInterval(interval)
@@ -73,16 +72,44 @@ async def get_candles(
         preset = TIMEFRAME_PRESETS.get(interval, {"period": "1d"})
         period = preset["period"]
 
-    data = await get_candlestick_data_cached(symbol, interval, period)
-    if data is None:
-        return {"data": [], "indicators": {}}
+    data = await get_candlestick_data_cached(symbol, interval, period, await _user_providers(user, db)) or []
+    if interval in LIVE_CANDLE_INTERVALS:
+        data = tick_aggregator.merge(symbol, interval, data)
 
+    # Indicators are computed over the full series so look-back windows stay valid
     indicator_data = {}
-    if indicators:
+    if indicators and data:
         indicator_list = [i.strip() for i in indicators.split(",") if i.strip()]
         indicator_data = calculate_indicators(data, indicator_list)
 
-    return {"data": data, "indicators": indicator_data}
+    paginated = before is not None or after is not None or limit is not None
+    page = None
+    if paginated:
+        data, page = paginate_candles(data, before, after, limit)
+        indicator_data = clip_indicators(indicator_data, data)
+
+    if max_points is not None:
+        data, indicator_data = downsample_chart(data, indicator_data, max_points)
+
+    if format == "ndjson":
+        meta = {"symbol": symbol, "interval": interval, "period": period, "page": page}
+        return StreamingResponse(
+            iter_candle_frames(meta, data, indicator_data),
+            media_type="application/x-ndjson",
+        )
+
+    response = {"data": data, "indicators": indicator_data}
+    if paginated:
+        response["page"] = page
+    return FastJSONResponse(response)
+
+
+@router.get("/info")
+async def stock_infos(symbols: Optional[str] = Query(None, description="Comma-separated symbols; defaults to all tracked stocks")):
+    symbol_list = [s.strip() for s in symbols.split(",") if s.strip()] if symbols else STOCK_CODES
+    if len(symbol_list) > FUNDAMENTALS_MAX_SYMBOLS:
+        raise HTTPException(status_code=400, detail=f"At most {FUNDAMENTALS_MAX_SYMBOLS} symbols per request")
+    return FastJSONResponse({"data": await get_stock_infos(list(dict.fromkeys(symbol_list)))})
 
 
 @router.get("/{symbol}/info")
@@ -90,4 +117,4 @@ async def stock_info(symbol: str):
     info = await get_stock_info(symbol)
     if info is None:
         return {"error": "Stock not found"}
-    return info
+    return FastJSONResponse(info)
@@ -4,13 +4,15 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 import httpx
 import logging
+import time
 
 from app.database import get_db
-from app.dependencies import get_current_user
+from app.dependencies import get_current_user, get_cached_upstox_token, principal_cache
 from app.models import User, UpstoxToken
 from app.schemas import UpstoxLinkStatus, OrderRequest, OrderModifyRequest, OrderResponse
 from app.config import UPSTOX_API_KEY, UPSTOX_API_SECRET, UPSTOX_REDIRECT_URI
 from app.services import upstox as upstox_service
+from app.metrics import upstream_request_duration
 
 from datetime import datetime, timezone
 
@@ -44,6 +46,7 @@ async def upstox_callback(
     if not UPSTOX_API_KEY or not UPSTOX_API_SECRET:
         raise HTTPException(status_code=500, detail="Upstox credentials not configured")
 
+    start = time.perf_counter()
     async with httpx.AsyncClient() as client:
         response = await client.post(
             UPSTOX_TOKEN_URL,
@@ -57,6 +60,9 @@ async def upstox_callback(
             headers={"Content-Type": "application/x-www-form-urlencoded"},
         )
 
+    outcome = "ok" if response.status_code == 200 else "error"
+    upstream_request_duration.labels("upstox", outcome).observe(time.perf_counter() - start)
+
     if response.status_code != 200:
         logger.error(f"Upstox token exchange failed: {response.text}")
         raise HTTPException(status_code=400, detail="Failed to exchange code for token")
@@ -82,6 +88,7 @@ async def upstox_callback(
         ))
 
     await db.commit()
+    principal_cache.invalidate(user.id)
     return {"status": "success", "message": "Upstox account linked successfully"}
 
 
@@ -115,17 +122,15 @@ async def unlink(
     if token:
         await db.delete(token)
         await db.commit()
+    principal_cache.invalidate(user.id)
     return {"status": "success", "message": "Upstox account unlinked"}
 
 
 async def _get_upstox_token(user: User, db: AsyncSession) -> str:
-    result = await db.execute(
-        select(UpstoxToken).where(UpstoxToken.user_id == user.id)
-    )
-    token = result.scalar_one_or_none()
+    token = await get_cached_upstox_token(db, user.id)
     if not token:
         raise HTTPException(status_code=400, detail="Upstox account not linked")
-    return token.access_token
+    return token
 
 
 @router.get("/profile")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 
@@ -160,3 +160,15 @@ class OrderResponse(BaseModel):
     order_id: Optional[str] = None
     status: str
     message: str
+
+
+# Backtests
+class BacktestRequest(BaseModel):
+    symbol: str
+    strategy: str  # sma_cross, ema_cross, rsi_threshold, breakout
+    params: dict[str, list[float]]  # every value to try per parameter, e.g. {"fast": [10, 20], "slow": [50, 100]}
+    interval: str = "1d"
+    period: str = "5y"
+    fee_bps: float = Field(10, ge=0, le=1000)  # per position change
+    sort: str = "-sharpe"  # a metric; prefix with - for descending
+    limit: int = Field(20, ge=1, le=1000)
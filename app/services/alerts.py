@@ -2,13 +2,23 @@ from datetime import datetime, timezone
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 from app.models import Alert
+from app.metrics import alert_evaluation_duration
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 async def check_alerts(db: AsyncSession, current_prices: dict[str, float]) -> list[dict]:
-    result = await db.execute(select(Alert).where(Alert.is_active == True))
+    if not current_prices:
+        return []
+    with alert_evaluation_duration.time():
+        return await _check_alerts(db, current_prices)
+
+
+async def _check_alerts(db: AsyncSession, current_prices: dict[str, float]) -> list[dict]:
+    result = await db.execute(
+        select(Alert).where(Alert.is_active == True, Alert.symbol.in_(list(current_prices)))
+    )
     alerts = result.scalars().all()
 
     triggered = []
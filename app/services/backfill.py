@@ -0,0 +1,197 @@
+import asyncio
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import select
+
+from app.config import (
+    BACKFILL_CONCURRENCY, BACKFILL_RATE_LIMIT, BACKFILL_RETRIES, BACKFILL_UPDATE_DAYS, BACKFILL_UPDATE_INTERVAL,
+    BACKFILL_UPDATE_INTERVALS, INDEX_SYMBOLS, STOCK_CODES, UPSTOX_HISTORY_CHUNK_DAYS,
+)
+from app.database import async_session
+from app.executors import run_in
+from app.models import UpstoxToken, User
+from app.services.candle_store import candles_load, last_bar_times
+from app.services.providers import IST
+from app.services.symbols import instrument_key
+from app.services.ticks import IST_OFFSET
+from app.services.upstox import get_historical_candles
+from app.services.upstream import TokenBucket
+from app.services.yahoo import Chart
+
+logger = logging.getLogger(__name__)
+
+# Intervals the Upstox history API serves, by the names the rest of the API uses
+HISTORY_INTERVALS = {"1m": "1minute", "1d": "day", "1wk": "week", "1mo": "month"}
+BACKFILL_BACKOFF = 1.0
+
+
+def plan_chunks(start: date, end: date, chunk_days: int) -> list[tuple[date, date]]:
+    """Split ``start..end`` (inclusive) into ranges of at most ``chunk_days`` days."""
+    chunks = []
+    cursor = start
+    while cursor <= end:
+        chunk_end = min(end, cursor + timedelta(days=chunk_days - 1))
+        chunks.append((cursor, chunk_end))
+        cursor = chunk_end + timedelta(days=1)
+    return chunks
+
+
+def parse_history(symbol: str, rows: list) -> Chart:
+    """Upstox candle rows (``[timestamp, o, h, l, c, volume, oi]``, newest first) as column arrays."""
+    rows = rows[::-1]
+    prices = np.array([row[1:5] for row in rows], dtype=np.float64).reshape(-1, 4)
+    return Chart(
+        symbol=symbol,
+        timestamps=np.array([int(datetime.fromisoformat(row[0]).timestamp()) for row in rows], dtype=np.int64),
+        open=prices[:, 0],
+        high=prices[:, 1],
+        low=prices[:, 2],
+        close=prices[:, 3],
+        volume=np.array([row[5] for row in rows], dtype=np.int64),
+        gmtoffset=IST_OFFSET,
+    )
+
+
+class Backfill:
+    """Loads Upstox history for many symbols into the candle store.
+
+    Long ranges are split into the largest chunks the history API accepts
+    for the interval. Chunks are fetched concurrently, within a request rate
+    budget, and each one is bulk-loaded as soon as it arrives. A rerun
+    resumes every symbol from its newest stored bar, and ``start_updates``
+    reruns it every ``update_interval`` seconds to keep the store current.
+    """
+
+    def __init__(self, rate: float, concurrency: int, update_interval: float = 0.0):
+        self.bucket = TokenBucket(rate, max(1, int(rate)))
+        self.concurrency = concurrency
+        self.update_interval = update_interval
+        self.status: dict = {"state": "idle"}
+        self._task: Optional[asyncio.Task] = None
+        self._updates: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def start(self, access_token: str, symbols: list[str], interval: str, start: date, end: date) -> bool:
+        """Run in the background; returns False if a backfill is already running."""
+        if self.running:
+            return False
+        self._task = asyncio.create_task(self.run(access_token, symbols, interval, start, end))
+        return True
+
+    async def run(self, access_token: str, symbols: list[str], interval: str, start: date, end: date) -> dict:
+        history_interval = HISTORY_INTERVALS[interval]
+        chunk_days = UPSTOX_HISTORY_CHUNK_DAYS[history_interval]
+
+        stored = await last_bar_times(symbols, interval)
+        jobs = []
+        for symbol in symbols:
+            first = start
+            if symbol in stored:
+                # The newest stored day may have been partial, so it is fetched again
+                first = max(start, datetime.fromtimestamp(stored[symbol], IST).date())
+            jobs.extend((symbol, a, b) for a, b in plan_chunks(first, end, chunk_days))
+
+        self.status = {
+            "state": "running", "interval": interval, "symbols": len(symbols), "chunks": len(jobs),
+            "done": 0, "failed": 0, "rows": 0, "started_at": datetime.now(timezone.utc).isoformat(),
+        }
+        logger.info(f"Backfilling {interval} history: {len(jobs)} chunks for {len(symbols)} symbols")
+        slots = asyncio.Semaphore(self.concurrency)
+        write_lock = asyncio.Lock()  # one bulk load at a time keeps SQLite writers from contending
+
+        async def load(symbol: str, chunk_start: date, chunk_end: date):
+            try:
+                async with slots:
+                    rows = await self._fetch(access_token, symbol, history_interval, chunk_start, chunk_end)
+                if rows is None:
+                    raise RuntimeError("history request failed")
+                async with write_lock:
+                    self.status["rows"] += await candles_load(symbol, interval, parse_history(symbol, rows))
+            except Exception as e:
+                # A busy pool, a network or parse error fails this chunk only; the others carry on
+                self.status["failed"] += 1
+                logger.warning(f"Backfill of {symbol} {chunk_start}..{chunk_end} failed: {e}")
+            self.status["done"] += 1
+
+        try:
+            await asyncio.gather(*(load(*job) for job in jobs))
+            self.status["state"] = "finished"
+        except Exception as e:
+            self.status["state"] = "error"
+            logger.error(f"Backfill aborted: {e}")
+        self.status["finished_at"] = datetime.now(timezone.utc).isoformat()
+        logger.info(f"Backfill {self.status['state']}: {self.status['rows']} rows, {self.status['failed']} failed chunks")
+        return self.status
+
+    async def _fetch(self, access_token: str, symbol: str, history_interval: str,
+                     start: date, end: date) -> Optional[list]:
+        for attempt in range(BACKFILL_RETRIES + 1):
+            await self.bucket.acquire()
+            rows = await run_in(
+                "backfill", get_historical_candles,
+                access_token, instrument_key(symbol), history_interval, start.isoformat(), end.isoformat(),
+            )
+            if rows is not None:
+                return rows
+            if attempt < BACKFILL_RETRIES:
+                await asyncio.sleep(BACKFILL_BACKOFF * 2 ** attempt)
+        return None
+
+    async def update(self) -> Optional[dict]:
+        """Bring every tracked symbol up to today, for each of ``BACKFILL_UPDATE_INTERVALS``."""
+        access_token = await _update_token()
+        if access_token is None:
+            logger.info("Skipping scheduled backfill: no admin has linked Upstox")
+            return None
+        symbols = STOCK_CODES + INDEX_SYMBOLS
+        end = datetime.now(IST).date()
+        for interval in BACKFILL_UPDATE_INTERVALS:
+            # Symbols with stored bars resume from the newest one; the rest load BACKFILL_UPDATE_DAYS
+            if not self.start(access_token, symbols, interval, end - timedelta(days=BACKFILL_UPDATE_DAYS - 1), end):
+                logger.info("Skipping scheduled backfill: one is already running")
+                return None
+            await self._task
+        return self.status
+
+    async def _run_updates(self):
+        while True:
+            try:
+                await self.update()
+            except Exception as e:
+                logger.error(f"Scheduled backfill error: {e}")
+            await asyncio.sleep(self.update_interval)
+
+    def start_updates(self):
+        if self._updates is None and self.update_interval > 0:
+            self._updates = asyncio.create_task(self._run_updates())
+
+    async def stop_updates(self):
+        if self._updates is not None:
+            self._updates.cancel()
+            try:
+                await self._updates
+            except asyncio.CancelledError:
+                pass
+            self._updates = None
+
+
+async def _update_token() -> Optional[str]:
+    """The most recently linked Upstox token of any admin; the history API needs a user's token."""
+    query = (
+        select(UpstoxToken.access_token)
+        .join(User, User.id == UpstoxToken.user_id)
+        .where(User.is_admin.is_(True))
+        .order_by(UpstoxToken.token_date.desc())
+        .limit(1)
+    )
+    async with async_session() as db:
+        return (await db.execute(query)).scalar_one_or_none()
+
+
+backfill = Backfill(BACKFILL_RATE_LIMIT, BACKFILL_CONCURRENCY, BACKFILL_UPDATE_INTERVAL)
@@ -0,0 +1,260 @@
+import asyncio
+import itertools
+import logging
+import math
+import time
+from datetime import datetime
+from typing import Callable
+
+import numpy as np
+
+from app.config import (
+    BACKTEST_MAX_CELLS, BACKTEST_MAX_COMBINATIONS, BACKTEST_MAX_PENDING, BACKTEST_WORKERS, VALID_INTERVALS,
+)
+from app.exceptions import InvalidBacktest, InvalidInterval, StockNotFound
+from app.executors import BoundedProcessExecutor, register, run_in
+from app.services import indicators
+from app.services.candle_store import candles_read
+from app.services.providers import IST
+from app.services.candles import period_days
+from app.services.resample import INTRADAY_STEPS, chart_from_records
+from app.services.yahoo import Chart
+
+logger = logging.getLogger(__name__)
+
+backtest_pool = register(BoundedProcessExecutor("backtest", BACKTEST_WORKERS, BACKTEST_MAX_PENDING))
+
+# Combinations x bars per chunk; bounds a worker's working set to ~16 MB per array
+CHUNK_CELLS = 2_000_000
+# Sweeps this small run in the analytics threads rather than paying for a process hop
+INLINE_CELLS = 200_000
+# Stored bars this far from either end of the period don't count as covering it
+COVERAGE_SLACK = 4 * 86400
+SORT_FIELDS = ("total_return", "annual_return", "sharpe", "max_drawdown", "trades", "exposure")
+_PERIODS_PER_YEAR = {"1d": 252, "1wk": 52, "1mo": 12}
+_SESSION_SECONDS = 375 * 60
+
+
+def _windows(grid: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Distinct windows in ``grid`` and each entry's row among them."""
+    windows, rows = np.unique(grid.astype(np.int64), return_inverse=True)
+    return windows, rows.reshape(grid.shape)
+
+
+def _per_window(close: np.ndarray, windows: np.ndarray, indicator: Callable) -> np.ndarray:
+    # ema and rsi take one window per row and step through time once for all of them
+    return indicator(np.broadcast_to(close, (len(windows), len(close))), windows)
+
+
+def _sma_lines(close: np.ndarray, windows: np.ndarray) -> np.ndarray:
+    return np.vstack([indicators.sma(close, int(w)) for w in windows])
+
+
+def _hold(enter: np.ndarray, exit: np.ndarray) -> np.ndarray:
+    """Long from each entry bar until the next exit bar, for every row at once."""
+    event = np.where(enter, 1, np.where(exit, 0, -1))
+    last = np.where(event >= 0, np.arange(event.shape[-1]), 0)
+    np.maximum.accumulate(last, axis=-1, out=last)
+    return np.take_along_axis(event, last, axis=-1) > 0
+
+
+def _crossover(lines: Callable) -> Callable:
+    def positions(close: np.ndarray, grid: np.ndarray) -> np.ndarray:
+        windows, rows = _windows(grid)
+        values = lines(close, windows)
+        # NaN (still warming up) compares False, so the strategy starts flat
+        return values[rows[:, 0]] > values[rows[:, 1]]
+    return positions
+
+
+def _rsi_threshold(close: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    windows, rows = _windows(grid[:, :1])
+    values = _per_window(close, windows, indicators.rsi)[rows[:, 0]]
+    return _hold(values < grid[:, 1:2], values > grid[:, 2:3])
+
+
+def _breakout(close: np.ndarray, grid: np.ndarray) -> np.ndarray:
+    windows, rows = _windows(grid)
+    # Channels over the previous N closes, not including the current one
+    highs = np.vstack([indicators.rolling_max(close, int(w)) for w in windows])
+    lows = np.vstack([indicators.rolling_min(close, int(w)) for w in windows])
+    highs = np.c_[np.full(len(windows), np.nan), highs[:, :-1]]
+    lows = np.c_[np.full(len(windows), np.nan), lows[:, :-1]]
+    return _hold(close > highs[rows[:, 0]], close < lows[rows[:, 1]])
+
+
+# name -> (parameters in grid column order, positions(close, grid) -> combinations x bars)
+STRATEGIES: dict[str, tuple[tuple[str, ...], Callable]] = {
+    "sma_cross": (("fast", "slow"), _crossover(_sma_lines)),
+    "ema_cross": (("fast", "slow"), _crossover(lambda close, w: _per_window(close, w, indicators.ema))),
+    "rsi_threshold": (("window", "lower", "upper"), _rsi_threshold),
+    "breakout": (("entry", "exit"), _breakout),
+}
+# Parameters that are bar counts rather than levels
+_WINDOW_PARAMS = {"fast", "slow", "window", "entry", "exit"}
+
+
+def performance(close: np.ndarray, positions: np.ndarray, fee: float, periods_per_year: float) -> dict[str, np.ndarray]:
+    """Metrics per row of ``positions`` (True = long at that bar's close).
+
+    A position taken at a bar's close earns from the next bar on, and every
+    change of position costs ``fee`` as a fraction of equity.
+    """
+    returns = np.zeros(len(close))
+    returns[1:] = close[1:] / close[:-1] - 1
+    held = np.zeros(positions.shape)
+    held[:, 1:] = positions[:, :-1]
+    changes = np.diff(held, axis=-1, prepend=0.0)
+    strategy = held * returns - np.abs(changes) * fee
+
+    equity = np.cumprod(1 + strategy, axis=-1)
+    drawdown = 1 - equity / np.maximum.accumulate(equity, axis=-1)
+    mean, std = strategy.mean(axis=-1), strategy.std(axis=-1)
+    final = equity[:, -1]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sharpe = np.where(std > 0, mean / std * math.sqrt(periods_per_year), 0.0)
+        annual = np.where(final > 0, final ** (periods_per_year / len(close)) - 1, -1.0)
+    return {
+        "total_return": final - 1,
+        "annual_return": annual,
+        "sharpe": sharpe,
+        "max_drawdown": drawdown.max(axis=-1),
+        "trades": (changes > 0).sum(axis=-1),
+        "exposure": held.mean(axis=-1),
+    }
+
+
+def run_grid(strategy: str, close: np.ndarray, grid: np.ndarray, fee: float, periods_per_year: float) -> dict[str, np.ndarray]:
+    """Backtest every row of ``grid`` over ``close``. Module-level so worker processes can run it."""
+    return performance(close, STRATEGIES[strategy][1](close, grid), fee, periods_per_year)
+
+
+def periods_per_year(interval: str) -> float:
+    step = INTRADAY_STEPS.get(interval)
+    return 252 * _SESSION_SECONDS / step if step else _PERIODS_PER_YEAR[interval]
+
+
+def strategy_params(strategy: str) -> tuple[str, ...]:
+    if strategy not in STRATEGIES:
+        raise InvalidBacktest(f"unknown strategy {strategy}; expected one of {', '.join(STRATEGIES)}")
+    return STRATEGIES[strategy][0]
+
+
+def parameter_grid(strategy: str, params: dict[str, list[float]], bars: int) -> np.ndarray:
+    """Every combination of ``params`` as rows (columns in the strategy's order), minus meaningless ones."""
+    names = strategy_params(strategy)
+    if set(params) != set(names):
+        raise InvalidBacktest(f"{strategy} takes {', '.join(names)}")
+    values = [sorted(set(params[name])) for name in names]
+    if any(not v for v in values):
+        raise InvalidBacktest("every parameter needs at least one value")
+    for name, v in zip(names, values):
+        if not all(math.isfinite(w) for w in v):
+            raise InvalidBacktest(f"{name} values must be finite numbers")
+        if name in _WINDOW_PARAMS and any(w != int(w) or not 1 <= w < bars for w in v):
+            raise InvalidBacktest(f"{name} must be whole numbers of bars from 1 to {bars - 1}")
+    if math.prod(len(v) for v in values) > BACKTEST_MAX_COMBINATIONS:
+        raise InvalidBacktest(f"more than {BACKTEST_MAX_COMBINATIONS} combinations")
+
+    grid = np.array(list(itertools.product(*values)), dtype=np.float64).reshape(-1, len(names))
+    if strategy.endswith("_cross"):
+        grid = grid[grid[:, 0] < grid[:, 1]]
+    elif strategy == "rsi_threshold":
+        grid = grid[grid[:, 1] < grid[:, 2]]
+    if not len(grid):
+        raise InvalidBacktest("no valid combinations (fast must be below slow, lower below upper)")
+    return grid
+
+
+async def load_bars(symbol: str, interval: str, period: str) -> Chart:
+    """Stored bars when the candle store covers ``period``, otherwise market data."""
+    from app.services.stocks import get_candlestick_data_cached
+
+    days = period_days(period)
+    now = int(time.time())
+    if days is not None:
+        start = now - days * 86400
+        stored = await candles_read(symbol, interval, start)
+        if (stored is not None and stored.timestamps[0] <= start + COVERAGE_SLACK
+                and stored.timestamps[-1] >= now - COVERAGE_SLACK):
+            return stored
+    records = await get_candlestick_data_cached(symbol, interval, period)
+    if not records:
+        raise StockNotFound(symbol)
+    return chart_from_records(symbol, records)
+
+
+async def sweep(strategy: str, close: np.ndarray, grid: np.ndarray, fee: float, per_year: float) -> dict[str, np.ndarray]:
+    """``run_grid`` split into chunks across the backtest processes."""
+    cells = len(grid) * len(close)
+    if cells <= INLINE_CELLS:
+        return await run_in("analytics", run_grid, strategy, close, grid, fee, per_year)
+    size = max(1, min(math.ceil(len(grid) / backtest_pool.workers), CHUNK_CELLS // len(close)))
+    # At most one chunk per worker in flight, so a long sweep queues here
+    # rather than filling the pool for everyone else
+    slots = asyncio.Semaphore(backtest_pool.workers)
+
+    async def run_chunk(chunk: np.ndarray) -> dict[str, np.ndarray]:
+        async with slots:
+            return await backtest_pool.run(run_grid, strategy, close, chunk, fee, per_year)
+
+    results = await asyncio.gather(*(run_chunk(grid[i:i + size]) for i in range(0, len(grid), size)))
+    return {name: np.concatenate([r[name] for r in results]) for name in results[0]}
+
+
+def _summary(metrics: dict[str, np.ndarray], row: int) -> dict:
+    return {
+        name: int(values[row]) if name == "trades" else round(float(values[row]), 4)
+        for name, values in metrics.items()
+    }
+
+
+async def run_backtest(symbol: str, strategy: str, params: dict[str, list[float]], interval: str = "1d",
+                       period: str = "5y", fee_bps: float = 10, sort: str = "-sharpe", limit: int = 20) -> dict:
+    if interval not in VALID_INTERVALS:
+        raise InvalidInterval(interval)
+    descending = sort.startswith("-")
+    sort_field = sort.lstrip("-")
+    if sort_field not in SORT_FIELDS:
+        raise InvalidBacktest(f"sort must be one of {', '.join(SORT_FIELDS)}")
+    strategy_params(strategy)
+
+    chart = await load_bars(symbol, interval, period)
+    close = chart.close[~np.isnan(chart.close)]
+    if len(close) < 2:
+        raise InvalidBacktest(f"not enough bars for {symbol}")
+    grid = parameter_grid(strategy, params, len(close))
+    if len(grid) * len(close) > BACKTEST_MAX_CELLS:
+        raise InvalidBacktest(
+            f"{len(grid)} combinations x {len(close)} bars is over the limit of {BACKTEST_MAX_CELLS:,}; "
+            "use fewer combinations or a shorter period"
+        )
+    fee = fee_bps / 10000
+    per_year = periods_per_year(interval)
+
+    started = time.perf_counter()
+    metrics = await sweep(strategy, close, grid, fee, per_year)
+    elapsed = time.perf_counter() - started
+    logger.info(f"Backtest {symbol} {strategy}: {len(grid)} combinations x {len(close)} bars in {elapsed:.2f}s")
+    hold = performance(close, np.ones((1, len(close)), dtype=bool), fee, per_year)
+
+    key = metrics[sort_field]
+    order = np.argsort(-key if descending else key, kind="stable")[:limit]
+    names = STRATEGIES[strategy][0]
+    return {
+        "symbol": symbol,
+        "strategy": strategy,
+        "interval": interval,
+        "bars": len(close),
+        "start": datetime.fromtimestamp(int(chart.timestamps[0]), IST).isoformat(),
+        "end": datetime.fromtimestamp(int(chart.timestamps[-1]), IST).isoformat(),
+        "combinations": len(grid),
+        "buy_and_hold": _summary(hold, 0),
+        "results": [
+            {"params": dict(zip(names, (v if v != int(v) else int(v) for v in grid[row].tolist()))),
+             **_summary(metrics, row)}
+            for row in order.tolist()
+        ],
+        "elapsed_ms": round(elapsed * 1000, 3),
+        "bars_per_second": round(len(grid) * len(close) / elapsed) if elapsed > 0 else None,
+    }
@@ -0,0 +1,153 @@
+import logging
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.config import CANDLE_STORE_WRITE_BATCH
+from app.database import async_session
+from app.models import Candle
+from app.services.ticks import IST_OFFSET
+from app.services.yahoo import Chart
+
+logger = logging.getLogger(__name__)
+
+# Local OHLCV history, one row per bar. Bulk loads raise on database errors so
+# a backfill can report them; reads are best-effort like the stock store and
+# treat errors as "nothing stored".
+
+_INSERTS = {"sqlite": sqlite_insert, "postgresql": pg_insert}
+_PRICES = ("open", "high", "low", "close", "volume")
+
+
+async def candles_load(symbol: str, interval: str, bars: Chart) -> int:
+    """Upsert every bar in ``bars``; returns the number of rows written."""
+    if not len(bars):
+        return 0
+    rows = [
+        {"symbol": symbol, "interval": interval, "ts": t, "open": o, "high": h, "low": lo, "close": c, "volume": v}
+        for t, o, h, lo, c, v in zip(
+            bars.timestamps.tolist(), bars.open.tolist(), bars.high.tolist(),
+            bars.low.tolist(), bars.close.tolist(), bars.volume.tolist(),
+        )
+    ]
+    async with async_session() as db:
+        stmt = _INSERTS[db.bind.dialect.name](Candle)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Candle.symbol, Candle.interval, Candle.ts],
+            set_={column: stmt.excluded[column] for column in _PRICES},
+        )
+        for i in range(0, len(rows), CANDLE_STORE_WRITE_BATCH):
+            await db.execute(stmt, rows[i:i + CANDLE_STORE_WRITE_BATCH])
+        await db.commit()
+    return len(rows)
+
+
+async def candles_read(symbol: str, interval: str, start: Optional[int] = None,
+                       end: Optional[int] = None) -> Optional[Chart]:
+    """Stored bars with ``start <= ts < end`` as column arrays, oldest first."""
+    query = (
+        select(Candle.ts, Candle.open, Candle.high, Candle.low, Candle.close, Candle.volume)
+        .where(Candle.symbol == symbol, Candle.interval == interval)
+        .order_by(Candle.ts)
+    )
+    if start is not None:
+        query = query.where(Candle.ts >= start)
+    if end is not None:
+        query = query.where(Candle.ts < end)
+    try:
+        async with async_session() as db:
+            rows = (await db.execute(query)).all()
+    except SQLAlchemyError as e:
+        logger.warning(f"Candle store read failed: {e}")
+        return None
+    if not rows:
+        return None
+
+    ts, o, h, lo, c, v = (np.array(column) for column in zip(*rows))
+    return Chart(
+        symbol=symbol,
+        timestamps=ts.astype(np.int64),
+        open=o.astype(np.float64),
+        high=h.astype(np.float64),
+        low=lo.astype(np.float64),
+        close=c.astype(np.float64),
+        volume=v.astype(np.int64),
+        gmtoffset=IST_OFFSET,
+    )
+
+
+async def candles_read_all(interval: str, start: int) -> dict[str, Chart]:
+    """Every stored symbol's bars from ``start`` on, in one query."""
+    query = (
+        select(Candle.symbol, Candle.ts, Candle.open, Candle.high, Candle.low, Candle.close, Candle.volume)
+        .where(Candle.interval == interval, Candle.ts >= start)
+        .order_by(Candle.symbol, Candle.ts)
+    )
+    try:
+        async with async_session() as db:
+            rows = (await db.execute(query)).all()
+    except SQLAlchemyError as e:
+        logger.warning(f"Candle store read failed: {e}")
+        return {}
+    if not rows:
+        return {}
+
+    symbols, ts, o, h, lo, c, v = (np.array(column) for column in zip(*rows))
+    starts = np.flatnonzero(np.r_[True, symbols[1:] != symbols[:-1]])
+    ends = np.r_[starts[1:], len(symbols)]
+    return {
+        str(symbols[a]): Chart(
+            symbol=str(symbols[a]),
+            timestamps=ts[a:b].astype(np.int64),
+            open=o[a:b].astype(np.float64),
+            high=h[a:b].astype(np.float64),
+            low=lo[a:b].astype(np.float64),
+            close=c[a:b].astype(np.float64),
+            volume=v[a:b].astype(np.int64),
+            gmtoffset=IST_OFFSET,
+        )
+        for a, b in zip(starts.tolist(), ends.tolist())
+    }
+
+
+async def last_bar_times(symbols: list[str], interval: str) -> dict[str, int]:
+    """Start of the newest stored bar per symbol; symbols with nothing stored are left out."""
+    return await _bar_times(symbols, interval, func.max(Candle.ts))
+
+
+async def first_bar_times(symbols: list[str], interval: str) -> dict[str, int]:
+    """Start of the oldest stored bar per symbol; symbols with nothing stored are left out."""
+    return await _bar_times(symbols, interval, func.min(Candle.ts))
+
+
+async def _bar_times(symbols: list[str], interval: str, ts) -> dict[str, int]:
+    query = (
+        select(Candle.symbol, ts)
+        .where(Candle.symbol.in_(symbols), Candle.interval == interval)
+        .group_by(Candle.symbol)
+    )
+    try:
+        async with async_session() as db:
+            return {symbol: ts for symbol, ts in (await db.execute(query)).all()}
+    except SQLAlchemyError as e:
+        logger.warning(f"Candle store read failed: {e}")
+        return {}
+
+
+async def price_ranges(symbols: list[str], interval: str, start: int) -> dict[str, tuple[float, float, int]]:
+    """Highest high, lowest low and first bar time per symbol over stored bars from ``start`` on."""
+    query = (
+        select(Candle.symbol, func.max(Candle.high), func.min(Candle.low), func.min(Candle.ts))
+        .where(Candle.symbol.in_(symbols), Candle.interval == interval, Candle.ts >= start)
+        .group_by(Candle.symbol)
+    )
+    try:
+        async with async_session() as db:
+            return {symbol: (high, low, first) for symbol, high, low, first in (await db.execute(query)).all()}
+    except SQLAlchemyError as e:
+        logger.warning(f"Candle store read failed: {e}")
+        return {}
@@ -0,0 +1,72 @@
+import re
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Iterator, Optional
+
+from app.responses import dumps
+
+CANDLE_STREAM_CHUNK = 500
+_PERIOD_DAYS = {"d": 1, "mo": 30, "y": 365}
+
+
+def candle_time(point: dict) -> int:
+    return int(datetime.fromisoformat(point["Datetime"]).timestamp())
+
+
+def period_days(period: str) -> Optional[int]:
+    """Calendar days a period like ``5d``/``6mo``/``2y`` spans; None for ``max``, ``ytd``, ..."""
+    match = re.fullmatch(r"(\d+)(d|mo|y)", period)
+    return int(match[1]) * _PERIOD_DAYS[match[2]] if match else None
+
+
+def paginate_candles(
+    data: list[dict],
+    before: Optional[int] = None,
+    after: Optional[int] = None,
+    limit: Optional[int] = None,
+) -> tuple[list[dict], dict]:
+    """Slice a time-ordered candle list by timestamp cursor.
+
+    ``before``/``after`` are exclusive unix-second bounds. With ``limit``, the
+    window is anchored at ``after`` when only that is given, otherwise at the
+    newest end so charts get the visible range first and page back in history.
+    """
+    times = [candle_time(p) for p in data]
+    start = bisect_right(times, after) if after is not None else 0
+    end = bisect_left(times, before) if before is not None else len(data)
+    end = max(start, end)
+
+    if limit is not None and end - start > limit:
+        if after is not None and before is None:
+            end = start + limit
+        else:
+            start = end - limit
+
+    window = data[start:end]
+    page = {
+        "count": len(window),
+        "next_before": times[start] if start > 0 and window else None,
+        "next_after": times[end - 1] if end < len(data) and window else None,
+    }
+    return window, page
+
+
+def clip_indicators(indicators: dict, window: list[dict]) -> dict:
+    if not window:
+        return {name: [] for name in indicators}
+    lo, hi = candle_time(window[0]), candle_time(window[-1])
+    return {
+        name: [p for p in points if lo <= p["time"] <= hi]
+        for name, points in indicators.items()
+    }
+
+
+def iter_candle_frames(meta: dict, window: list[dict], indicators: dict) -> Iterator[bytes]:
+    """NDJSON frames: a meta header, candles in fixed-size chunks, then one frame per indicator."""
+    yield dumps({"type": "meta", **meta}) + b"\n"
+    for i in range(0, len(window), CANDLE_STREAM_CHUNK):
+        chunk = window[i:i + CANDLE_STREAM_CHUNK]
+        yield dumps({"type": "candles", "data": chunk}) + b"\n"
+    for name, points in indicators.items():
+        yield dumps({"type": "indicator", "name": name, "data": points}) + b"\n"
+    yield dumps({"type": "end"}) + b"\n"
@@ -0,0 +1,72 @@
+from typing import Optional
+
+import numpy as np
+
+from app.services.resample import aggregate, chart_from_records
+
+# Point budgets for chart payloads. Candles keep their OHLC envelope by
+# aggregating runs of bars, and indicators drawn over them are thinned onto
+# the same runs so both share timestamps. Line-only series keep their visual
+# shape with Largest-Triangle-Three-Buckets, which always keeps the first and
+# last point.
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n: int) -> np.ndarray:
+    """Indices of the ``n`` points LTTB keeps from ``(x, y)``."""
+    size = len(x)
+    if n >= size or n < 3:
+        return np.arange(size)
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # n - 2 interior buckets between the fixed first and last points
+    edges = np.linspace(1, size - 1, n - 1).astype(np.int64)
+    counts = np.diff(edges)
+    mean_x = np.r_[np.add.reduceat(x, edges[:-1]) / counts, x[-1]]
+    mean_y = np.r_[np.add.reduceat(y, edges[:-1]) / counts, y[-1]]
+
+    selected = np.empty(n, dtype=np.int64)
+    selected[0], selected[-1] = 0, size - 1
+    a = 0
+    for i in range(n - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Twice the triangle area against the previous pick and the next bucket's mean
+        area = np.abs((x[a] - mean_x[i + 1]) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (mean_y[i + 1] - y[a]))
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_points(points: list[dict], max_points: Optional[int], fields: tuple[str, ...] = ("value",)) -> list[dict]:
+    """At most ``max_points`` of a ``{"time", ...}`` series, picked by LTTB on the mean of ``fields``."""
+    if not max_points or len(points) <= max_points:
+        return points
+    x = np.array([p["time"] for p in points], dtype=np.float64)
+    y = np.array([[p[f] for f in fields] for p in points], dtype=np.float64).mean(axis=1)
+    return [points[i] for i in lttb_indices(x, y, max_points).tolist()]
+
+
+def downsample_candles(records: list[dict], max_points: Optional[int]) -> list[dict]:
+    """At most ``max_points`` candles, each spanning an equal run of the originals."""
+    return downsample_chart(records, {}, max_points)[0]
+
+
+def downsample_chart(records: list[dict], indicators: dict[str, list[dict]],
+                     max_points: Optional[int]) -> tuple[list[dict], dict[str, list[dict]]]:
+    """``downsample_candles``, plus each indicator's last value per run stamped with the run's candle time."""
+    if not max_points or len(records) <= max_points:
+        return records, indicators
+    chart = chart_from_records("", records)
+    starts = np.linspace(0, len(chart), max_points, endpoint=False).astype(np.int64)
+    run_times = chart.timestamps[starts]
+    return aggregate(chart, starts).records(), {
+        name: _last_per_run(points, run_times) for name, points in indicators.items()
+    }
+
+
+def _last_per_run(points: list[dict], run_times: np.ndarray) -> list[dict]:
+    if not points:
+        return points
+    runs = np.searchsorted(run_times, [p["time"] for p in points], side="right") - 1
+    last = np.flatnonzero(np.r_[runs[1:] != runs[:-1], True])
+    return [{**points[i], "time": int(run_times[runs[i]])} for i in last.tolist() if runs[i] >= 0]
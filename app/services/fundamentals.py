@@ -0,0 +1,216 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.cache import cache_lock
+from app.config import (
+    FUNDAMENTALS_CONCURRENCY, FUNDAMENTALS_EXTRA_TTL, FUNDAMENTALS_MAX_EXTRA, FUNDAMENTALS_MISS_TTL,
+    FUNDAMENTALS_REFRESH_AT,
+    STOCK_CODES, STOCK_STORE_MAX_STALE,
+)
+from app.services.candle_store import price_ranges
+from app.services.providers import IST, market_data
+from app.services.stock_store import INFO, store_get_many, store_put_many
+from app.services.symbols import SYMBOL_MASTER
+
+logger = logging.getLogger(__name__)
+
+# A worker that loses the refresh lock reloads the winner's rows after this long
+FUNDAMENTALS_RELOAD_DELAY = 900
+# Stored daily bars must reach back to within this of a year ago to give the 52-week range
+_RANGE_SLACK = 7 * 86400
+# _lookup's answer for a symbol with nothing in memory, as opposed to a remembered miss (None)
+_UNKNOWN = object()
+
+
+def format_info(symbol: str, info: dict) -> dict:
+    return {
+        "symbol": symbol,
+        "name": info.get("longName", ""),
+        "sector": info.get("sector", ""),
+        "industry": info.get("industry", ""),
+        "market_cap": info.get("marketCap", 0),
+        "pe_ratio": info.get("trailingPE", None),
+        "week_52_high": info.get("fiftyTwoWeekHigh", None),
+        "week_52_low": info.get("fiftyTwoWeekLow", None),
+        "avg_volume": info.get("averageVolume", 0),
+        "dividend_yield": info.get("dividendYield", None),
+    }
+
+
+def seconds_until(at: str, now: Optional[datetime] = None) -> float:
+    """Seconds from ``now`` to the next ``HH:MM`` IST."""
+    now = now or datetime.now(IST)
+    hour, minute = (int(part) for part in at.split(":"))
+    target = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+    if target <= now:
+        target += timedelta(days=1)
+    return (target - now).total_seconds()
+
+
+class FundamentalsStore:
+    """Company profile and key statistics per symbol, served from memory.
+
+    Info is one of the slowest upstream calls and changes at most daily, so
+    every tracked symbol is refetched in one bulk pass at
+    ``FUNDAMENTALS_REFRESH_AT`` (IST, after the close) and kept in the
+    stock store for restarts. The 52-week range comes from the candle store
+    whenever it holds a year of daily bars.
+
+    Only ``symbols`` are kept for good and refreshed in bulk. Any other
+    symbol asked for is fetched on demand and kept in a small LRU of
+    ``max_extra`` records, each for at most ``extra_ttl`` seconds. Symbols
+    upstream has nothing for are remembered there too, for ``miss_ttl``
+    seconds, so asking again doesn't go upstream again.
+    """
+
+    def __init__(self, symbols: list[str], concurrency: int, max_extra: int = 256, extra_ttl: float = 86400,
+                 miss_ttl: float = 600):
+        self.symbols = list(dict.fromkeys(symbols))
+        self.records: dict[str, dict] = {}
+        # symbol -> (expires at, record or None for a miss)
+        self.extra: OrderedDict[str, tuple[float, Optional[dict]]] = OrderedDict()
+        self.max_extra = max_extra
+        self.extra_ttl = extra_ttl
+        self.miss_ttl = miss_ttl
+        self._tracked = set(self.symbols)
+        self.refreshed_at: Optional[datetime] = None
+        self._slots = asyncio.Semaphore(concurrency)
+        self._task: Optional[asyncio.Task] = None
+
+    async def load(self) -> int:
+        """Fill memory from the stock store, whatever the rows' age."""
+        stored = await store_get_many([(s, INFO) for s in self.symbols], None)
+        records = await self._with_price_ranges({symbol: info for (symbol, _), info in stored.items()})
+        self.records.update(records)
+        return len(records)
+
+    async def refresh(self, symbols: Optional[list[str]] = None) -> int:
+        """Refetch ``symbols`` (default: every tracked symbol); returns how many succeeded."""
+        bulk = symbols is None
+        fetched = await self._refresh(self.symbols if bulk else symbols)
+        if bulk:
+            self.refreshed_at = datetime.now(IST)
+            logger.info(f"Refreshed fundamentals for {len(fetched)}/{len(self.symbols)} symbols")
+        return len(fetched)
+
+    async def _refresh(self, symbols: list[str]) -> dict[str, dict]:
+        results = await asyncio.gather(*(self._fetch(s) for s in symbols))
+        fetched = await self._with_price_ranges({s: info for s, info in zip(symbols, results) if info})
+        await store_put_many([(symbol, INFO, info) for symbol, info in fetched.items()])
+        self._keep(fetched)
+        return fetched
+
+    async def get_many(self, symbols: list[str]) -> list[dict]:
+        """Records for ``symbols`` in order; symbols not in memory are fetched, then served from memory."""
+        records = {s: self._lookup(s) for s in symbols}
+        missing = [s for s, record in records.items() if record is _UNKNOWN]
+        if missing:
+            fetched = await self._refresh(missing)
+            # Upstream failed for these: fall back to the last stored copy
+            failed = [(s, INFO) for s in missing if s not in fetched]
+            stale = await store_get_many(failed, STOCK_STORE_MAX_STALE)
+            stale = {symbol: info for (symbol, _), info in stale.items() if info.get("name")}
+            self._keep(stale)
+            self._keep_misses([s for s in missing if s not in fetched and s not in stale])
+            records.update(fetched)
+            records.update(stale)
+        return [record for record in records.values() if isinstance(record, dict)]
+
+    async def get(self, symbol: str) -> Optional[dict]:
+        records = await self.get_many([symbol])
+        return records[0] if records else None
+
+    def _lookup(self, symbol: str):
+        """The record in memory, None for a remembered miss, or ``_UNKNOWN``."""
+        if symbol in self._tracked:
+            return self.records.get(symbol, _UNKNOWN)
+        entry = self.extra.get(symbol)
+        if entry is None:
+            return _UNKNOWN
+        if time.monotonic() > entry[0]:
+            del self.extra[symbol]
+            return _UNKNOWN
+        self.extra.move_to_end(symbol)
+        return entry[1]
+
+    def _keep(self, records: dict[str, dict]):
+        for symbol, info in records.items():
+            if symbol in self._tracked:
+                self.records[symbol] = info
+            else:
+                self._keep_extra(symbol, info, self.extra_ttl)
+
+    def _keep_misses(self, symbols: list[str]):
+        # Tracked symbols are retried by the bulk refresh instead
+        for symbol in symbols:
+            if symbol not in self._tracked:
+                self._keep_extra(symbol, None, self.miss_ttl)
+
+    def _keep_extra(self, symbol: str, info: Optional[dict], ttl: float):
+        self.extra[symbol] = (time.monotonic() + ttl, info)
+        self.extra.move_to_end(symbol)
+        if len(self.extra) > self.max_extra:
+            self.extra.popitem(last=False)
+
+    async def _fetch(self, symbol: str) -> Optional[dict]:
+        async with self._slots:
+            try:
+                info = await market_data.info(symbol)
+            except Exception as e:
+                logger.warning(f"Info fetch failed for {symbol}: {e}")
+                return None
+        # Upstream answers unknown symbols with an empty profile; that isn't worth keeping
+        if not info or not (info.get("longName") or info.get("shortName")):
+            return None
+        return format_info(symbol, info)
+
+    async def _with_price_ranges(self, records: dict[str, dict]) -> dict[str, dict]:
+        if not records:
+            return records
+        start = int(time.time()) - 365 * 86400
+        for symbol, (high, low, first) in (await price_ranges(list(records), "1d", start)).items():
+            if first <= start + _RANGE_SLACK:
+                records[symbol] = {**records[symbol], "week_52_high": round(high, 2), "week_52_low": round(low, 2)}
+        return records
+
+    async def _run(self):
+        try:
+            await self.load()
+            missing = [s for s in self.symbols if s not in self.records]
+            if missing:
+                await self.refresh(missing)
+        except Exception as e:
+            logger.error(f"Fundamentals warm-up error: {e}")
+        while True:
+            await asyncio.sleep(seconds_until(FUNDAMENTALS_REFRESH_AT))
+            try:
+                if await cache_lock("lock:fundamentals", FUNDAMENTALS_RELOAD_DELAY):
+                    await self.refresh()
+                else:
+                    await asyncio.sleep(FUNDAMENTALS_RELOAD_DELAY)
+                    await self.load()
+            except Exception as e:
+                logger.error(f"Fundamentals refresh error: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+fundamentals = FundamentalsStore(
+    STOCK_CODES + list(SYMBOL_MASTER), FUNDAMENTALS_CONCURRENCY, FUNDAMENTALS_MAX_EXTRA, FUNDAMENTALS_EXTRA_TTL,
+    FUNDAMENTALS_MISS_TTL,
+)
@@ -1,6 +1,9 @@
 import pandas as pd
+import numpy as np
 import logging
 
+from app.services.candles import candle_time
+
 logger = logging.getLogger(__name__)
 
 
@@ -9,7 +12,8 @@ def calculate_indicators(candle_data: list, indicators: list[str]) -> dict:
         return {}
 
     df = pd.DataFrame(candle_data)
-    df["time"] = pd.to_datetime(df["Datetime"]).astype(int) // 10**9
+    # Same seconds as the candles' own times (pandas may parse to ms or us resolution)
+    df["time"] = [candle_time(point) for point in candle_data]
 
     result = {}
 
@@ -68,3 +72,67 @@ def _series_to_points(time_series, value_series) -> list[dict]:
         if pd.notna(v):
             points.append({"time": int(t), "value": round(float(v), 2)})
     return points
+
+
+# Array versions of the indicators above for many series at once: each
+# function works along the last axis, so a (symbols x time) matrix gets
+# every symbol's indicator in one pass. Leading NaNs (a symbol that wasn't
+# listed yet) are skipped; results match ``ta`` on a complete series.
+# ``ema`` and ``rsi`` also take one window per row, so a parameter sweep
+# steps through time once for all of its windows.
+
+
+def sma(x: np.ndarray, window: int) -> np.ndarray:
+    valid = ~np.isnan(x)
+    total = np.cumsum(np.where(valid, x, 0.0), axis=-1)
+    count = np.cumsum(valid, axis=-1)
+    total[..., window:] = total[..., window:] - total[..., :-window]
+    count[..., window:] = count[..., window:] - count[..., :-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count == window, total / window, np.nan)
+
+
+def _ewm(x: np.ndarray, alpha: float, min_periods: int) -> np.ndarray:
+    # Recursive, so it steps through time; every series moves together
+    out = np.full(x.shape, np.nan)
+    state = np.full(x.shape[:-1], np.nan)
+    seen = np.zeros(x.shape[:-1], dtype=np.int64)
+    for t in range(x.shape[-1]):
+        value = x[..., t]
+        valid = ~np.isnan(value)
+        state = np.where(np.isnan(state), value, np.where(valid, state + alpha * (value - state), state))
+        seen += valid
+        out[..., t] = np.where(seen >= min_periods, state, np.nan)
+    return out
+
+
+def ema(x: np.ndarray, window: int | np.ndarray) -> np.ndarray:
+    return _ewm(x, 2 / (window + 1), window)
+
+
+def rsi(x: np.ndarray, window: int | np.ndarray = 14) -> np.ndarray:
+    diff = np.diff(x, axis=-1, prepend=np.nan)
+    listed = ~np.isnan(x)
+    # The first bar has no change; like ta, it counts as a zero move
+    up = np.where(listed, np.where(diff > 0, diff, 0.0), np.nan)
+    down = np.where(listed, np.where(diff < 0, -diff, 0.0), np.nan)
+    avg_up = _ewm(up, 1 / window, window)
+    avg_down = _ewm(down, 1 / window, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(avg_down == 0, 100.0, 100 - 100 / (1 + avg_up / avg_down))
+
+
+def rolling_max(x: np.ndarray, window: int) -> np.ndarray:
+    return _rolling(x, window, np.max)
+
+
+def rolling_min(x: np.ndarray, window: int) -> np.ndarray:
+    return _rolling(x, window, np.min)
+
+
+def _rolling(x: np.ndarray, window: int, reduce) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    if x.shape[-1] >= window:
+        # NaN inside a window propagates, so only fully listed windows count
+        out[..., window - 1:] = reduce(np.lib.stride_tricks.sliding_window_view(x, window, axis=-1), axis=-1)
+    return out
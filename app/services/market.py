@@ -1,8 +1,11 @@
 import asyncio
 import logging
+from typing import Optional
+from app.services.downsample import downsample_points
 from app.services.stocks import fetch_all_stocks
 from app.config import STOCK_CODES, INDEX_SYMBOLS, SECTORS
 from app.cache import cache_get_json, cache_set_json
+from app.services.refresh import refresh_scheduler
 
 logger = logging.getLogger(__name__)
 
@@ -13,6 +16,13 @@ async def get_market_overview():
     if cached:
         return cached
 
+    result = await _build_market_overview()
+    await cache_set_json(cache_key, result, 30)
+    refresh_scheduler.register(cache_key, _build_market_overview, 30)
+    return result
+
+
+async def _build_market_overview():
     stocks = await fetch_all_stocks(STOCK_CODES)
     indices = await fetch_all_stocks(INDEX_SYMBOLS)
 
@@ -23,16 +33,13 @@ async def get_market_overview():
     sorted_by_volume = sorted(stocks, key=lambda s: abs(s.get("change", 0)), reverse=True)
     most_active = sorted_by_volume[:5]
 
-    result = {
+    return {
         "indices": indices,
         "gainers": gainers,
         "losers": losers,
         "most_active": most_active,
     }
 
-    await cache_set_json(cache_key, result, 30)
-    return result
-
 
 async def get_sector_performance():
     cache_key = "market:sectors"
@@ -40,6 +47,13 @@ async def get_sector_performance():
     if cached:
         return cached
 
+    sector_data = await _build_sector_performance()
+    await cache_set_json(cache_key, sector_data, 30)
+    refresh_scheduler.register(cache_key, _build_sector_performance, 30)
+    return sector_data
+
+
+async def _build_sector_performance():
     all_stocks = await fetch_all_stocks(STOCK_CODES)
     price_map = {s["symbol"]: s for s in all_stocks}
 
@@ -53,11 +67,10 @@ async def get_sector_performance():
                 "stocks": sector_stocks,
             }
 
-    await cache_set_json(cache_key, sector_data, 30)
     return sector_data
 
 
-async def compare_stocks(symbols: list[str]):
+async def compare_stocks(symbols: list[str], max_points: Optional[int] = None):
     stocks = await fetch_all_stocks(symbols)
     candle_tasks = []
     for symbol in symbols:
@@ -81,7 +94,7 @@ async def compare_stocks(symbols: list[str]):
                 })
         comparison.append({
             "stock": stock,
-            "normalized": normalized,
+            "normalized": downsample_points(normalized, max_points),
         })
 
     return comparison
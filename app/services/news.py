@@ -1,7 +1,25 @@
 import feedparser
 import asyncio
+import calendar
+import hashlib
 import logging
-from app.cache import cache_get_json, cache_set_json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+import httpx
+from sqlalchemy import select, delete, or_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectinload
+
+from app.config import NEWS_INGEST_INTERVAL, NEWS_FETCH_TIMEOUT, NEWS_RETENTION_DAYS
+from app.database import async_session
+from app.executors import run_in
+from app.metrics import upstream_request_duration
+from app.timing import record_timing
+from app.models import NewsArticle, NewsArticleSymbol
+from app.services.symbols import SYMBOL_MASTER, match_symbols, normalize_symbol
 
 logger = logging.getLogger(__name__)
 
@@ -11,40 +29,198 @@ RSS_FEEDS = [
     {"name": "LiveMint", "url": "https://www.livemint.com/rss/markets"},
 ]
 
+USER_AGENT = "Mozilla/5.0 (compatible; MarketValues/1.0)"
+
+
+def _observe_fetch(outcome: str, start_ns: int):
+    elapsed_ns = time.perf_counter_ns() - start_ns
+    upstream_request_duration.labels("rss", outcome).observe(elapsed_ns / 1e9)
+    record_timing("upstream", elapsed_ns)
 
-def _fetch_feeds_sync(limit: int = 20, symbol: str | None = None) -> list[dict]:
+
+def _parse_entries(content: bytes, source: str) -> list[dict]:
+    feed = feedparser.parse(content)
+    now = datetime.now(timezone.utc)
     articles = []
-    for feed_info in RSS_FEEDS:
+    for entry in feed.entries:
+        link = entry.get("link", "")
+        guid = entry.get("id") or link
+        if not guid:
+            continue
+        parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+        published_at = datetime.fromtimestamp(calendar.timegm(parsed), timezone.utc) if parsed else now
+        articles.append({
+            "guid": hashlib.sha1(guid.encode()).hexdigest(),
+            "title": entry.get("title", ""),
+            "link": link,
+            "published": entry.get("published", ""),
+            "published_at": published_at,
+            "source": source,
+            "summary": entry.get("summary", "")[:200],
+        })
+    return articles
+
+
+class NewsIngester:
+    """Polls the RSS feeds in the background and stores new articles."""
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._transport = transport
+        self._validators: Dict[str, dict] = {}  # url -> {"etag", "last_modified"}
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.last_run: Optional[datetime] = None
+
+    async def _fetch_feed(self, client: httpx.AsyncClient, feed_info: dict) -> tuple[list[dict], Optional[dict]]:
+        """New articles and the response's validators (None when nothing new was fetched)."""
+        url = feed_info["url"]
+        headers = {}
+        validators = self._validators.get(url, {})
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        start = time.perf_counter_ns()
         try:
-            feed = feedparser.parse(feed_info["url"])
-            for entry in feed.entries[:10]:
-                article = {
-                    "title": entry.get("title", ""),
-                    "link": entry.get("link", ""),
-                    "published": entry.get("published", ""),
-                    "source": feed_info["name"],
-                    "summary": entry.get("summary", "")[:200],
-                }
-                if symbol:
-                    name = symbol.replace(".NS", "").lower()
-                    text = (article["title"] + " " + article["summary"]).lower()
-                    if name not in text:
-                        continue
-                articles.append(article)
-        except Exception as e:
+            response = await client.get(url, headers=headers)
+        except httpx.HTTPError as e:
+            _observe_fetch("error", start)
             logger.warning(f"Error fetching feed {feed_info['name']}: {e}")
+            return [], None
+        _observe_fetch("ok" if response.status_code in (200, 304) else "error", start)
 
-    return articles[:limit]
+        if response.status_code == 304:
+            return [], None
+        if response.status_code != 200:
+            logger.warning(f"Feed {feed_info['name']} returned {response.status_code}")
+            return [], None
 
+        articles = await run_in("news", _parse_entries, response.content, feed_info["name"])
+        validators = {"etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified")}
+        return articles, validators
 
-async def fetch_news(limit: int = 20, symbol: str | None = None) -> list[dict]:
-    cache_key = f"news:{symbol or 'all'}:{limit}"
-    cached = await cache_get_json(cache_key)
-    if cached:
-        return cached
+    async def ingest(self, db: Optional[AsyncSession] = None) -> int:
+        async with self._lock:
+            async with httpx.AsyncClient(
+                timeout=NEWS_FETCH_TIMEOUT,
+                follow_redirects=True,
+                headers={"User-Agent": USER_AGENT},
+                transport=self._transport,
+            ) as client:
+                results = await asyncio.gather(*(self._fetch_feed(client, f) for f in RSS_FEEDS))
 
-    loop = asyncio.get_running_loop()
-    articles = await loop.run_in_executor(None, _fetch_feeds_sync, limit, symbol)
+            articles = list({a["guid"]: a for batch, _ in results for a in batch}.values())
+            if db is not None:
+                added = await store_articles(db, articles)
+            else:
+                async with async_session() as session:
+                    added = await store_articles(session, articles)
+            # Only once the articles are stored: a 304 on the next poll must not skip any
+            for feed_info, (_, validators) in zip(RSS_FEEDS, results):
+                if validators is not None:
+                    self._validators[feed_info["url"]] = validators
+            self.last_run = datetime.now(timezone.utc)
+            if added:
+                logger.info(f"Ingested {added} new news articles")
+            return added
 
-    await cache_set_json(cache_key, articles, 300)
-    return articles
+    async def _run(self):
+        while True:
+            try:
+                await self.ingest()
+            except Exception as e:
+                logger.error(f"News ingestion error: {e}")
+            await asyncio.sleep(NEWS_INGEST_INTERVAL)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+async def store_articles(db: AsyncSession, articles: list[dict]) -> int:
+    cutoff = datetime.now(timezone.utc) - timedelta(days=NEWS_RETENTION_DAYS)
+    expired = select(NewsArticle.id).where(NewsArticle.published_at < cutoff)
+    await db.execute(delete(NewsArticleSymbol).where(NewsArticleSymbol.article_id.in_(expired)))
+    await db.execute(delete(NewsArticle).where(NewsArticle.published_at < cutoff))
+
+    new = []
+    if articles:
+        guids = [a["guid"] for a in articles]
+        result = await db.execute(select(NewsArticle.guid).where(NewsArticle.guid.in_(guids)))
+        existing = set(result.scalars().all())
+        for a in articles:
+            if a["guid"] in existing or a["published_at"] < cutoff:
+                continue
+            article = NewsArticle(**a)
+            article.symbols = [
+                NewsArticleSymbol(symbol=s) for s in match_symbols(f"{a['title']} {a['summary']}")
+            ]
+            new.append(article)
+        db.add_all(new)
+
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Another worker stored the same articles first
+        await db.rollback()
+        return 0
+    return len(new)
+
+
+async def fetch_news(db: AsyncSession, limit: int = 20, symbols: list[str] | None = None) -> list[dict]:
+    if news_ingester.last_run is None:
+        # Ingester has not completed a pass yet (e.g. first request after startup)
+        try:
+            await news_ingester.ingest(db)
+        except Exception as e:
+            logger.warning(f"On-demand news ingestion failed: {e}")
+
+    query = (
+        select(NewsArticle)
+        .options(selectinload(NewsArticle.symbols))
+        .order_by(NewsArticle.published_at.desc(), NewsArticle.id.desc())
+    )
+    if symbols:
+        query = query.where(_symbol_filter([normalize_symbol(s) for s in symbols]))
+
+    result = await db.execute(query.limit(limit))
+    return [
+        {
+            "title": a.title,
+            "link": a.link,
+            "published": a.published,
+            "source": a.source,
+            "summary": a.summary,
+            "symbols": sorted(s.symbol for s in a.symbols),
+        }
+        for a in result.scalars().all()
+    ]
+
+
+def _symbol_filter(symbols: list[str]):
+    # Symbols in the master are resolved through the inverted index; anything
+    # else falls back to a substring match on the article text.
+    indexed = [s for s in symbols if s in SYMBOL_MASTER]
+    conditions = []
+    if indexed:
+        conditions.append(NewsArticle.id.in_(
+            select(NewsArticleSymbol.article_id).where(NewsArticleSymbol.symbol.in_(indexed))
+        ))
+    for symbol in symbols:
+        if symbol not in SYMBOL_MASTER:
+            pattern = f"%{symbol.replace('.NS', '')}%"
+            conditions.append(or_(NewsArticle.title.ilike(pattern), NewsArticle.summary.ilike(pattern)))
+    return or_(*conditions)
+
+
+news_ingester = NewsIngester()
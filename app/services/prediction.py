@@ -1,4 +1,3 @@
-import asyncio
 import logging
 import os
 import re
@@ -11,6 +10,11 @@ import pandas as pd
 import yfinance as yf
 
 from app.cache import cache_get_json, cache_set_json
+from app.config import STOCK_STORE_MAX_STALE
+from app.executors import run_in
+from app.metrics import model_training_duration
+from app.services.stock_store import prediction_series, store_get, store_put
+from app.services.upstream import yahoo
 
 logger = logging.getLogger(__name__)
 
@@ -30,9 +34,7 @@ def _symbol_to_filename(symbol: str) -> str:
 MIN_LOOK_BACK = 20
 
 
-def _train_and_predict(symbol: str, forecast_days: int) -> dict:
-    from sklearn.preprocessing import MinMaxScaler
-
+def _fetch_history(symbol: str) -> pd.DataFrame:
     # Try progressively shorter periods to handle stocks with limited history
     ticker = yf.Ticker(symbol)
     df = pd.DataFrame()
@@ -40,6 +42,11 @@ def _train_and_predict(symbol: str, forecast_days: int) -> dict:
         df = ticker.history(period=period)
         if not df.empty:
             break
+    return df
+
+
+def _train_and_predict(symbol: str, df: pd.DataFrame, forecast_days: int) -> dict:
+    from sklearn.preprocessing import MinMaxScaler
 
     if df.empty:
         raise ValueError(f"No data found for {symbol}. Check the symbol is valid on Yahoo Finance.")
@@ -94,13 +101,14 @@ def _train_and_predict(symbol: str, forecast_days: int) -> dict:
             tf.keras.layers.Dense(1),
         ])
         model.compile(optimizer="adam", loss="mean_squared_error")
-        model.fit(
-            X, y,
-            epochs=EPOCHS,
-            batch_size=BATCH_SIZE,
-            validation_split=0.1,
-            verbose=0,
-        )
+        with model_training_duration.time():
+            model.fit(
+                X, y,
+                epochs=EPOCHS,
+                batch_size=BATCH_SIZE,
+                validation_split=0.1,
+                verbose=0,
+            )
         os.makedirs(MODELS_DIR, exist_ok=True)
         model.save(model_path)
         logger.info(f"Trained and saved model for {symbol} (look_back={look_back})")
@@ -180,12 +188,24 @@ async def predict_stock(symbol: str, forecast_days: int = 14) -> Optional[dict]:
         logger.info(f"Returning cached prediction for {symbol}")
         return cached
 
-    loop = asyncio.get_running_loop()
+    series = prediction_series(forecast_days)
+    try:
+        df = await yahoo.call(_fetch_history, symbol)
+    except Exception as e:
+        # Serve the last prediction we made while Yahoo is throttling or down
+        stale = await store_get(symbol, series, STOCK_STORE_MAX_STALE)
+        if stale is None:
+            logger.error(f"Prediction failed for {symbol}: {e}")
+            raise
+        logger.warning(f"History fetch failed for {symbol}, serving stored prediction: {e}")
+        return stale
+
     try:
-        result = await loop.run_in_executor(None, _train_and_predict, symbol, forecast_days)
+        result = await run_in("ml", _train_and_predict, symbol, df, forecast_days)
     except Exception as e:
         logger.error(f"Prediction failed for {symbol}: {e}")
         raise
 
+    await store_put(symbol, series, result)
     await cache_set_json(cache_key, result, CACHE_TTL_PREDICTION)
     return result
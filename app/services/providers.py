@@ -0,0 +1,323 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from app.config import (
+    MARKET_DATA_HEDGE_DELAY,
+    MARKET_DATA_LATENCY_ALPHA,
+    UPSTOX_BREAKER_RESET,
+    UPSTOX_BREAKER_THRESHOLD,
+    YAHOO_BATCH_SIZE,
+)
+from app.exceptions import UpstreamUnavailable
+from app.executors import run_in
+from app.metrics import provider_hedges, provider_requests
+from app.services.candles import period_days
+from app.services.symbols import instrument_key, symbol_for_instrument
+from app.services.upstox import get_historical_candles, get_intraday_candles, get_market_quote
+from app.services.upstream import CircuitBreaker, yahoo
+from app.services.yahoo import Chart, yahoo_client
+
+logger = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Every provider returns the same shapes: quotes as {symbol: quote dict},
+# candles as the list of {"Datetime", "Open", ...} records the API serves,
+# info as a flat dict with yfinance ``Ticker.info`` keys.
+
+
+class Provider:
+    name = ""
+    breaker: CircuitBreaker
+
+    @property
+    def healthy(self) -> bool:
+        return self.breaker.state != CircuitBreaker.OPEN
+
+    def supports(self, operation: str, *args) -> bool:
+        return True
+
+    async def quotes(self, symbols: List[str]) -> Dict[str, dict]:
+        raise NotImplementedError
+
+    async def candles(self, symbol: str, interval: str, period: str) -> Optional[list]:
+        raise NotImplementedError
+
+    async def info(self, symbol: str) -> dict:
+        raise NotImplementedError
+
+
+def _quote(symbol: str, price: float, previous_close: float) -> dict:
+    change = price - previous_close
+    percent_change = (change / previous_close) * 100 if previous_close else 0
+    return {
+        "symbol": symbol,
+        "current_price": round(float(price), 2),
+        "previous_close": round(float(previous_close), 2),
+        "change": round(float(change), 2),
+        "percent_change": round(float(percent_change), 2),
+    }
+
+
+def _chart_quote(chart: Chart) -> Optional[dict]:
+    if not len(chart):
+        return None
+    previous_close = chart.close[-2] if len(chart) > 1 else chart.close[-1]
+    return _quote(chart.symbol, chart.close[-1], previous_close)
+
+
+class YahooProvider(Provider):
+    name = "yahoo"
+    breaker = yahoo.breaker
+
+    async def quotes(self, symbols: List[str]) -> Dict[str, dict]:
+        batches = [symbols[i:i + YAHOO_BATCH_SIZE] for i in range(0, len(symbols), YAHOO_BATCH_SIZE)]
+        results = await asyncio.gather(*(self._quote_batch(batch) for batch in batches))
+        return {symbol: quote for batch in results for symbol, quote in batch.items()}
+
+    async def _quote_batch(self, symbols: List[str]) -> Dict[str, dict]:
+        try:
+            charts = await yahoo.call(yahoo_client.spark, symbols)
+        except Exception as e:
+            logger.warning(f"Quote fetch failed for {','.join(symbols)}: {e}")
+            return {}
+        quotes = {symbol: _chart_quote(chart) for symbol, chart in charts.items()}
+        return {symbol: quote for symbol, quote in quotes.items() if quote}
+
+    async def candles(self, symbol: str, interval: str, period: str) -> Optional[list]:
+        chart = await yahoo.call(yahoo_client.chart, symbol, interval, period)
+        if chart is None or not len(chart):
+            return None
+        return chart.records()
+
+    async def info(self, symbol: str) -> dict:
+        return await yahoo.call(yahoo_client.info, symbol)
+
+
+# Upstox history has no 5m/15m/1h bars. For each supported interval: the
+# history interval, and the intraday interval that supplies today's bars.
+UPSTOX_INTERVALS = {
+    "1m": ("1minute", "1minute"),
+    "1d": ("day", "30minute"),
+}
+def _upstox_records(rows: list) -> list[dict]:
+    # Rows are [timestamp, open, high, low, close, volume, oi], newest first
+    return [
+        {"Datetime": row[0].replace("T", " "), "Open": row[1], "High": row[2],
+         "Low": row[3], "Close": row[4], "Volume": int(row[5])}
+        for row in reversed(rows)
+    ]
+
+
+def _session_bar(records: list[dict]) -> dict:
+    day = records[0]["Datetime"][:10]
+    return {
+        "Datetime": f"{day} 00:00:00+05:30",
+        "Open": records[0]["Open"],
+        "High": max(r["High"] for r in records),
+        "Low": min(r["Low"] for r in records),
+        "Close": records[-1]["Close"],
+        "Volume": sum(r["Volume"] for r in records),
+    }
+
+
+# One breaker per access token: the SDK returns None for an expired or
+# revoked token as well as for an outage, so a shared breaker would let a
+# few bad tokens take Upstox away from every other user
+_upstox_breakers: "OrderedDict[str, CircuitBreaker]" = OrderedDict()
+_MAX_UPSTOX_BREAKERS = 1024
+
+
+def upstox_breaker(access_token: str) -> CircuitBreaker:
+    breaker = _upstox_breakers.pop(access_token, None)
+    if breaker is None:
+        breaker = CircuitBreaker(UPSTOX_BREAKER_THRESHOLD, UPSTOX_BREAKER_RESET)
+    _upstox_breakers[access_token] = breaker
+    while len(_upstox_breakers) > _MAX_UPSTOX_BREAKERS:
+        _upstox_breakers.popitem(last=False)
+    return breaker
+
+
+class UpstoxProvider(Provider):
+    """Quotes and 1m/1d candles from Upstox with one user's access token."""
+
+    name = "upstox"
+
+    def __init__(self, access_token: str):
+        self.access_token = access_token
+        self.breaker = upstox_breaker(access_token)
+
+    def supports(self, operation: str, *args) -> bool:
+        if operation == "candles":
+            _, interval, period = args
+            return interval in UPSTOX_INTERVALS and period_days(period) is not None
+        return operation == "quotes"
+
+    async def _call(self, fn, *args):
+        if not self.breaker.allow():
+            raise UpstreamUnavailable(self.name)
+        # The SDK wrappers log API errors and return None
+        result = await run_in("market_data", fn, self.access_token, *args)
+        if result is None:
+            self.breaker.record_failure()
+            raise UpstreamUnavailable(self.name)
+        self.breaker.record_success()
+        return result
+
+    async def quotes(self, symbols: List[str]) -> Dict[str, dict]:
+        keys = {instrument_key(s): s for s in symbols}
+        data = await self._call(get_market_quote, ",".join(keys))
+        quotes = {}
+        for key, quote in data.items():
+            symbol = keys.get(quote.get("instrument_token")) or symbol_for_instrument(key)
+            if symbol not in symbols:
+                continue
+            price = quote.get("last_price") or 0
+            net_change = quote.get("net_change")
+            if net_change is not None:
+                previous_close = price - net_change
+            else:
+                previous_close = (quote.get("ohlc") or {}).get("close", price)
+            quotes[symbol] = _quote(symbol, price, previous_close)
+        return quotes
+
+    async def candles(self, symbol: str, interval: str, period: str) -> Optional[list]:
+        history_interval, intraday_interval = UPSTOX_INTERVALS[interval]
+        key = instrument_key(symbol)
+        today = datetime.now(IST).date()
+        start = today - timedelta(days=period_days(period))
+
+        history, intraday = await asyncio.gather(
+            self._call(get_historical_candles, key, history_interval, start.isoformat(), today.isoformat()),
+            self._call(get_intraday_candles, key, intraday_interval),
+        )
+        records = _upstox_records(history)
+        today_records = _upstox_records(intraday)
+        if today_records:
+            if interval == "1d":
+                today_records = [_session_bar(today_records)]
+            last = records[-1]["Datetime"] if records else ""
+            records.extend(r for r in today_records if r["Datetime"] > last)
+        return records or None
+
+
+class MarketData:
+    """Routes reads across providers: healthy ones first, then by observed latency.
+
+    A provider that errors or returns nothing falls through to the next. With
+    ``hedge_delay`` set, a read still unanswered after that long is raced
+    against the next provider and the loser is cancelled.
+    """
+
+    def __init__(self, default: List[Provider], hedge_delay: float = 0.0):
+        self.default = default
+        self.hedge_delay = hedge_delay
+        self.latency: Dict[str, float] = {}  # provider name -> moving average, seconds
+
+    def providers(self, upstox_token: Optional[str] = None) -> List[Provider]:
+        if upstox_token:
+            return [UpstoxProvider(upstox_token), *self.default]
+        return list(self.default)
+
+    def rank(self, providers: List[Provider], operation: str, *args) -> List[Provider]:
+        eligible = [p for p in providers if p.supports(operation, *args)]
+        # Unmeasured providers sort as fastest so each gets sampled
+        return sorted(eligible, key=lambda p: (not p.healthy, self.latency.get(p.name, 0.0)))
+
+    async def _attempt(self, provider: Provider, operation: str, *args):
+        start = time.perf_counter()
+        try:
+            result = await getattr(provider, operation)(*args)
+        except Exception:
+            provider_requests.labels(provider.name, operation, "error").inc()
+            raise
+        elapsed = time.perf_counter() - start
+        average = self.latency.get(provider.name, elapsed)
+        self.latency[provider.name] = average + MARKET_DATA_LATENCY_ALPHA * (elapsed - average)
+        provider_requests.labels(provider.name, operation, "ok" if result else "empty").inc()
+        return result
+
+    async def _first(self, ranked: List[Provider], operation: str, *args):
+        """(provider, result) for the first non-empty answer, or (None, None)."""
+        queue = list(ranked)
+        pending: Dict[asyncio.Task, Provider] = {}
+        error: Optional[Exception] = None
+        hedge = False
+        try:
+            while queue or pending:
+                if queue and (hedge or not pending):
+                    if hedge:
+                        provider_hedges.labels(operation).inc()
+                    provider = queue.pop(0)
+                    pending[asyncio.create_task(self._attempt(provider, operation, *args))] = provider
+                timeout = self.hedge_delay if self.hedge_delay > 0 and queue else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                hedge = not done
+                for task in done:
+                    provider = pending.pop(task)
+                    if task.exception() is not None:
+                        error = task.exception()
+                        logger.warning(f"{provider.name} {operation} failed: {error}")
+                    elif task.result():
+                        return provider, task.result()
+            if error is not None:
+                raise error
+            return None, None
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def quotes(self, symbols: List[str], providers: Optional[List[Provider]] = None) -> Dict[str, dict]:
+        ranked = self.rank(providers or self.default, "quotes")
+        try:
+            winner, quotes = await self._first(ranked, "quotes", symbols)
+        except Exception:
+            return {}
+        quotes = dict(quotes or {})
+        if winner is None:
+            return quotes
+
+        # Symbols the answering provider didn't cover come from the ones after it
+        for provider in ranked[ranked.index(winner) + 1:]:
+            missing = [s for s in symbols if s not in quotes]
+            if not missing:
+                break
+            try:
+                quotes.update(await self._attempt(provider, "quotes", missing) or {})
+            except Exception as e:
+                logger.warning(f"{provider.name} quotes failed: {e}")
+        return quotes
+
+    async def candles(self, symbol: str, interval: str, period: str,
+                      providers: Optional[List[Provider]] = None) -> Optional[list]:
+        ranked = self.rank(providers or self.default, "candles", symbol, interval, period)
+        _, data = await self._first(ranked, "candles", symbol, interval, period)
+        return data
+
+    async def info(self, symbol: str, providers: Optional[List[Provider]] = None) -> dict:
+        ranked = self.rank(providers or self.default, "info", symbol)
+        _, data = await self._first(ranked, "info", symbol)
+        return data or {}
+
+    def stats(self) -> dict:
+        healthy = {p.name: p.healthy for p in self.default}
+        # Upstox has a breaker per token: it's down only if every token seen is
+        open_breakers = sum(b.state == CircuitBreaker.OPEN for b in _upstox_breakers.values())
+        healthy.setdefault(UpstoxProvider.name, open_breakers < len(_upstox_breakers) or not _upstox_breakers)
+        stats = {
+            name: {
+                "healthy": ok,
+                "latency_ms": round(self.latency[name] * 1000, 1) if name in self.latency else None,
+            }
+            for name, ok in healthy.items()
+        }
+        stats[UpstoxProvider.name]["open_breakers"] = open_breakers
+        return stats
+
+
+yahoo_provider = YahooProvider()
+market_data = MarketData([yahoo_provider], MARKET_DATA_HEDGE_DELAY)
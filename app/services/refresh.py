@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, Set
+
+from app.cache import key_hits, get_redis, cache_ttl, cache_lock, cache_set_json
+from app.config import (
+    CACHE_REFRESH_INTERVAL,
+    CACHE_REFRESH_AHEAD_RATIO,
+    CACHE_REFRESH_HIT_DECAY,
+    CACHE_REFRESH_MIN_SCORE,
+    CACHE_REFRESH_MAX_KEYS,
+    CACHE_WARM_KEYS,
+)
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[], Awaitable]
+
+
+@dataclass
+class _Entry:
+    loader: Loader
+    ttl: int
+    score: float = 0.0
+
+
+class RefreshAheadScheduler:
+    """Re-fetches popular cache keys in the background shortly before they expire."""
+
+    def __init__(self):
+        self._entries: Dict[str, _Entry] = {}
+        self._inflight: Set[str] = set()
+        self._task: Optional[asyncio.Task] = None
+
+    def register(self, key: str, loader: Loader, ttl: int):
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.loader = loader
+            entry.ttl = ttl
+            return
+        if len(self._entries) >= CACHE_REFRESH_MAX_KEYS:
+            coldest = min(self._entries, key=lambda k: self._entries[k].score)
+            del self._entries[coldest]
+        self._entries[key] = _Entry(loader=loader, ttl=ttl)
+
+    def is_popular(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and entry.score >= CACHE_REFRESH_MIN_SCORE
+
+    def _update_scores(self):
+        # Exponentially decayed hit count, so popularity follows recent traffic
+        for key, entry in self._entries.items():
+            entry.score = entry.score * CACHE_REFRESH_HIT_DECAY + key_hits.get(key, 0)
+        key_hits.clear()
+
+    async def refresh(self, key: str) -> bool:
+        entry = self._entries.get(key)
+        if entry is None or key in self._inflight:
+            return False
+        # Only one worker refreshes a given key per cycle
+        if not await cache_lock(f"lock:refresh:{key}", max(1, int(entry.ttl * CACHE_REFRESH_AHEAD_RATIO))):
+            return False
+
+        self._inflight.add(key)
+        try:
+            value = await entry.loader()
+            if value:
+                await cache_set_json(key, value, entry.ttl)
+                return True
+        except Exception as e:
+            logger.warning(f"Refresh-ahead failed for {key}: {e}")
+        finally:
+            self._inflight.discard(key)
+        return False
+
+    async def tick(self) -> list[str]:
+        self._update_scores()
+        if await get_redis() is None:
+            return []
+
+        due = []
+        for key, entry in list(self._entries.items()):
+            if entry.score < CACHE_REFRESH_MIN_SCORE:
+                continue
+            remaining = await cache_ttl(key)
+            if remaining is None or remaining <= entry.ttl * CACHE_REFRESH_AHEAD_RATIO:
+                due.append(key)
+
+        if due:
+            await asyncio.gather(*(self.refresh(key) for key in due))
+        return due
+
+    async def warm(self, keys: list[str]):
+        pending = [(key, _warm_loader(key)) for key in keys]
+        pending = [(key, loader) for key, loader in pending if loader is not None]
+        results = await asyncio.gather(*(loader() for _, loader in pending), return_exceptions=True)
+        for (key, _), result in zip(pending, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Cache warm-up failed for {key}: {result}")
+        logger.info(f"Warmed {len(pending)} cache keys")
+
+    async def _run(self):
+        await self.warm(CACHE_WARM_KEYS)
+        while True:
+            await asyncio.sleep(CACHE_REFRESH_INTERVAL)
+            try:
+                await self.tick()
+            except Exception as e:
+                logger.error(f"Refresh-ahead tick error: {e}")
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+def _warm_loader(key: str) -> Optional[Loader]:
+    """Map a configured warm-up key onto the cached service call that fills it."""
+    from app.config import STOCK_CODES
+    from app.services import market, stocks
+
+    parts = key.split(":")
+    if key == "market:overview":
+        return market.get_market_overview
+    if key == "market:sectors":
+        return market.get_sector_performance
+    if parts[0] == "stocks" and parts[1:2] == ["live"]:
+        symbols = parts[2].split(",") if len(parts) > 2 else STOCK_CODES
+        return lambda: stocks.fetch_all_stocks(symbols)
+    if parts[0] == "candles" and len(parts) == 4:
+        return lambda: stocks.get_candlestick_data_cached(parts[1], parts[2], parts[3])
+
+    logger.warning(f"Unknown cache warm-up key: {key}")
+    return None
+
+
+refresh_scheduler = RefreshAheadScheduler()
@@ -0,0 +1,142 @@
+import re
+from datetime import datetime
+from typing import Optional
+
+import numpy as np
+
+from app.services.candles import candle_time, period_days
+from app.services.ticks import IST_OFFSET, SESSION_CLOSE, SESSION_OPEN
+from app.services.yahoo import Chart
+
+# Intraday bar lengths; coarser intervals are grouped by calendar instead
+INTRADAY_STEPS = {"1m": 60, "5m": 300, "15m": 900, "1h": 3600}
+
+
+def _record_times(stamps: list[str]) -> np.ndarray:
+    offsets = {s[19:] for s in stamps}
+    if len(offsets) != 1:
+        return np.array([candle_time({"Datetime": s}) for s in stamps], dtype=np.int64)
+    # One UTC offset throughout (the usual case): let NumPy parse the local times
+    local = np.array([s[:19] for s in stamps], dtype="datetime64[s]").astype(np.int64)
+    offset = datetime.fromisoformat(stamps[0]).utcoffset() if stamps else None
+    return local - (int(offset.total_seconds()) if offset else 0)
+
+
+def chart_from_records(symbol: str, records: list[dict]) -> Chart:
+    """Candle records (the API format) back into column arrays."""
+    prices = np.array(
+        [(r["Open"], r["High"], r["Low"], r["Close"]) for r in records], dtype=np.float64,
+    ).reshape(-1, 4)
+    return Chart(
+        symbol=symbol,
+        timestamps=_record_times([r["Datetime"] for r in records]),
+        open=prices[:, 0],
+        high=prices[:, 1],
+        low=prices[:, 2],
+        close=prices[:, 3],
+        volume=np.array([r["Volume"] or 0 for r in records], dtype=np.int64),
+        gmtoffset=IST_OFFSET,
+    )
+
+
+def concat(older: Chart, newer: Chart) -> Chart:
+    return Chart(
+        symbol=newer.symbol,
+        timestamps=np.concatenate([older.timestamps, newer.timestamps]),
+        open=np.concatenate([older.open, newer.open]),
+        high=np.concatenate([older.high, newer.high]),
+        low=np.concatenate([older.low, newer.low]),
+        close=np.concatenate([older.close, newer.close]),
+        volume=np.concatenate([older.volume, newer.volume]),
+        gmtoffset=newer.gmtoffset,
+        previous_close=older.previous_close,
+    )
+
+
+def _take(chart: Chart, mask: np.ndarray) -> Chart:
+    return Chart(
+        symbol=chart.symbol,
+        timestamps=chart.timestamps[mask],
+        open=chart.open[mask],
+        high=chart.high[mask],
+        low=chart.low[mask],
+        close=chart.close[mask],
+        volume=chart.volume[mask],
+        gmtoffset=chart.gmtoffset,
+        previous_close=chart.previous_close,
+    )
+
+
+def window(chart: Chart, period: str) -> Chart:
+    """The trailing ``period`` of a series, anchored at its newest bar.
+
+    ``Nd`` means the last N sessions, as Yahoo counts it; months and years
+    are calendar spans.
+    """
+    if not len(chart):
+        return chart
+    match = re.fullmatch(r"(\d+)(d|mo|y)", period)
+    if match is None:
+        return chart
+    if match[2] == "d":
+        days = (chart.timestamps + IST_OFFSET) // 86400
+        sessions = np.unique(days)
+        return _take(chart, days >= sessions[-min(int(match[1]), len(sessions))])
+    cutoff = chart.timestamps[-1] - period_days(period) * 86400
+    return _take(chart, chart.timestamps >= cutoff)
+
+
+def _group_keys(timestamps: np.ndarray, interval: str) -> tuple[np.ndarray, np.ndarray]:
+    """Bucket key per bar and a mask of the bars that belong to a bucket at all."""
+    local = timestamps + IST_OFFSET
+    step = INTRADAY_STEPS.get(interval)
+    if step is not None:
+        # Same alignment as live bars: buckets count from the 09:15 open
+        into = local % 86400 - SESSION_OPEN
+        keep = (into >= 0) & (into < SESSION_CLOSE - SESSION_OPEN)
+        return timestamps - into % step, keep
+    keep = np.ones(len(timestamps), dtype=bool)
+    days = local // 86400
+    if interval == "1d":
+        return days, keep
+    if interval == "1wk":
+        return (days + 3) // 7, keep  # day 0 was a Thursday, so weeks start on Monday
+    if interval == "1mo":
+        return local.astype("datetime64[s]").astype("datetime64[M]").astype(np.int64), keep
+    raise ValueError(f"Cannot resample to {interval}")
+
+
+def resample(chart: Chart, interval: str) -> Chart:
+    """Aggregate a finer, time-ordered series into ``interval`` bars.
+
+    Intraday bars start at their session-aligned bucket; daily and coarser
+    bars keep the time of their first base bar, as upstream stamps them.
+    """
+    keys, keep = _group_keys(chart.timestamps, interval)
+    if not keep.all():
+        chart, keys = _take(chart, keep), keys[keep]
+    if not len(chart):
+        return chart
+
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return aggregate(chart, starts, keys if interval in INTRADAY_STEPS else None)
+
+
+def aggregate(chart: Chart, starts: np.ndarray, stamps: Optional[np.ndarray] = None) -> Chart:
+    """One bar per run of bars beginning at each index in ``starts`` (ascending, from 0).
+
+    Bars are stamped with ``stamps`` at the run starts, or the first bar's own time.
+    """
+    ends = np.r_[starts[1:], len(chart)] - 1
+    stamps = chart.timestamps if stamps is None else stamps
+    return Chart(
+        symbol=chart.symbol,
+        timestamps=stamps[starts],
+        open=chart.open[starts],
+        high=np.fmax.reduceat(chart.high, starts),
+        low=np.fmin.reduceat(chart.low, starts),
+        close=chart.close[ends],
+        volume=np.add.reduceat(chart.volume, starts),
+        gmtoffset=chart.gmtoffset,
+        previous_close=chart.previous_close,
+    )
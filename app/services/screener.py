@@ -0,0 +1,315 @@
+import ast
+import asyncio
+import logging
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Callable, Optional
+
+import numpy as np
+
+from app.config import (
+    SCREENER_FETCH_CONCURRENCY, SCREENER_MAX_AGE, SCREENER_MAX_FIELDS, SCREENER_SESSIONS, STOCK_CODES,
+)
+from app.exceptions import InvalidScreen
+from app.executors import run_in
+from app.services import indicators
+from app.services.candle_store import candles_read_all
+from app.services.providers import IST
+from app.services.resample import chart_from_records
+from app.services.ticks import IST_OFFSET
+from app.services.yahoo import Chart
+
+logger = logging.getLogger(__name__)
+
+MAX_EXPRESSION_LENGTH = 500
+# Computed with every rebuild, off the event loop, so common screens never pay for them
+WARM_FIELDS = ("change", "sma_50", "sma_200", "rsi_14")
+PRICE_FIELDS = ("open", "high", "low", "close", "volume")
+# name_N fields and how to compute them from the price matrices
+WINDOW_FIELDS: dict[str, Callable] = {
+    "sma": lambda m, n: indicators.sma(m["close"], n),
+    "ema": lambda m, n: indicators.ema(m["close"], n),
+    "rsi": lambda m, n: indicators.rsi(m["close"], n),
+    "high": lambda m, n: indicators.rolling_max(m["high"], n),
+    "low": lambda m, n: indicators.rolling_min(m["low"], n),
+    "avgvol": lambda m, n: indicators.sma(m["volume"], n),
+    "roc": lambda m, n: _pct_change(m["close"], n),
+}
+_WINDOW_FIELD = re.compile(r"([a-z]+)_(\d+)")
+
+_COMPARE = {
+    ast.Gt: np.greater, ast.GtE: np.greater_equal, ast.Lt: np.less,
+    ast.LtE: np.less_equal, ast.Eq: np.equal, ast.NotEq: np.not_equal,
+}
+_ARITHMETIC = {ast.Add: np.add, ast.Sub: np.subtract, ast.Mult: np.multiply, ast.Div: np.divide}
+
+
+def _pct_change(x: np.ndarray, n: int) -> np.ndarray:
+    out = np.full(x.shape, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out[..., n:] = (x[..., n:] / x[..., :-n] - 1) * 100
+    return out
+
+
+@dataclass
+class Universe:
+    """Daily bars for every screened symbol on one shared session axis (symbols x sessions)."""
+
+    symbols: list[str]
+    days: np.ndarray  # IST days since epoch, one per column
+    prices: dict[str, np.ndarray]
+    built_at: float = field(default_factory=time.monotonic)
+    # Warm fields, filled before the universe is published and kept until the next rebuild
+    _fields: dict[str, np.ndarray] = field(default_factory=dict)
+    # Any other field a screen used, least recently used first
+    _cold: "OrderedDict[str, np.ndarray]" = field(default_factory=OrderedDict)
+
+    def compute(self, names: list[str]) -> dict[str, np.ndarray]:
+        """Matrices for window fields, without touching the cache (safe to run in a worker thread)."""
+        computed = {}
+        for name in map(_field_key, names):
+            kind, window = _WINDOW_FIELD.fullmatch(name).groups()
+            computed[name] = WINDOW_FIELDS[kind](self.prices, int(window))
+        return computed
+
+    def missing(self, names: list[str]) -> list[str]:
+        """The fields among ``names`` that would have to be computed."""
+        return [
+            name for name in dict.fromkeys(map(_field_key, names))
+            if name not in PRICE_FIELDS and name not in self._fields and name not in self._cold
+        ]
+
+    def keep(self, computed: dict[str, np.ndarray]):
+        self._cold.update(computed)
+        # Never evict what was just computed, even if one screen needs more than the bound
+        while len(self._cold) > max(SCREENER_MAX_FIELDS, len(computed)):
+            self._cold.popitem(last=False)
+
+    def matrix(self, name: str) -> np.ndarray:
+        if name in PRICE_FIELDS:
+            return self.prices[name]
+        name = _field_key(name)
+        matrix = self._fields.get(name)
+        if matrix is not None:
+            return matrix
+        matrix = self._cold.get(name)
+        if matrix is None:
+            matrix = self.compute([name])[name]
+            self.keep({name: matrix})
+        self._cold.move_to_end(name)
+        return matrix
+
+    def latest(self, name: str) -> np.ndarray:
+        return self.matrix(name)[:, -1]
+
+
+def _field_key(name: str) -> str:
+    return "roc_1" if name == "change" else name
+
+
+def align(charts: dict[str, Chart], sessions: int) -> Universe:
+    """Put each symbol's daily bars into the column of its session; gaps stay NaN."""
+    symbols = sorted(charts)
+    days = {s: (charts[s].timestamps + IST_OFFSET) // 86400 for s in symbols}
+    axis = np.unique(np.concatenate(list(days.values())))[-sessions:] if symbols else np.array([], dtype=np.int64)
+    prices = {name: np.full((len(symbols), len(axis)), np.nan) for name in PRICE_FIELDS}
+    for row, symbol in enumerate(symbols):
+        keep = days[symbol] >= axis[0]
+        columns = np.searchsorted(axis, days[symbol][keep])
+        chart = charts[symbol]
+        for name in PRICE_FIELDS:
+            prices[name][row, columns] = getattr(chart, name)[keep]
+    return Universe(symbols=symbols, days=axis, prices=prices)
+
+
+def prepare(charts: dict[str, Chart], sessions: int) -> Universe:
+    universe = align(charts, sessions)
+    universe._fields.update(universe.compute(list(WARM_FIELDS)))
+    return universe
+
+
+def field_names(expression: str) -> list[str]:
+    """Validate a filter expression and return the fields it references."""
+    if len(expression) > MAX_EXPRESSION_LENGTH:
+        raise InvalidScreen(f"longer than {MAX_EXPRESSION_LENGTH} characters")
+    try:
+        tree = ast.parse(expression, mode="eval")
+    except SyntaxError as e:
+        raise InvalidScreen(e.msg)
+    if not isinstance(tree.body, (ast.Compare, ast.BoolOp, ast.UnaryOp)) or (
+        isinstance(tree.body, ast.UnaryOp) and not isinstance(tree.body.op, ast.Not)
+    ):
+        raise InvalidScreen("the filter must be a comparison, e.g. close > sma_200")
+
+    names = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name):
+            check_field(node.id)
+            names.append(node.id)
+        elif isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float)) or isinstance(node.value, bool):
+                raise InvalidScreen(f"unsupported value {node.value!r}")
+        elif isinstance(node, ast.Compare):
+            if not all(type(op) in _COMPARE for op in node.ops):
+                raise InvalidScreen("unsupported comparison")
+        elif isinstance(node, ast.BinOp):
+            if type(node.op) not in _ARITHMETIC:
+                raise InvalidScreen("only + - * / are supported")
+        elif isinstance(node, ast.UnaryOp):
+            if not isinstance(node.op, (ast.Not, ast.USub)):
+                raise InvalidScreen("unsupported operator")
+        elif not isinstance(node, (ast.Expression, ast.BoolOp, ast.And, ast.Or, ast.Load, ast.operator,
+                                   ast.cmpop, ast.unaryop)):
+            raise InvalidScreen(f"unsupported syntax: {type(node).__name__}")
+    return list(dict.fromkeys(names))
+
+
+def check_field(name: str):
+    if name in PRICE_FIELDS or name == "change":
+        return
+    match = _WINDOW_FIELD.fullmatch(name)
+    if match is None or match[1] not in WINDOW_FIELDS:
+        raise InvalidScreen(f"unknown field {name}")
+    if not 1 <= int(match[2]) <= SCREENER_SESSIONS:
+        raise InvalidScreen(f"window of {name} must be 1-{SCREENER_SESSIONS}")
+
+
+def evaluate(node: ast.AST, values: dict[str, np.ndarray]):
+    if isinstance(node, ast.Expression):
+        return evaluate(node.body, values)
+    if isinstance(node, ast.Name):
+        return values[node.id]
+    if isinstance(node, ast.Constant):
+        return node.value
+    if isinstance(node, ast.BinOp):
+        return _ARITHMETIC[type(node.op)](evaluate(node.left, values), evaluate(node.right, values))
+    if isinstance(node, ast.UnaryOp):
+        operand = evaluate(node.operand, values)
+        return np.logical_not(operand) if isinstance(node.op, ast.Not) else np.negative(operand)
+    if isinstance(node, ast.BoolOp):
+        combine = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+        return combine.reduce([evaluate(v, values) for v in node.values])
+    if isinstance(node, ast.Compare):
+        # Chained comparisons (10 < rsi_14 < 30) hold only if every link does
+        result, left = True, evaluate(node.left, values)
+        for op, comparator in zip(node.ops, node.comparators):
+            right = evaluate(comparator, values)
+            result = np.logical_and(result, _COMPARE[type(op)](left, right))
+            left = right
+        return result
+    raise InvalidScreen(f"unsupported syntax: {type(node).__name__}")
+
+
+class Screener:
+    """Filters the whole universe on its latest daily bar with one vectorized expression.
+
+    The universe is every tracked stock plus every symbol with daily bars in
+    the candle store. It is rebuilt in the background once older than
+    ``SCREENER_MAX_AGE``; requests meanwhile use the previous one.
+    """
+
+    def __init__(self, symbols: list[str], sessions: int, max_age: float):
+        self.symbols = symbols
+        self.sessions = sessions
+        self.max_age = max_age
+        self.universe: Optional[Universe] = None
+        self._lock = asyncio.Lock()
+        self._rebuild: Optional[asyncio.Task] = None
+
+    async def load(self) -> dict[str, Chart]:
+        from app.services.stocks import get_candlestick_data_cached
+
+        # Calendar days for the session count, with room for weekends and holidays
+        start = int(time.time()) - (self.sessions * 7 // 5 + 15) * 86400
+        charts = await candles_read_all("1d", start)
+        slots = asyncio.Semaphore(SCREENER_FETCH_CONCURRENCY)
+
+        async def fetch(symbol: str) -> Optional[Chart]:
+            async with slots:
+                try:
+                    records = await get_candlestick_data_cached(symbol, "1d", "2y")
+                except Exception as e:
+                    logger.warning(f"Screener fetch failed for {symbol}: {e}")
+                    return None
+            return chart_from_records(symbol, records) if records else None
+
+        # Tracked stocks come from market data so today's bar is included
+        fetched = await asyncio.gather(*(fetch(s) for s in self.symbols))
+        charts.update({chart.symbol: chart for chart in fetched if chart is not None and len(chart)})
+        return charts
+
+    async def build(self) -> Universe:
+        async with self._lock:
+            return await self._build()
+
+    async def _build(self) -> Universe:
+        started = time.perf_counter()
+        self.universe = await run_in("analytics", prepare, await self.load(), self.sessions)
+        logger.info(
+            f"Screener universe: {len(self.universe.symbols)} symbols x {len(self.universe.days)} sessions "
+            f"in {time.perf_counter() - started:.2f}s"
+        )
+        return self.universe
+
+    async def current(self) -> Universe:
+        if self.universe is None:
+            async with self._lock:
+                # Requests that arrived during the first build use it rather than loading again
+                if self.universe is None:
+                    await self._build()
+            return self.universe
+        stale = time.monotonic() - self.universe.built_at > self.max_age
+        if stale and (self._rebuild is None or self._rebuild.done()):
+            self._rebuild = asyncio.create_task(self.build())
+        return self.universe
+
+    async def screen(self, expression: str, sort: Optional[str] = None, limit: int = 100) -> dict:
+        names = field_names(expression)
+        descending = bool(sort) and sort.startswith("-")
+        sort_field = sort.lstrip("-") if sort else None
+        if sort_field:
+            check_field(sort_field)
+
+        universe = await self.current()
+        started = time.perf_counter()
+        columns = list(dict.fromkeys(["close", "change", *names, *([sort_field] if sort_field else [])]))
+        missing = universe.missing(columns)
+        if missing:
+            # Fields outside WARM_FIELDS take a pass over every symbol's history; keep it off the event loop
+            universe.keep(await run_in("analytics", universe.compute, missing))
+        values = {name: universe.latest(name) for name in columns}
+        with np.errstate(invalid="ignore", divide="ignore"):
+            matched = np.asarray(evaluate(ast.parse(expression, mode="eval"), values), dtype=bool)
+        matched = np.broadcast_to(matched, (len(universe.symbols),))
+        rows = np.flatnonzero(matched)
+
+        if sort_field:
+            key = values[sort_field][rows]
+            # NaNs sort last either way
+            order = np.argsort(np.where(np.isnan(key), -np.inf, key))[::-1] if descending else np.argsort(key)
+            rows = rows[order]
+        rows = rows[:limit]
+
+        results = [
+            {"symbol": universe.symbols[i], **{name: _number(values[name][i]) for name in columns}}
+            for i in rows.tolist()
+        ]
+        return {
+            "filter": expression,
+            "as_of": datetime.fromtimestamp(int(universe.days[-1]) * 86400 - IST_OFFSET, IST).date().isoformat()
+            if len(universe.days) else None,
+            "universe": len(universe.symbols),
+            "count": int(matched.sum()),
+            "results": results,
+            "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+        }
+
+
+def _number(value: float) -> Optional[float]:
+    return None if np.isnan(value) else round(float(value), 2)
+
+
+screener = Screener(STOCK_CODES, SCREENER_SESSIONS, SCREENER_MAX_AGE)
@@ -0,0 +1,153 @@
+import asyncio
+import logging
+from datetime import datetime, timezone
+from typing import Optional
+
+import numpy as np
+
+from app.cache import cache_get_json, cache_lock, cache_set_json
+from app.config import (
+    INDEX_SYMBOLS, SPARKLINE_POINTS, SPARKLINE_REFRESH_INTERVAL, STOCK_CODES, YAHOO_BATCH_SIZE,
+)
+from app.services.providers import IST
+from app.services.symbols import SYMBOL_MASTER
+from app.services.ticks import IST_OFFSET, SESSION_CLOSE, SESSION_OPEN
+from app.services.upstream import yahoo
+from app.services.yahoo import Chart, yahoo_client
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_KEY = "sparklines:snapshot"
+_SESSION = SESSION_CLOSE - SESSION_OPEN
+
+
+def session_grid(chart: Chart, day: int, points: int) -> np.ndarray:
+    """Closes on ``day`` (days since epoch, IST) sampled onto ``points`` equal session slots.
+
+    Each slot holds the last close inside it, carried forward across slots
+    with no trades; slots before the first trade or after the latest are NaN.
+    """
+    values = np.full(points, np.nan)
+    local = chart.timestamps + IST_OFFSET
+    into = local % 86400 - SESSION_OPEN
+    inside = (local // 86400 == day) & (into >= 0) & (into < _SESSION)
+    if not inside.any():
+        return values
+    slot = into[inside] * points // _SESSION
+    close = chart.close[inside]
+    last = np.flatnonzero(np.r_[slot[1:] != slot[:-1], True])
+    values[slot[last]] = close[last]
+
+    filled = np.where(np.isnan(values), 0, np.arange(points))
+    np.maximum.accumulate(filled, out=filled)
+    values = values[filled]
+    values[slot[-1] + 1:] = np.nan
+    return values
+
+
+def _column(values: np.ndarray) -> list:
+    return [None if np.isnan(v) else round(v, 2) for v in values.tolist()]
+
+
+class SparklineSnapshot:
+    """Today's intraday close series for every tracked symbol, refreshed in the background.
+
+    One spark request covers ``YAHOO_BATCH_SIZE`` symbols, so the whole
+    dashboard costs a handful of upstream calls per refresh. A single
+    worker builds each snapshot and shares it through Redis; the others
+    pick it up from there.
+    """
+
+    def __init__(self, symbols: list[str], points: int, interval: float):
+        self.symbols = list(dict.fromkeys(symbols))
+        self.points = points
+        self.interval = interval
+        self.snapshot: Optional[dict] = None
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    async def build(self, symbols: list[str]) -> dict:
+        batches = [symbols[i:i + YAHOO_BATCH_SIZE] for i in range(0, len(symbols), YAHOO_BATCH_SIZE)]
+        results = await asyncio.gather(
+            *(yahoo.call(yahoo_client.spark, batch, "1d", "5m") for batch in batches), return_exceptions=True,
+        )
+        charts = {}
+        for batch, result in zip(batches, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Sparkline fetch failed for {','.join(batch)}: {result}")
+                continue
+            charts.update({symbol: chart for symbol, chart in result.items() if len(chart)})
+        if not charts:
+            return {}
+
+        # Every series shares the newest session's grid; symbols that haven't traded today stay empty
+        day = max(int(chart.timestamps[-1] + IST_OFFSET) // 86400 for chart in charts.values())
+        open_ts = day * 86400 - IST_OFFSET + SESSION_OPEN
+        return {
+            "date": datetime.fromtimestamp(open_ts, IST).date().isoformat(),
+            "times": [open_ts + i * _SESSION // self.points for i in range(self.points)],
+            "series": {
+                symbol: {"close": _column(session_grid(chart, day, self.points)), "previous_close": chart.previous_close}
+                for symbol, chart in charts.items()
+            },
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+
+    async def refresh(self) -> Optional[dict]:
+        async with self._lock:
+            if await cache_lock(f"lock:{SNAPSHOT_KEY}", max(1, int(self.interval))):
+                snapshot = await self.build(self.symbols)
+                if snapshot:
+                    await cache_set_json(SNAPSHOT_KEY, snapshot, int(self.interval * 3))
+            else:
+                snapshot = await cache_get_json(SNAPSHOT_KEY)
+            if snapshot:
+                self.snapshot = snapshot
+            return self.snapshot
+
+    async def get(self, symbols: list[str]) -> dict:
+        """Columnar series for those of ``symbols`` in the snapshot.
+
+        Only the tracked universe is ever fetched, so requests can't grow the
+        refresh or spend upstream calls on arbitrary symbols; a tracked symbol
+        whose fetch failed waits for the next refresh.
+        """
+        if self.snapshot is None:
+            await self.refresh()
+        snapshot = self.snapshot or {"date": None, "times": [], "series": {}, "updated_at": None}
+
+        found = [s for s in symbols if s in snapshot["series"]]
+        return {
+            "date": snapshot["date"],
+            "times": snapshot["times"],
+            "symbols": found,
+            "close": [snapshot["series"][s]["close"] for s in found],
+            "previous_close": [snapshot["series"][s]["previous_close"] for s in found],
+            "updated_at": snapshot["updated_at"],
+        }
+
+    async def _run(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Sparkline refresh error: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+
+sparkline_snapshot = SparklineSnapshot(
+    INDEX_SYMBOLS + STOCK_CODES + list(SYMBOL_MASTER), SPARKLINE_POINTS, SPARKLINE_REFRESH_INTERVAL,
+)
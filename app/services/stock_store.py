@@ -0,0 +1,112 @@
+import json
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from sqlalchemy import select, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.cache import cache_set_json
+from app.config import CACHE_TTL_CANDLES_INTRADAY, CACHE_TTL_CANDLES_DAILY, STOCK_STORE_ENABLED, STOCK_STORE_PREFETCH_AGE
+from app.database import async_session
+from app.models import StockCache
+
+logger = logging.getLogger(__name__)
+
+# Durable tier behind Redis. Every upstream fetch is upserted here, so a cold
+# or unavailable Redis falls back to recent rows instead of yfinance, and an
+# upstream failure can still serve the last good copy. Like the Redis helpers,
+# every call is best-effort: database errors are logged and treated as a miss.
+
+QUOTE = "quote"
+INFO = "info"
+
+_INSERTS = {"sqlite": sqlite_insert, "postgresql": pg_insert}
+
+
+def candle_ttl(interval: str) -> int:
+    return CACHE_TTL_CANDLES_INTRADAY if interval in ("1m", "5m", "15m", "1h") else CACHE_TTL_CANDLES_DAILY
+
+
+def candle_series(interval: str, period: str) -> str:
+    return f"candles:{interval}:{period}"
+
+
+def prediction_series(forecast_days: int) -> str:
+    return f"prediction:{forecast_days}"
+
+
+async def store_get_many(keys: list[tuple[str, str]], max_age: Optional[float]) -> dict[tuple[str, str], object]:
+    """Data for the (symbol, series) keys fetched within the last ``max_age`` seconds."""
+    if not STOCK_STORE_ENABLED or not keys:
+        return {}
+    query = select(StockCache).where(tuple_(StockCache.symbol, StockCache.interval).in_(keys))
+    if max_age is not None:
+        query = query.where(StockCache.fetched_at >= datetime.now(timezone.utc) - timedelta(seconds=max_age))
+    try:
+        async with async_session() as db:
+            rows = (await db.execute(query)).scalars().all()
+    except SQLAlchemyError as e:
+        logger.warning(f"Stock store read failed: {e}")
+        return {}
+
+    return {(row.symbol, row.interval): json.loads(row.data_json) for row in rows}
+
+
+async def store_get(symbol: str, series: str, max_age: Optional[float]):
+    return (await store_get_many([(symbol, series)], max_age)).get((symbol, series))
+
+
+async def store_put_many(entries: list[tuple[str, str, object]]):
+    """Upsert (symbol, series, data) rows in a single statement."""
+    if not STOCK_STORE_ENABLED or not entries:
+        return
+    now = datetime.now(timezone.utc)
+    values = [
+        {"symbol": symbol, "interval": series, "data_json": json.dumps(data, default=str), "fetched_at": now}
+        for symbol, series, data in entries
+    ]
+    try:
+        async with async_session() as db:
+            insert = _INSERTS[db.bind.dialect.name]
+            stmt = insert(StockCache).values(values)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[StockCache.symbol, StockCache.interval],
+                set_={"data_json": stmt.excluded.data_json, "fetched_at": stmt.excluded.fetched_at},
+            )
+            await db.execute(stmt)
+            await db.commit()
+    except (SQLAlchemyError, KeyError) as e:
+        logger.warning(f"Stock store write failed: {e}")
+
+
+async def store_put(symbol: str, series: str, data):
+    await store_put_many([(symbol, series, data)])
+
+
+async def prefetch() -> int:
+    """Seed Redis with candle series fetched within ``STOCK_STORE_PREFETCH_AGE``.
+
+    After a restart or a Redis flush this serves slightly old charts for one TTL
+    while refresh-ahead catches up, instead of sending every first request
+    upstream. Other series (quotes, info, predictions) are read from the store per request.
+    """
+    if not STOCK_STORE_ENABLED:
+        return 0
+    since = datetime.now(timezone.utc) - timedelta(seconds=STOCK_STORE_PREFETCH_AGE)
+    try:
+        async with async_session() as db:
+            rows = (await db.execute(
+                select(StockCache).where(StockCache.interval.startswith("candles:"), StockCache.fetched_at >= since)
+            )).scalars().all()
+    except SQLAlchemyError as e:
+        logger.warning(f"Stock store prefetch failed: {e}")
+        return 0
+
+    for row in rows:
+        _, interval, period = row.interval.split(":", 2)
+        await cache_set_json(f"candles:{row.symbol}:{interval}:{period}", json.loads(row.data_json), candle_ttl(interval))
+    logger.info(f"Prefetched {len(rows)} candle series from the stock store")
+    return len(rows)
@@ -1,178 +1,192 @@
-import yfinance as yf
 import asyncio
 import logging
-from typing import List, Optional
+import time
+from typing import Dict, List, Optional
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
 from app.cache import cache_get_json, cache_set_json
-from app.config import CACHE_TTL_LIVE, CACHE_TTL_CANDLES_INTRADAY, CACHE_TTL_CANDLES_DAILY, CACHE_TTL_SEARCH, CACHE_TTL_STOCK_INFO
+from app.config import CACHE_TTL_LIVE, CACHE_TTL_SEARCH, RESAMPLE_BASE, STOCK_STORE_MAX_STALE
+from app.services.candle_store import candles_read, first_bar_times
+from app.services.fundamentals import fundamentals
+from app.services.providers import Provider, market_data
+from app.services.refresh import refresh_scheduler
+from app.services.candles import period_days
+from app.services.resample import chart_from_records, concat, resample, window
+from app.services.stock_store import QUOTE, candle_series, candle_ttl, store_get, store_get_many, store_put, store_put_many
 
 logger = logging.getLogger(__name__)
 
 
 async def get_upstox_token_for_user(db: AsyncSession, user_id: int) -> Optional[str]:
-    from app.models import UpstoxToken
-    result = await db.execute(
-        select(UpstoxToken).where(UpstoxToken.user_id == user_id)
-    )
-    token = result.scalar_one_or_none()
-    return token.access_token if token else None
+    from app.dependencies import get_cached_upstox_token
+    return await get_cached_upstox_token(db, user_id)
 
 
 async def fetch_stock(symbol: str):
-    loop = asyncio.get_running_loop()
-    return await loop.run_in_executor(None, get_stock_sync, symbol)
+    quotes = await fetch_quotes([symbol])
+    return quotes.get(symbol)
 
 
-def get_stock_sync(symbol: str):
-    for attempt in range(3):
-        try:
-            stock = yf.Ticker(symbol)
-            data = stock.history(period="2d")
+async def fetch_quotes(symbols: List[str], providers: Optional[List[Provider]] = None) -> Dict[str, dict]:
+    """Latest quote per symbol from the best available provider; failed symbols are left out."""
+    return await market_data.quotes(symbols, providers)
 
-            if data.empty:
-                return None
 
-            latest = data.iloc[-1]
-            previous = data.iloc[-2] if len(data) > 1 else latest
+async def fetch_all_stocks(symbols: List[str], providers: Optional[List[Provider]] = None):
+    if providers is not None:
+        # A user's own providers (Upstox) skip the shared cache: its keys don't say which providers filled them
+        return await _load_all_stocks(symbols, providers)
 
-            current_price = latest["Close"]
-            previous_close = previous["Close"]
-
-            change = current_price - previous_close
-            percent_change = (change / previous_close) * 100
-
-            return {
-                "symbol": symbol,
-                "current_price": round(float(current_price), 2),
-                "previous_close": round(float(previous_close), 2),
-                "change": round(float(change), 2),
-                "percent_change": round(float(percent_change), 2),
-            }
-        except Exception as e:
-            logger.warning(f"Attempt {attempt + 1} failed for {symbol}: {e}")
-            if attempt == 2:
-                return None
-            import time
-            time.sleep(0.5 * (2 ** attempt))
-
-
-async def fetch_all_stocks(symbols: List[str]):
     cache_key = f"stocks:live:{','.join(sorted(symbols))}"
     cached = await cache_get_json(cache_key)
     if cached:
         return cached
 
-    tasks = [fetch_stock(symbol) for symbol in symbols]
-    results = await asyncio.gather(*tasks)
-    data = [r for r in results if r]
+    stored = await store_get_many([(s, QUOTE) for s in symbols], CACHE_TTL_LIVE)
+    if len(stored) == len(set(symbols)):
+        data = [stored[(s, QUOTE)] for s in symbols]
+    else:
+        data = await _load_all_stocks(symbols, providers)
 
     await cache_set_json(cache_key, data, CACHE_TTL_LIVE)
+    # Background refreshes use the default providers so no user's token is kept around
+    refresh_scheduler.register(cache_key, lambda: _load_all_stocks(symbols), CACHE_TTL_LIVE)
     return data
 
 
-def get_candlestick_data(symbol: str, interval: str = "5m", period: str = "1d"):
-    stock = yf.Ticker(symbol)
-    data = stock.history(period=period, interval=interval)
+async def _load_all_stocks(symbols: List[str], providers: Optional[List[Provider]] = None):
+    quotes = await fetch_quotes(symbols, providers)
+    if providers is None:
+        await store_put_many([(symbol, QUOTE, quote) for symbol, quote in quotes.items()])
+
+    # Symbols upstream failed on get their last stored quote
+    missing = [(s, QUOTE) for s in symbols if s not in quotes]
+    if missing:
+        stale = await store_get_many(missing, STOCK_STORE_MAX_STALE)
+        quotes.update({symbol: quote for (symbol, _), quote in stale.items()})
+    return [quotes[s] for s in symbols if s in quotes]
+
+
+async def get_candlestick_data(symbol: str, interval: str = "5m", period: str = "1d",
+                               providers: Optional[List[Provider]] = None):
+    return await market_data.candles(symbol, interval, period, providers)
 
-    if data.empty:
-        return None
 
-    data = data.reset_index()
+async def get_candlestick_data_cached(symbol: str, interval: str = "5m", period: str = "1d",
+                                      providers: Optional[List[Provider]] = None):
+    try:
+        data = await _resampled_candles(symbol, interval, period, providers)
+    except Exception as e:
+        logger.warning(f"Resampling {symbol} {interval}:{period} failed, fetching directly: {e}")
+        data = None
+    if data:
+        return data
+    return await _cached_candles(symbol, interval, period, providers)
+
 
-    dt_col = "Datetime" if "Datetime" in data.columns else "Date"
-    data["Datetime"] = data[dt_col].astype(str)
+# Stored bars older than this past the requested start don't count as covering it
+# (weekends and exchange holidays leave gaps at the edge)
+RESAMPLE_COVERAGE_SLACK = 4 * 86400
+
+
+async def _resampled_candles(symbol: str, interval: str, period: str,
+                             providers: Optional[List[Provider]] = None) -> Optional[list]:
+    """Derive ``interval`` bars from the shared base series, or None if it can't cover ``period``."""
+    base = RESAMPLE_BASE.get(interval)
+    days = period_days(period)
+    if base is None or days is None:
+        return None
+    base_interval, base_period = base
+    extend = days > period_days(base_period)
+    if extend:
+        # Without stored bars back to the start, the base can't cover it: go
+        # straight to the direct fetch rather than loading the base first
+        first = (await first_bar_times([symbol], base_interval)).get(symbol)
+        if first is None or first > int(time.time()) - days * 86400 + RESAMPLE_COVERAGE_SLACK:
+            return None
+
+    records = await _cached_candles(symbol, base_interval, base_period, providers)
+    if not records:
+        return None
+    chart = chart_from_records(symbol, records)
+    if extend:
+        start = int(chart.timestamps[-1]) - days * 86400
+        older = await candles_read(symbol, base_interval, start, int(chart.timestamps[0]))
+        if older is None or older.timestamps[0] > start + RESAMPLE_COVERAGE_SLACK:
+            return None
+        chart = concat(older, chart)
+    return resample(window(chart, period), interval).records()
 
-    return data[["Datetime", "Open", "High", "Low", "Close", "Volume"]].to_dict(orient="records")
 
+async def _cached_candles(symbol: str, interval: str, period: str,
+                          providers: Optional[List[Provider]] = None):
+    if providers is not None:
+        return await _load_candles(symbol, interval, period, providers)
 
-async def get_candlestick_data_cached(symbol: str, interval: str = "5m", period: str = "1d"):
     cache_key = f"candles:{symbol}:{interval}:{period}"
     cached = await cache_get_json(cache_key)
     if cached:
         return cached
 
-    loop = asyncio.get_running_loop()
-    data = await loop.run_in_executor(None, get_candlestick_data, symbol, interval, period)
+    ttl = candle_ttl(interval)
+    data = await store_get(symbol, candle_series(interval, period), ttl)
+    if data is None:
+        data = await _load_candles(symbol, interval, period, providers)
 
     if data:
-        ttl = CACHE_TTL_CANDLES_INTRADAY if interval in ("1m", "5m", "15m", "1h") else CACHE_TTL_CANDLES_DAILY
         await cache_set_json(cache_key, data, ttl)
+        refresh_scheduler.register(cache_key, lambda: _load_candles(symbol, interval, period), ttl)
 
     return data
 
 
+async def _load_candles(symbol: str, interval: str, period: str, providers: Optional[List[Provider]] = None):
+    series = candle_series(interval, period)
+    try:
+        data = await get_candlestick_data(symbol, interval, period, providers)
+    except Exception:
+        stale = await store_get(symbol, series, STOCK_STORE_MAX_STALE)
+        if stale is None:
+            raise
+        logger.warning(f"Candle fetch failed for {symbol} {series}, serving stored copy")
+        return stale
+
+    if data:
+        if providers is None:
+            await store_put(symbol, series, data)
+        return data
+    return await store_get(symbol, series, STOCK_STORE_MAX_STALE)
+
+
 async def search_stock(query: str):
     cache_key = f"search:{query.lower()}"
     cached = await cache_get_json(cache_key)
     if cached:
         return cached
 
-    loop = asyncio.get_running_loop()
-    results = await loop.run_in_executor(None, _search_sync, query)
+    from app.config import STOCK_CODES
+    query_lower = query.lower()
+    matches = [
+        symbol for symbol in STOCK_CODES
+        if query_lower in symbol.replace(".NS", "").lower() or query_lower in symbol.lower()
+    ]
+    results = await asyncio.gather(*(_search_entry(symbol) for symbol in matches))
 
     await cache_set_json(cache_key, results, CACHE_TTL_SEARCH)
     return results
 
 
-def _search_sync(query: str):
-    try:
-        from app.config import STOCK_CODES
-        query_lower = query.lower()
-        results = []
-        for symbol in STOCK_CODES:
-            name = symbol.replace(".NS", "").lower()
-            if query_lower in name or query_lower in symbol.lower():
-                try:
-                    stock = yf.Ticker(symbol)
-                    info = stock.info
-                    results.append({
-                        "symbol": symbol,
-                        "name": info.get("longName", symbol.replace(".NS", "")),
-                        "sector": info.get("sector", ""),
-                    })
-                except Exception:
-                    results.append({
-                        "symbol": symbol,
-                        "name": symbol.replace(".NS", ""),
-                        "sector": "",
-                    })
-        return results
-    except Exception as e:
-        logger.error(f"Search error: {e}")
-        return []
+async def _search_entry(symbol: str) -> dict:
+    info = await fundamentals.get(symbol) or {}
+    return {
+        "symbol": symbol,
+        "name": info.get("name") or symbol.replace(".NS", ""),
+        "sector": info.get("sector", ""),
+    }
 
 
 async def get_stock_info(symbol: str):
-    cache_key = f"info:{symbol}"
-    cached = await cache_get_json(cache_key)
-    if cached:
-        return cached
-
-    loop = asyncio.get_running_loop()
-    info = await loop.run_in_executor(None, _get_info_sync, symbol)
-
-    if info:
-        await cache_set_json(cache_key, info, CACHE_TTL_STOCK_INFO)
-    return info
+    return await fundamentals.get(symbol)
 
 
-def _get_info_sync(symbol: str):
-    try:
-        stock = yf.Ticker(symbol)
-        info = stock.info
-        return {
-            "symbol": symbol,
-            "name": info.get("longName", ""),
-            "sector": info.get("sector", ""),
-            "industry": info.get("industry", ""),
-            "market_cap": info.get("marketCap", 0),
-            "pe_ratio": info.get("trailingPE", None),
-            "week_52_high": info.get("fiftyTwoWeekHigh", None),
-            "week_52_low": info.get("fiftyTwoWeekLow", None),
-            "avg_volume": info.get("averageVolume", 0),
-            "dividend_yield": info.get("dividendYield", None),
-        }
-    except Exception as e:
-        logger.error(f"Error fetching info for {symbol}: {e}")
-        return None
+async def get_stock_infos(symbols: List[str]) -> List[dict]:
+    return await fundamentals.get_many(symbols)
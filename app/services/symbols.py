@@ -0,0 +1,109 @@
+import re
+from functools import lru_cache
+
+# Symbol master: company names and common aliases used to recognise mentions in
+# free text, including the short names headlines use ("Reliance", "Maruti").
+# The bare ticker (e.g. "RELIANCE") is always an alias as well.
+SYMBOL_MASTER = {
+    "RELIANCE.NS": {"name": "Reliance Industries", "aliases": ["RIL", "Reliance"]},
+    "TCS.NS": {"name": "Tata Consultancy Services", "aliases": ["Tata Consultancy"]},
+    "INFY.NS": {"name": "Infosys", "aliases": []},
+    "HDFCBANK.NS": {"name": "HDFC Bank", "aliases": []},
+    "ICICIBANK.NS": {"name": "ICICI Bank", "aliases": []},
+    "HINDUNILVR.NS": {"name": "Hindustan Unilever", "aliases": ["HUL"]},
+    "ITC.NS": {"name": "ITC", "aliases": []},
+    "SBIN.NS": {"name": "State Bank of India", "aliases": ["SBI"]},
+    "BHARTIARTL.NS": {"name": "Bharti Airtel", "aliases": ["Airtel"]},
+    "KOTAKBANK.NS": {"name": "Kotak Mahindra Bank", "aliases": ["Kotak Bank", "Kotak"]},
+    "LT.NS": {"name": "Larsen & Toubro", "aliases": ["L&T"]},
+    "HCLTECH.NS": {"name": "HCL Technologies", "aliases": ["HCLTech", "HCL Tech"]},
+    "AXISBANK.NS": {"name": "Axis Bank", "aliases": []},
+    "ASIANPAINT.NS": {"name": "Asian Paints", "aliases": ["Asian Paint"]},
+    "MARUTI.NS": {"name": "Maruti Suzuki", "aliases": ["Maruti"]},
+    "SUNPHARMA.NS": {"name": "Sun Pharmaceutical", "aliases": ["Sun Pharma"]},
+    "TITAN.NS": {"name": "Titan Company", "aliases": ["Titan"]},
+    "BAJFINANCE.NS": {"name": "Bajaj Finance", "aliases": ["Bajaj Fin"]},
+    "WIPRO.NS": {"name": "Wipro", "aliases": []},
+    "ULTRACEMCO.NS": {"name": "UltraTech Cement", "aliases": ["UltraTech"]},
+    "NESTLEIND.NS": {"name": "Nestle India", "aliases": ["Nestle"]},
+    "POWERGRID.NS": {"name": "Power Grid Corporation", "aliases": ["Power Grid", "Powergrid"]},
+    "NTPC.NS": {"name": "NTPC", "aliases": []},
+    "ADANIENT.NS": {"name": "Adani Enterprises", "aliases": ["Adani Ent"]},
+    "TATASTEEL.NS": {"name": "Tata Steel", "aliases": []},
+    "TECHM.NS": {"name": "Tech Mahindra", "aliases": ["TechM"]},
+    "ONGC.NS": {"name": "Oil and Natural Gas Corporation", "aliases": ["ONGC"]},
+    "COALINDIA.NS": {"name": "Coal India", "aliases": []},
+    "JSWSTEEL.NS": {"name": "JSW Steel", "aliases": ["JSW"]},
+    "^NSEI": {"name": "Nifty 50", "aliases": ["Nifty"]},
+    "^BSESN": {"name": "S&P BSE Sensex", "aliases": ["Sensex"]},
+}
+
+
+def normalize_symbol(symbol: str) -> str:
+    symbol = symbol.strip().upper()
+    if symbol in SYMBOL_MASTER:
+        return symbol
+    if f"{symbol}.NS" in SYMBOL_MASTER:
+        return f"{symbol}.NS"
+    return symbol
+
+
+def ticker(symbol: str) -> str:
+    return symbol.replace(".NS", "").lstrip("^")
+
+
+# Upstox instrument keys for symbols that aren't plain NSE equities
+UPSTOX_INDEX_KEYS = {
+    "^NSEI": "NSE_INDEX|Nifty 50",
+    "^BSESN": "BSE_INDEX|SENSEX",
+}
+
+
+def instrument_key(symbol: str) -> str:
+    return UPSTOX_INDEX_KEYS.get(symbol) or f"NSE_EQ|{ticker(symbol)}"
+
+
+def symbol_for_instrument(key: str) -> str:
+    # Quote responses key instruments as "NSE_EQ:RELIANCE" rather than "NSE_EQ|RELIANCE"
+    key = key.replace(":", "|", 1)
+    for symbol, index_key in UPSTOX_INDEX_KEYS.items():
+        if index_key == key:
+            return symbol
+    return f"{key.split('|')[-1]}.NS"
+
+
+# Tickers at least this long are distinctive enough to match in any case
+CASELESS_TICKER_LENGTH = 5
+
+
+@lru_cache(maxsize=1)
+def _alias_patterns() -> tuple[re.Pattern, re.Pattern, dict]:
+    # Short tickers are matched case-sensitively so "ITC" or "LT" don't match ordinary
+    # words; longer tickers ("Wipro", "Titan"), names and aliases case-insensitively.
+    lookup = {}
+    tickers, names = [], []
+    for symbol, entry in SYMBOL_MASTER.items():
+        tick = ticker(symbol)
+        if len(tick) < CASELESS_TICKER_LENGTH:
+            lookup[tick] = symbol
+            tickers.append(tick)
+        else:
+            lookup[tick.lower()] = symbol
+            names.append(tick)
+        for alias in [entry["name"], *entry["aliases"]]:
+            lookup[alias.lower()] = symbol
+            names.append(alias)
+
+    def compile_(words, flags=0):
+        alternation = "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+        return re.compile(rf"(?<!\w)(?:{alternation})(?!\w)", flags)
+
+    return compile_(tickers), compile_(names, re.IGNORECASE), lookup
+
+
+def match_symbols(text: str) -> set[str]:
+    """Symbols from the master mentioned in ``text`` by ticker, name or alias."""
+    ticker_re, name_re, lookup = _alias_patterns()
+    found = {lookup[m] for m in ticker_re.findall(text)}
+    found.update(lookup[m.lower()] for m in name_re.findall(text))
+    return found
@@ -0,0 +1,204 @@
+import asyncio
+import logging
+from datetime import datetime
+from typing import Dict, Iterator, Optional, Set, Tuple
+
+import numpy as np
+
+from app.config import LIVE_CANDLE_CAPACITY, LIVE_CANDLE_INTERVALS
+from app.services.candles import candle_time
+from app.services.providers import IST
+from app.services.symbols import symbol_for_instrument
+
+logger = logging.getLogger(__name__)
+
+# NSE cash session in seconds after IST midnight. Bars are aligned to the
+# open, so 1h bars start at 09:15, 10:15, ... like the exchange's own.
+IST_OFFSET = 19800
+SESSION_OPEN = 9 * 3600 + 15 * 60
+SESSION_CLOSE = 15 * 3600 + 30 * 60
+
+
+def session_bucket(ts: int, step: int) -> Optional[int]:
+    """Start (unix seconds) of the ``step``-second bar holding ``ts``, or None outside the session."""
+    local = ts + IST_OFFSET
+    into = local % 86400 - SESSION_OPEN
+    if into < 0 or into >= SESSION_CLOSE - SESSION_OPEN:
+        return None
+    return ts - into % step
+
+
+def _record(ts: int, ohlc: np.ndarray, volume: int) -> dict:
+    return {
+        "Datetime": datetime.fromtimestamp(ts, IST).isoformat(sep=" "),
+        "Open": float(ohlc[0]), "High": float(ohlc[1]), "Low": float(ohlc[2]), "Close": float(ohlc[3]),
+        "Volume": int(volume),
+    }
+
+
+class BarRing:
+    """Fixed-capacity OHLCV bars in NumPy arrays; the oldest bar is overwritten when full."""
+
+    __slots__ = ("capacity", "time", "ohlc", "volume", "head", "count")
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.time = np.zeros(capacity, dtype=np.int64)
+        self.ohlc = np.zeros((capacity, 4), dtype=np.float64)
+        self.volume = np.zeros(capacity, dtype=np.int64)
+        self.head = 0  # next slot to write
+        self.count = 0
+
+    def update(self, bucket: int, price: float, volume: int) -> Optional[int]:
+        """Apply a trade to the bar starting at ``bucket``; returns the slot touched, or None for late ticks."""
+        if self.count:
+            i = (self.head - 1) % self.capacity
+            last = self.time[i]
+            if bucket == last:
+                bar = self.ohlc[i]
+                if price > bar[1]:
+                    bar[1] = price
+                if price < bar[2]:
+                    bar[2] = price
+                bar[3] = price
+                self.volume[i] += volume
+                return i
+            if bucket < last:
+                return None
+        i = self.head
+        self.time[i] = bucket
+        self.ohlc[i] = price
+        self.volume[i] = volume
+        self.head = (i + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+        return i
+
+    def record(self, i: int) -> dict:
+        return _record(int(self.time[i]), self.ohlc[i], self.volume[i])
+
+    def records(self) -> list[dict]:
+        order = (np.arange(self.count) + self.head - self.count) % self.capacity
+        return [_record(t, o, v) for t, o, v in zip(self.time[order].tolist(), self.ohlc[order], self.volume[order])]
+
+
+def parse_feed(message: dict) -> Iterator[Tuple[str, int, float, Optional[int], int]]:
+    """(symbol, unix seconds, price, cumulative day volume, last quantity) per instrument in a feed message."""
+    for key, feed in (message.get("feeds") or {}).items():
+        full = feed.get("fullFeed") or {}
+        market = full.get("marketFF") or full.get("indexFF") or feed
+        ltpc = market.get("ltpc") or {}
+        if not ltpc.get("ltp") or not ltpc.get("ltt"):
+            continue
+        day_volume = int(market["vtt"]) if market.get("vtt") is not None else None
+        yield symbol_for_instrument(key), int(ltpc["ltt"]) // 1000, float(ltpc["ltp"]), day_volume, int(ltpc.get("ltq") or 0)
+
+
+class BarListener:
+    """Latest bar per (symbol, interval) a subscriber hasn't been sent yet."""
+
+    def __init__(self):
+        self.keys: Set[Tuple[str, str]] = set()
+        self._pending: Dict[Tuple[str, str], dict] = {}
+        self._ready = asyncio.Event()
+
+    def publish(self, symbol: str, interval: str, bar: dict):
+        # Only the newest state of a bar matters, so updates coalesce per key
+        self._pending[(symbol, interval)] = bar
+        self._ready.set()
+
+    async def get(self) -> Dict[Tuple[str, str], dict]:
+        await self._ready.wait()
+        self._ready.clear()
+        pending, self._pending = self._pending, {}
+        return pending
+
+
+class TickAggregator:
+    """Builds intraday OHLCV bars per instrument from streamed Upstox ticks.
+
+    Ticks from every user's streamer feed one shared set of bars. Volume
+    comes from the cumulative day volume (``vtt``), so duplicate ticks
+    from two users' streams aren't counted twice.
+    """
+
+    def __init__(self, intervals: Dict[str, int], capacity: int):
+        self.intervals = intervals
+        self.capacity = capacity
+        self.rings: Dict[Tuple[str, str], BarRing] = {}
+        self._day_volume: Dict[str, int] = {}
+        self._last_day: Dict[str, int] = {}  # IST session day of the newest tick with a day volume
+        self._listeners: Set[BarListener] = set()
+
+    def ingest(self, message: dict) -> int:
+        count = 0
+        for tick in parse_feed(message):
+            self.add_tick(*tick)
+            count += 1
+        return count
+
+    def add_tick(self, symbol: str, ts: int, price: float, day_volume: Optional[int] = None, quantity: int = 0):
+        volume = quantity
+        if day_volume is not None:
+            day = (ts + IST_OFFSET) // 86400
+            previous = self._day_volume.get(symbol)
+            if previous is not None and day_volume < previous and day <= self._last_day[symbol]:
+                # A lagging tick from another user's stream: its trades are already counted
+                return
+            self._day_volume[symbol] = day_volume
+            # Only a later session day resets the total; with no previous total, fall back to the trade size
+            if previous is not None:
+                volume = day_volume - previous if day_volume >= previous else day_volume
+            self._last_day[symbol] = max(day, self._last_day.get(symbol, day))
+
+        for interval, step in self.intervals.items():
+            bucket = session_bucket(ts, step)
+            if bucket is None:
+                return
+            ring = self.rings.get((symbol, interval))
+            if ring is None:
+                ring = self.rings[(symbol, interval)] = BarRing(self.capacity)
+            i = ring.update(bucket, price, volume)
+            if i is not None and self._listeners:
+                bar = ring.record(i)
+                for listener in self._listeners:
+                    if (symbol, interval) in listener.keys:
+                        listener.publish(symbol, interval, bar)
+
+    def bars(self, symbol: str, interval: str) -> list[dict]:
+        ring = self.rings.get((symbol, interval))
+        return ring.records() if ring else []
+
+    def merge(self, symbol: str, interval: str, history: list[dict]) -> list[dict]:
+        """Overlay live bars on a history series, by bar start time.
+
+        Live bars often start mid-bar (the stream connected late), so where
+        history has the same bar its open is kept and its range extended.
+        """
+        live = self.bars(symbol, interval)
+        if not live:
+            return history
+        merged = {candle_time(r): r for r in history}
+        for bar in live:
+            t = candle_time(bar)
+            seed = merged.get(t)
+            if seed is not None:
+                bar = {
+                    **bar,
+                    "Open": seed["Open"],
+                    "High": max(seed["High"], bar["High"]),
+                    "Low": min(seed["Low"], bar["Low"]),
+                    "Volume": max(seed["Volume"], bar["Volume"]),
+                }
+            merged[t] = bar
+        return [merged[t] for t in sorted(merged)]
+
+    def listen(self) -> BarListener:
+        listener = BarListener()
+        self._listeners.add(listener)
+        return listener
+
+    def unlisten(self, listener: BarListener):
+        self._listeners.discard(listener)
+
+
+tick_aggregator = TickAggregator(LIVE_CANDLE_INTERVALS, LIVE_CANDLE_CAPACITY)
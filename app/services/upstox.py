@@ -1,18 +1,42 @@
+import functools
 import logging
+import time
 from typing import Optional
 
 import upstox_client
 from upstox_client.rest import ApiException
 
+from app.metrics import upstream_request_duration
+from app.timing import record_timing
+
 logger = logging.getLogger(__name__)
 
 
+def _timed(fn):
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter_ns()
+        outcome = "error"
+        try:
+            result = fn(*args, **kwargs)
+            # Failures are logged and returned as None or an error-status dict
+            if result is not None and not (isinstance(result, dict) and result.get("status") == "error"):
+                outcome = "ok"
+            return result
+        finally:
+            elapsed_ns = time.perf_counter_ns() - start
+            upstream_request_duration.labels("upstox", outcome).observe(elapsed_ns / 1e9)
+            record_timing("upstream", elapsed_ns)
+    return wrapper
+
+
 def get_upstox_client(access_token: str) -> upstox_client.ApiClient:
     configuration = upstox_client.Configuration()
     configuration.access_token = access_token
     return upstox_client.ApiClient(configuration)
 
 
+@_timed
 def get_profile(access_token: str) -> Optional[dict]:
     try:
         client = get_upstox_client(access_token)
@@ -24,6 +48,7 @@ def get_profile(access_token: str) -> Optional[dict]:
         return None
 
 
+@_timed
 def get_holdings(access_token: str) -> Optional[list]:
     try:
         client = get_upstox_client(access_token)
@@ -37,6 +62,7 @@ def get_holdings(access_token: str) -> Optional[list]:
         return None
 
 
+@_timed
 def get_positions(access_token: str) -> Optional[list]:
     try:
         client = get_upstox_client(access_token)
@@ -50,6 +76,7 @@ def get_positions(access_token: str) -> Optional[list]:
         return None
 
 
+@_timed
 def get_funds(access_token: str) -> Optional[dict]:
     try:
         client = get_upstox_client(access_token)
@@ -61,6 +88,7 @@ def get_funds(access_token: str) -> Optional[dict]:
         return None
 
 
+@_timed
 def get_market_quote(access_token: str, symbols: str) -> Optional[dict]:
     try:
         client = get_upstox_client(access_token)
@@ -74,6 +102,7 @@ def get_market_quote(access_token: str, symbols: str) -> Optional[dict]:
         return None
 
 
+@_timed
 def get_historical_candles(
     access_token: str,
     instrument_key: str,
@@ -95,6 +124,21 @@ def get_historical_candles(
         return None
 
 
+@_timed
+def get_intraday_candles(access_token: str, instrument_key: str, interval: str) -> Optional[list]:
+    try:
+        client = get_upstox_client(access_token)
+        api = upstox_client.HistoryApi(client)
+        response = api.get_intra_day_candle_data(instrument_key, interval, "2.0")
+        if response.data and response.data.candles:
+            return response.data.candles
+        return []
+    except ApiException as e:
+        logger.error(f"Upstox get_intraday_candles error: {e}")
+        return None
+
+
+@_timed
 def place_order(access_token: str, order_params: dict) -> dict:
     try:
         client = get_upstox_client(access_token)
@@ -123,6 +167,7 @@ def place_order(access_token: str, order_params: dict) -> dict:
         return {"order_id": None, "status": "error", "message": str(e)}
 
 
+@_timed
 def modify_order(access_token: str, order_id: str, params: dict) -> dict:
     try:
         client = get_upstox_client(access_token)
@@ -147,6 +192,7 @@ def modify_order(access_token: str, order_id: str, params: dict) -> dict:
         return {"order_id": order_id, "status": "error", "message": str(e)}
 
 
+@_timed
 def cancel_order(access_token: str, order_id: str) -> dict:
     try:
         client = get_upstox_client(access_token)
@@ -162,6 +208,7 @@ def cancel_order(access_token: str, order_id: str) -> dict:
         return {"order_id": order_id, "status": "error", "message": str(e)}
 
 
+@_timed
 def get_order_book(access_token: str) -> Optional[list]:
     try:
         client = get_upstox_client(access_token)
@@ -175,6 +222,7 @@ def get_order_book(access_token: str) -> Optional[list]:
         return None
 
 
+@_timed
 def get_trade_book(access_token: str) -> Optional[list]:
     try:
         client = get_upstox_client(access_token)
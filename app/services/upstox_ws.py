@@ -5,6 +5,9 @@ from typing import Dict, Set, Optional
 import upstox_client
 from upstox_client.feeder import MarketDataStreamerV3
 
+from app.executors import executors
+from app.services.ticks import tick_aggregator
+
 logger = logging.getLogger(__name__)
 
 
@@ -42,11 +45,11 @@ class UpstoxStreamerManager:
                 mode="full",
             )
 
+            # Callbacks fire on the streamer's thread; hand messages to the event loop
+            loop = asyncio.get_running_loop()
+
             def on_message(message):
-                asyncio.create_task(self._broadcast(user_id, {
-                    "type": "market_data",
-                    "data": message,
-                }))
+                loop.call_soon_threadsafe(self._on_message, user_id, message)
 
             def on_error(error):
                 logger.error(f"Upstox streamer error for user {user_id}: {error}")
@@ -59,8 +62,8 @@ class UpstoxStreamerManager:
             streamer.on("error", on_error)
             streamer.on("close", on_close)
 
-            loop = asyncio.get_running_loop()
-            self._tasks[user_id] = loop.run_in_executor(None, streamer.connect)
+            # connect() blocks for the streamer's lifetime, so it gets a thread from the streams pool
+            self._tasks[user_id] = executors["streams"].submit(streamer.connect)
             self._streamers[user_id] = streamer
             logger.info(f"Started Upstox streamer for user {user_id}")
         except Exception as e:
@@ -86,6 +89,16 @@ class UpstoxStreamerManager:
             except Exception as e:
                 logger.error(f"Subscribe error for user {user_id}: {e}")
 
+    def _on_message(self, user_id: int, message: dict):
+        try:
+            tick_aggregator.ingest(message)
+        except Exception as e:
+            logger.warning(f"Could not aggregate ticks for user {user_id}: {e}")
+        asyncio.create_task(self._broadcast(user_id, {
+            "type": "market_data",
+            "data": message,
+        }))
+
     async def _broadcast(self, user_id: int, message: dict):
         clients = self._clients.get(user_id, set()).copy()
         for ws in clients:
@@ -0,0 +1,147 @@
+import asyncio
+import inspect
+import logging
+import random
+import time
+from typing import Callable
+
+from app.config import (
+    YAHOO_RATE_LIMIT,
+    YAHOO_BURST,
+    YAHOO_RETRIES,
+    YAHOO_BACKOFF_BASE,
+    YAHOO_BACKOFF_MAX,
+    YAHOO_BREAKER_THRESHOLD,
+    YAHOO_BREAKER_RESET,
+)
+from app.exceptions import ServiceBusy, UpstreamUnavailable
+from app.executors import run_in
+from app.metrics import upstream_request_duration
+from app.timing import record_timing
+
+logger = logging.getLogger(__name__)
+
+
+class TokenBucket:
+    """Async token bucket: ``rate`` tokens per second, bursting up to ``capacity``."""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self):
+        # The lock queues waiters in arrival order so a burst drains fairly
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class CircuitBreaker:
+    """Opens after ``threshold`` consecutive failures and lets a single probe
+    through once ``reset_timeout`` seconds have passed."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, threshold: int, reset_timeout: float):
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+
+    def allow(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        # One probe per reset period; a probe that never reports back doesn't wedge the breaker
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            self.state = self.HALF_OPEN
+            self._opened_at = time.monotonic()
+            return True
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.failures = 0
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit opened after {self.failures} consecutive failures")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+class Upstream:
+    """Rate limit, circuit breaker and async retries around an upstream client.
+
+    Coroutine functions are awaited directly; blocking ones run on the ``pool``
+    executor. Retries back off with full jitter on the event loop, so a
+    throttled upstream doesn't tie up threads.
+    """
+
+    def __init__(self, name: str, pool: str, bucket: TokenBucket, breaker: CircuitBreaker,
+                 retries: int, backoff_base: float, backoff_max: float):
+        self.name = name
+        self.pool = pool
+        self.bucket = bucket
+        self.breaker = breaker
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+    async def call(self, fn: Callable, *args):
+        for attempt in range(self.retries + 1):
+            if not self.breaker.allow():
+                raise UpstreamUnavailable(self.name)
+            await self.bucket.acquire()
+            start = time.perf_counter_ns()
+            try:
+                if inspect.iscoroutinefunction(fn):
+                    result = await fn(*args)
+                else:
+                    result = await run_in(self.pool, fn, *args)
+            except ServiceBusy:
+                raise  # our own pool is saturated; not upstream's fault
+            except Exception as e:
+                self._observe("error", start)
+                self.breaker.record_failure()
+                if attempt == self.retries:
+                    raise
+                delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+                logger.warning(f"{self.name} attempt {attempt + 1} failed ({e}), retrying in {delay:.2f}s")
+                await asyncio.sleep(delay)
+            else:
+                self._observe("ok", start)
+                self.breaker.record_success()
+                return result
+
+    def _observe(self, outcome: str, start_ns: int):
+        elapsed_ns = time.perf_counter_ns() - start_ns
+        upstream_request_duration.labels(self.name, outcome).observe(elapsed_ns / 1e9)
+        record_timing("upstream", elapsed_ns)
+
+    def stats(self) -> dict:
+        return {"state": self.breaker.state, "failures": self.breaker.failures}
+
+
+yahoo = Upstream(
+    "yahoo",
+    "market_data",
+    TokenBucket(YAHOO_RATE_LIMIT, YAHOO_BURST),
+    CircuitBreaker(YAHOO_BREAKER_THRESHOLD, YAHOO_BREAKER_RESET),
+    retries=YAHOO_RETRIES,
+    backoff_base=YAHOO_BACKOFF_BASE,
+    backoff_max=YAHOO_BACKOFF_MAX,
+)
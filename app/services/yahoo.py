@@ -0,0 +1,193 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from datetime import timedelta, timezone
+from typing import Optional
+
+import httpx
+import numpy as np
+
+from app.config import YAHOO_MAX_CONNECTIONS, YAHOO_TIMEOUT
+
+logger = logging.getLogger(__name__)
+
+QUERY_URL = "https://query1.finance.yahoo.com"
+COOKIE_URL = "https://fc.yahoo.com"
+USER_AGENT = "Mozilla/5.0 (compatible; MarketValues/1.0)"
+INFO_MODULES = "price,assetProfile,summaryDetail,defaultKeyStatistics"
+
+
+class YahooError(Exception):
+    """Yahoo answered with an error status; raised so Upstream retries and counts it."""
+
+
+@dataclass
+class Chart:
+    """One symbol's bars as column arrays; rows with no close are already dropped."""
+
+    symbol: str
+    timestamps: np.ndarray  # int64 unix seconds
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray  # int64
+    gmtoffset: int = 0
+    previous_close: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self.timestamps)
+
+    def records(self) -> list[dict]:
+        """Bars in the candle format the API has always returned."""
+        tz = timezone(timedelta(seconds=self.gmtoffset))
+        offset = tz.tzname(None)[3:] or "+00:00"
+        local = (self.timestamps + self.gmtoffset).astype("datetime64[s]")
+        stamps = np.char.add(np.char.replace(np.datetime_as_string(local), "T", " "), offset)
+        return [
+            {"Datetime": t, "Open": o, "High": h, "Low": lo, "Close": c, "Volume": v}
+            for t, o, h, lo, c, v in zip(
+                stamps.tolist(), self.open.tolist(), self.high.tolist(),
+                self.low.tolist(), self.close.tolist(), self.volume.tolist(),
+            )
+        ]
+
+
+def _column(values: Optional[list], n: int) -> np.ndarray:
+    # Yahoo sends null for bars with no trades; float64 turns those into NaN
+    return np.array(values if values is not None else [None] * n, dtype=np.float64)
+
+
+def parse_chart(symbol: str, result: dict) -> Optional[Chart]:
+    timestamps = result.get("timestamp")
+    if not timestamps:
+        return None
+    meta = result.get("meta", {})
+    quote = result.get("indicators", {}).get("quote", [{}])[0]
+    n = len(timestamps)
+
+    close = _column(quote.get("close"), n)
+    keep = ~np.isnan(close)
+    volume = np.nan_to_num(_column(quote.get("volume"), n)[keep]).astype(np.int64)
+    return Chart(
+        symbol=symbol,
+        timestamps=np.asarray(timestamps, dtype=np.int64)[keep],
+        open=_column(quote.get("open"), n)[keep],
+        high=_column(quote.get("high"), n)[keep],
+        low=_column(quote.get("low"), n)[keep],
+        close=close[keep],
+        volume=volume,
+        gmtoffset=meta.get("gmtoffset") or 0,
+        previous_close=meta.get("chartPreviousClose"),
+    )
+
+
+def _flatten_modules(modules: dict) -> dict:
+    # quoteSummary wraps numbers as {"raw": 1.2, "fmt": "1.20"}; keep the raw value
+    flat = {}
+    for module in modules.values():
+        for key, value in (module or {}).items():
+            if isinstance(value, dict):
+                if "raw" in value:
+                    flat.setdefault(key, value["raw"])
+            elif value is not None:
+                flat.setdefault(key, value)
+    return flat
+
+
+class YahooClient:
+    """Async client for Yahoo's chart, spark and quoteSummary endpoints.
+
+    One pooled ``httpx.AsyncClient`` is shared by every request, so concurrent
+    fetches cost sockets rather than threads. Responses are parsed straight
+    into NumPy arrays.
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self._transport = transport
+        self._client: Optional[httpx.AsyncClient] = None
+        self._crumb: Optional[str] = None
+        self._crumb_lock = asyncio.Lock()
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=YAHOO_TIMEOUT,
+                limits=httpx.Limits(
+                    max_connections=YAHOO_MAX_CONNECTIONS,
+                    max_keepalive_connections=YAHOO_MAX_CONNECTIONS,
+                ),
+                headers={"User-Agent": USER_AGENT},
+                follow_redirects=True,
+                transport=self._transport,
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._crumb = None
+
+    async def _get(self, path: str, params: dict) -> Optional[dict]:
+        response = await self.client.get(f"{QUERY_URL}{path}", params=params)
+        if response.status_code == 404:
+            return None
+        if response.status_code != 200:
+            raise YahooError(f"{path} returned {response.status_code}")
+        return response.json()
+
+    async def chart(self, symbol: str, interval: str, period: str) -> Optional[Chart]:
+        body = await self._get(f"/v8/finance/chart/{symbol}", {"interval": interval, "range": period})
+        results = ((body or {}).get("chart") or {}).get("result") or []
+        return parse_chart(symbol, results[0]) if results else None
+
+    async def spark(self, symbols: list[str], period: str = "2d", interval: str = "1d") -> dict[str, Chart]:
+        """Close series for several symbols in one request; missing symbols are left out."""
+        body = await self._get(
+            "/v7/finance/spark", {"symbols": ",".join(symbols), "range": period, "interval": interval},
+        )
+        charts = {}
+        for entry in ((body or {}).get("spark") or {}).get("result") or []:
+            response = entry.get("response") or []
+            chart = parse_chart(entry["symbol"], response[0]) if response else None
+            if chart is not None:
+                charts[entry["symbol"]] = chart
+        return charts
+
+    async def _get_crumb(self) -> str:
+        async with self._crumb_lock:
+            if self._crumb is None:
+                # quoteSummary wants a session cookie plus the crumb issued for it
+                try:
+                    await self.client.get(COOKIE_URL)
+                except httpx.HTTPError:
+                    pass
+                response = await self.client.get(f"{QUERY_URL}/v1/test/getcrumb")
+                if response.status_code != 200 or not response.text:
+                    raise YahooError(f"getcrumb returned {response.status_code}")
+                self._crumb = response.text
+            return self._crumb
+
+    async def info(self, symbol: str) -> dict:
+        """Profile and key statistics, flattened to yfinance's ``Ticker.info`` keys."""
+        for attempt in range(2):
+            crumb = await self._get_crumb()
+            response = await self.client.get(
+                f"{QUERY_URL}/v10/finance/quoteSummary/{symbol}",
+                params={"modules": INFO_MODULES, "crumb": crumb},
+            )
+            if response.status_code == 401 and attempt == 0:
+                self._crumb = None  # expired session; fetch a fresh one once
+                continue
+            break
+        if response.status_code == 404:
+            return {}
+        if response.status_code != 200:
+            raise YahooError(f"quoteSummary returned {response.status_code}")
+        results = (response.json().get("quoteSummary") or {}).get("result") or []
+        return _flatten_modules(results[0]) if results else {}
+
+
+yahoo_client = YahooClient()
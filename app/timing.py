@@ -0,0 +1,40 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter_ns
+from typing import Optional
+
+# Per-request time spent in each backend (db, cache, upstream), in nanoseconds.
+# The middleware installs a fresh dict per request; tasks spawned while handling
+# it inherit the same dict, so concurrent calls add up (the totals can exceed
+# wall-clock time).
+_request_timings: ContextVar[Optional[dict]] = ContextVar("request_timings", default=None)
+
+
+def start_request() -> tuple[dict, object]:
+    timings: dict = {}
+    return timings, _request_timings.set(timings)
+
+
+def end_request(token):
+    _request_timings.reset(token)
+
+
+def record_timing(name: str, elapsed_ns: int):
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[name] = timings.get(name, 0) + elapsed_ns
+
+
+@contextmanager
+def timed(name: str):
+    start = perf_counter_ns()
+    try:
+        yield
+    finally:
+        record_timing(name, perf_counter_ns() - start)
+
+
+def server_timing(timings: dict, total_ns: int) -> str:
+    entries = [f"{name};dur={ns / 1e6:.1f}" for name, ns in timings.items()]
+    entries.append(f"app;dur={total_ns / 1e6:.1f}")
+    return ", ".join(entries)
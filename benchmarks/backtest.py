@@ -0,0 +1,95 @@
+"""Backtest throughput in bars/second (combinations x bars per second of wall time).
+
+Compares one combination per call (what a per-strategy loop would do) with
+the vectorized sweep in one process, and with the sweep split across the
+backtest worker processes.
+
+Run from the repo root:
+    python -m benchmarks.backtest
+    python -m benchmarks.backtest --bars 100000 --workers 1 2 4 8
+"""
+import argparse
+import asyncio
+import math
+import time
+
+import numpy as np
+
+from app.executors import BoundedProcessExecutor
+from app.services.backtest import CHUNK_CELLS, parameter_grid, run_grid
+
+GRIDS = {
+    "sma_cross": {"fast": list(range(5, 55, 5)), "slow": list(range(20, 220, 10))},
+    "ema_cross": {"fast": list(range(5, 55, 5)), "slow": list(range(20, 220, 10))},
+    "rsi_threshold": {"window": [7, 14, 21, 28], "lower": [20, 25, 30, 35, 40], "upper": [60, 65, 70, 75, 80]},
+    "breakout": {"entry": list(range(10, 110, 10)), "exit": list(range(5, 55, 5))},
+}
+
+
+def prices(bars: int) -> np.ndarray:
+    return 100 * np.exp(np.cumsum(np.random.default_rng(0).normal(0, 0.01, bars)))
+
+
+def one_at_a_time(strategy: str, close: np.ndarray, grid: np.ndarray) -> float:
+    start = time.perf_counter()
+    for row in grid:
+        run_grid(strategy, close, row[None, :], 0.001, 252)
+    return time.perf_counter() - start
+
+
+def vectorized(strategy: str, close: np.ndarray, grid: np.ndarray) -> float:
+    start = time.perf_counter()
+    size = max(1, CHUNK_CELLS // len(close))
+    for i in range(0, len(grid), size):
+        run_grid(strategy, close, grid[i:i + size], 0.001, 252)
+    return time.perf_counter() - start
+
+
+async def pooled(pool: BoundedProcessExecutor, strategy: str, close: np.ndarray, grid: np.ndarray) -> float:
+    # Same chunking as services.backtest.sweep
+    size = max(1, min(math.ceil(len(grid) / pool.workers), CHUNK_CELLS // len(close)))
+    start = time.perf_counter()
+    futures = [pool.submit(run_grid, strategy, close, grid[i:i + size], 0.001, 252)
+               for i in range(0, len(grid), size)]
+    await asyncio.gather(*futures)
+    return time.perf_counter() - start
+
+
+async def run(bars: int, workers: list[int]):
+    close = prices(bars)
+    pools = {n: BoundedProcessExecutor(f"bench-{n}", n, 1024) for n in workers}
+    for pool in pools.values():
+        # Spawn and import in every worker before timing anything
+        await asyncio.gather(*(pool.submit(run_grid, "sma_cross", close[:300], np.array([[5.0, 20.0]]), 0.0, 252)
+                               for _ in range(pool.workers * 2)))
+
+    header = f"{'strategy':<15}{'combos':>8}{'1 at a time':>14}{'vectorized':>14}"
+    print(f"{bars:,} bars per series; bars/second (millions)")
+    print(header + "".join(f"{f'{n} procs':>12}" for n in workers))
+    try:
+        for strategy, params in GRIDS.items():
+            grid = parameter_grid(strategy, params, bars)
+            cells = len(grid) * bars / 1e6
+            # The per-combination loop is slow; time a sample of it
+            sample = grid[:: max(1, len(grid) // 20)]
+            row = f"{strategy:<15}{len(grid):>8}"
+            row += f"{len(sample) * bars / 1e6 / one_at_a_time(strategy, close, sample):>14.2f}"
+            row += f"{cells / vectorized(strategy, close, grid):>14.2f}"
+            for n in workers:
+                row += f"{cells / await pooled(pools[n], strategy, close, grid):>12.2f}"
+            print(row)
+    finally:
+        for pool in pools.values():
+            pool.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--bars", type=int, default=5000, help="bars per series (5000 is ~20 years daily)")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+    asyncio.run(run(args.bars, args.workers))
+
+
+if __name__ == "__main__":
+    main()
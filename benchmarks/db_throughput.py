@@ -0,0 +1,105 @@
+"""Concurrent read/write throughput against the configured database engine.
+
+Each process runs ``--concurrency`` async workers mixing reads and writes, which
+mirrors several uvicorn workers sharing one database.
+
+Run from the repo root:
+    python -m benchmarks.db_throughput                        # temp SQLite file, WAL pragmas
+    python -m benchmarks.db_throughput --no-pragmas           # temp SQLite file, driver defaults
+    python -m benchmarks.db_throughput --url postgresql+asyncpg://user:pw@localhost/bench
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import tempfile
+import time
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.database import Base, create_engine
+from app.models import Alert, User
+
+
+def make_engine(url: str, pragmas: bool):
+    return create_engine(url) if pragmas else create_async_engine(url)
+
+
+async def setup(url: str, pragmas: bool):
+    engine = make_engine(url, pragmas)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.run_sync(Base.metadata.create_all)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    async with session_factory() as db:
+        db.add_all(User(email=f"u{i}@x.com", username=f"u{i}", hashed_password="x") for i in range(50))
+        await db.commit()
+    await engine.dispose()
+
+
+async def worker(session_factory, deadline: float, write_ratio: float, counts: dict):
+    while time.perf_counter() < deadline:
+        user_id = random.randint(1, 50)
+        try:
+            async with session_factory() as db:
+                if random.random() < write_ratio:
+                    db.add(Alert(user_id=user_id, symbol="RELIANCE.NS", condition="above", target_price=2500.0))
+                    await db.commit()
+                    counts["writes"] += 1
+                else:
+                    result = await db.execute(select(Alert).where(Alert.user_id == user_id).limit(50))
+                    result.scalars().all()
+                    counts["reads"] += 1
+        except Exception:
+            counts["errors"] += 1
+
+
+async def run_workers(url, pragmas, concurrency, seconds, write_ratio) -> dict:
+    engine = make_engine(url, pragmas)
+    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    counts = {"reads": 0, "writes": 0, "errors": 0}
+    deadline = time.perf_counter() + seconds
+    await asyncio.gather(*(worker(session_factory, deadline, write_ratio, counts) for _ in range(concurrency)))
+    await engine.dispose()
+    return counts
+
+
+def process_main(args, queue):
+    queue.put(asyncio.run(run_workers(*args)))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url")
+    parser.add_argument("--no-pragmas", action="store_true", help="plain create_async_engine, no tuning")
+    parser.add_argument("--processes", type=int, default=4)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=5)
+    parser.add_argument("--write-ratio", type=float, default=0.2)
+    args = parser.parse_args()
+
+    url = args.url or f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}"
+    pragmas = not args.no_pragmas
+    asyncio.run(setup(url, pragmas))
+
+    queue = multiprocessing.Queue()
+    worker_args = (url, pragmas, args.concurrency, args.seconds, args.write_ratio)
+    procs = [multiprocessing.Process(target=process_main, args=(worker_args, queue)) for _ in range(args.processes)]
+    for p in procs:
+        p.start()
+    results = [queue.get() for _ in procs]
+    for p in procs:
+        p.join()
+
+    total = {k: sum(r[k] for r in results) for k in ("reads", "writes", "errors")}
+    print(f"{url.split('://')[0]} pragmas={pragmas} processes={args.processes} "
+          f"concurrency={args.concurrency} write_ratio={args.write_ratio}")
+    print(f"  reads/s  {total['reads'] / args.seconds:10.1f}")
+    print(f"  writes/s {total['writes'] / args.seconds:10.1f}")
+    print(f"  errors   {total['errors']:10d}")
+
+
+if __name__ == "__main__":
+    main()
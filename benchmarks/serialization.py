@@ -0,0 +1,81 @@
+"""Serialization cost per hot-endpoint payload: default FastAPI path vs FastJSONResponse.
+
+Run from the repo root:  python -m benchmarks.serialization
+"""
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from app.responses import FastJSONResponse
+
+
+def candles_payload(n: int) -> dict:
+    data = [
+        {
+            "Datetime": f"2024-01-01 09:{i % 60:02d}:00+05:30",
+            "Open": 100.0 + i * 0.01,
+            "High": 101.0 + i * 0.01,
+            "Low": 99.0 + i * 0.01,
+            "Close": 100.5 + i * 0.01,
+            "Volume": 1000 + i,
+        }
+        for i in range(n)
+    ]
+    points = [{"time": 1704080700 + i * 60, "value": 100.0 + i * 0.01} for i in range(n)]
+    return {"data": data, "indicators": {"sma_20": points, "rsi_14": points}}
+
+
+def stocks_payload(n: int) -> dict:
+    return {"data": [
+        {"symbol": f"SYM{i}.NS", "current_price": 1234.5, "previous_close": 1220.0,
+         "change": 14.5, "percent_change": 1.19}
+        for i in range(n)
+    ]}
+
+
+def prediction_payload(days: int) -> dict:
+    series = [{"time": 1704067200 + i * 86400, "value": 2500.0 + i} for i in range(90)]
+    band = [{"time": 1704067200 + i * 86400, "upper": 2550.0, "lower": 2450.0} for i in range(days)]
+    return {"symbol": "RELIANCE.NS", "historical": series, "predicted": series[:days],
+            "confidence_band": band, "model_info": {"look_back": 60, "epochs": 15}}
+
+
+def default_path(content) -> bytes:
+    # What FastAPI does for a plain dict return value: jsonable_encoder, then JSONResponse.render
+    return json.dumps(jsonable_encoder(content), ensure_ascii=False, allow_nan=False,
+                      separators=(",", ":")).encode()
+
+
+def fast_path(content) -> bytes:
+    return FastJSONResponse(content).body
+
+
+def timeit(fn, content, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn(content)
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    cases = [
+        ("/api/stocks (29)", stocks_payload(29)),
+        ("/api/predictions (30d)", prediction_payload(30)),
+        ("/api/stocks/candles (1k)", candles_payload(1_000)),
+        ("/api/stocks/candles (10k)", candles_payload(10_000)),
+        ("/api/stocks/candles (100k)", candles_payload(100_000)),
+    ]
+    print(f"{'payload':<28}{'bytes':>12}{'default ms':>12}{'fast ms':>10}{'speedup':>9}")
+    for name, content in cases:
+        repeat = 3 if len(fast_path(content)) > 1_000_000 else 20
+        size = len(fast_path(content))
+        slow = timeit(default_path, content, repeat)
+        fast = timeit(fast_path, content, repeat)
+        print(f"{name:<28}{size:>12,}{slow:>12.2f}{fast:>10.2f}{slow / fast:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -15,6 +15,9 @@ const INDICATOR_COLORS = {
   rsi_14: "#ec4899",
 };
 
+// Intervals the server builds live from the Upstox tick feed
+const LIVE_INTERVALS = ["1m", "5m", "15m", "1h"];
+
 export default function Chart({ symbol, interval = "5m", indicators = [] }) {
   const chartContainer = useRef();
   const theme = useThemeStore((s) => s.theme);
@@ -74,7 +77,11 @@ export default function Chart({ symbol, interval = "5m", indicators = [] }) {
     });
 
     const indicatorParam = indicators.length > 0 ? `&indicators=${indicators.join(",")}` : "";
-    api.get(`/stocks/candles/${symbol}?interval=${interval}${indicatorParam}`)
+    // More candles than pixels can't be drawn; the server merges them (and thins indicators to match)
+    const maxPoints = Math.min(10000, Math.max(100, Math.round(container.clientWidth)));
+    let lastTime = 0;
+    let merged = false;
+    api.get(`/stocks/candles/${symbol}?interval=${interval}${indicatorParam}&max_points=${maxPoints}`)
       .then((res) => {
         const data = res.data.data;
         if (!data || data.length === 0) return;
@@ -87,6 +94,8 @@ export default function Chart({ symbol, interval = "5m", indicators = [] }) {
           close: item.Close,
         }));
         candleSeries.setData(formatted);
+        lastTime = formatted[formatted.length - 1].time;
+        merged = data.length >= maxPoints;
 
         // Volume bars
         const volumeData = data.map((item) => ({
@@ -114,11 +123,33 @@ export default function Chart({ symbol, interval = "5m", indicators = [] }) {
       })
       .catch((err) => console.error("Failed to fetch candle data:", err));
 
+    // Live bar updates replace polling for intraday charts
+    let liveWs = null;
+    if (LIVE_INTERVALS.includes(interval)) {
+      liveWs = new WebSocket(`ws://${window.location.host}/ws/candles`);
+      liveWs.onopen = () => liveWs.send(JSON.stringify({ type: "subscribe", symbol, interval }));
+      liveWs.onmessage = (event) => {
+        const msg = JSON.parse(event.data);
+        if (msg.type !== "bar") return;
+        const bar = msg.data;
+        const time = Math.floor(new Date(bar.Datetime).getTime() / 1000);
+        // A merged last candle already covers every bar from its start time on; only newer bars extend it
+        if (time < lastTime || (merged && time === lastTime)) return;
+        candleSeries.update({ time, open: bar.Open, high: bar.High, low: bar.Low, close: bar.Close });
+        volumeSeries.update({
+          time,
+          value: bar.Volume,
+          color: bar.Close >= bar.Open ? "rgba(16,185,129,0.3)" : "rgba(239,68,68,0.3)",
+        });
+      };
+    }
+
     const handleResize = () => chart.applyOptions({ width: container.clientWidth });
     window.addEventListener("resize", handleResize);
 
     return () => {
       window.removeEventListener("resize", handleResize);
+      if (liveWs) liveWs.close();
       chart.remove();
     };
   }, [symbol, interval, indicators.join(","), theme]);
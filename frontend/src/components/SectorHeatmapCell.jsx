@@ -1,4 +1,6 @@
-export default function SectorHeatmapCell({ stock }) {
+import Sparkline from "./Sparkline";
+
+export default function SectorHeatmapCell({ stock, sparkline }) {
   const change = stock.percent_change;
   const positive = change >= 0;
 
@@ -22,6 +24,14 @@ export default function SectorHeatmapCell({ stock }) {
       <p className="text-[10px] text-slate-400 mt-0.5">
         {stock.current_price?.toFixed(2)}
       </p>
+      {sparkline && (
+        <Sparkline
+          values={sparkline.close}
+          previousClose={sparkline.previousClose}
+          positive={positive}
+          className="w-full h-4 mt-1"
+        />
+      )}
     </div>
   );
 }
@@ -0,0 +1,27 @@
+export default function Sparkline({ values, previousClose, positive, className = "w-full h-6 mt-2" }) {
+  const points = values
+    .map((v, i) => [i, v])
+    .filter(([, v]) => v !== null);
+  if (points.length < 2) return null;
+
+  const all = points.map(([, v]) => v).concat(previousClose ?? []);
+  const min = Math.min(...all);
+  const range = Math.max(...all) - min || 1;
+  const x = (i) => (i / (values.length - 1)) * 100;
+  const y = (v) => 28 - ((v - min) / range) * 26;
+
+  return (
+    <svg viewBox="0 0 100 30" preserveAspectRatio="none" className={className}>
+      {previousClose != null && (
+        <line x1="0" x2="100" y1={y(previousClose)} y2={y(previousClose)} className="stroke-slate-700" strokeDasharray="2 2" strokeWidth="0.5" />
+      )}
+      <polyline
+        points={points.map(([i, v]) => `${x(i)},${y(v)}`).join(" ")}
+        fill="none"
+        strokeWidth="1.5"
+        vectorEffect="non-scaling-stroke"
+        className={positive ? "stroke-emerald-400" : "stroke-red-400"}
+      />
+    </svg>
+  );
+}
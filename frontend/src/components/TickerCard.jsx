@@ -1,4 +1,6 @@
-export default function TickerCard({ stock, isSelected, onClick }) {
+import Sparkline from "./Sparkline";
+
+export default function TickerCard({ stock, sparkline, isSelected, onClick }) {
   const positive = stock.percent_change >= 0;
 
   return (
@@ -42,6 +44,10 @@ export default function TickerCard({ stock, isSelected, onClick }) {
         </span>
         <span className="text-[10px] text-slate-600">from prev close</span>
       </div>
+
+      {sparkline && (
+        <Sparkline values={sparkline.close} previousClose={sparkline.previousClose} positive={positive} />
+      )}
     </div>
   );
 }
@@ -0,0 +1,10 @@
+import api from "./api";
+
+// Today's trend per symbol from the shared server snapshot, keyed by symbol
+export async function fetchSparklines(symbols) {
+  const res = await api.get("/stocks/sparklines", { params: { symbols: symbols.join(",") } });
+  const { symbols: found, close, previous_close } = res.data;
+  return Object.fromEntries(
+    found.map((s, i) => [s, { close: close[i], previousClose: previous_close[i] }])
+  );
+}
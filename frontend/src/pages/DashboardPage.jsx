@@ -3,12 +3,30 @@ import TickerCard from "../components/TickerCard";
 import Chart from "../components/Chart";
 import TimeframeSelector from "../components/TimeframeSelector";
 import NewsFeed from "../components/NewsFeed";
-import { useState } from "react";
+import { fetchSparklines } from "../lib/sparklines";
+import { useEffect, useState } from "react";
 
 export default function DashboardPage() {
   const { stocks, selected, setSelected } = useStockStore();
   const [interval, setInterval] = useState("5m");
   const [indicators, setIndicators] = useState([]);
+  const [sparklines, setSparklines] = useState({});
+  const cardSymbols = stocks.slice(0, 10).map((s) => s.symbol).join(",");
+
+  useEffect(() => {
+    if (!cardSymbols) return;
+    // One request for every card; the server answers from its shared snapshot
+    const load = async () => {
+      try {
+        setSparklines(await fetchSparklines(cardSymbols.split(",")));
+      } catch {
+        // Cards render fine without a trend line
+      }
+    };
+    load();
+    const timer = window.setInterval(load, 60000);
+    return () => window.clearInterval(timer);
+  }, [cardSymbols]);
 
   return (
     <div className="p-4 md:p-8">
@@ -18,6 +36,7 @@ export default function DashboardPage() {
           <TickerCard
             key={stock.symbol}
             stock={stock}
+            sparkline={sparklines[stock.symbol]}
             isSelected={stock.symbol === selected}
             onClick={() => setSelected(stock.symbol)}
           />
@@ -1,10 +1,12 @@
 import { useEffect, useState } from "react";
 import api from "../lib/api";
+import { fetchSparklines } from "../lib/sparklines";
 import SectorHeatmapCell from "../components/SectorHeatmapCell";
 
 export default function HeatmapPage() {
   const [sectors, setSectors] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [sparklines, setSparklines] = useState({});
 
   useEffect(() => {
     const fetch = async () => {
@@ -17,6 +19,25 @@ export default function HeatmapPage() {
     fetch();
   }, []);
 
+  const heatmapSymbols = sectors
+    ? Object.values(sectors).flatMap((data) => data.stocks?.map((s) => s.symbol) ?? []).join(",")
+    : "";
+
+  useEffect(() => {
+    if (!heatmapSymbols) return;
+    // Every cell's trend in one request, like the dashboard cards
+    const load = async () => {
+      try {
+        setSparklines(await fetchSparklines(heatmapSymbols.split(",")));
+      } catch {
+        // Cells render fine without a trend line
+      }
+    };
+    load();
+    const timer = window.setInterval(load, 60000);
+    return () => window.clearInterval(timer);
+  }, [heatmapSymbols]);
+
   if (loading) return <div className="p-8 text-slate-500">Loading heatmap...</div>;
   if (!sectors) return <div className="p-8 text-slate-500">Failed to load sector data</div>;
 
@@ -34,7 +55,7 @@ export default function HeatmapPage() {
             </div>
             <div className="grid grid-cols-1 gap-1">
               {data.stocks?.map((stock) => (
-                <SectorHeatmapCell key={stock.symbol} stock={stock} />
+                <SectorHeatmapCell key={stock.symbol} stock={stock} sparkline={sparklines[stock.symbol]} />
               ))}
             </div>
           </div>
@@ -1,12 +1,17 @@
+import os
 import pytest
 import asyncio
+from unittest.mock import patch
 from httpx import AsyncClient, ASGITransport
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 
 from app.database import Base, get_db
+from app.dependencies import principal_cache
 from app.main import app
+from app.services.fundamentals import fundamentals
+from app.services.upstream import yahoo
 
-TEST_DATABASE_URL = "sqlite+aiosqlite:///:memory:"
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL", "sqlite+aiosqlite:///:memory:")
 
 
 @pytest.fixture(scope="session")
@@ -16,23 +21,63 @@ def event_loop():
     loop.close()
 
 
-@pytest.fixture
-async def db_session():
+@pytest.fixture(autouse=True)
+def clear_principal_cache():
+    principal_cache.clear()
+    yield
+    principal_cache.clear()
+
+
+@pytest.fixture(autouse=True)
+def clear_fundamentals():
+    fundamentals.records.clear()
+    fundamentals.extra.clear()
+    yield
+    fundamentals.records.clear()
+    fundamentals.extra.clear()
+
+
+@pytest.fixture(autouse=True)
+def reset_upstream():
+    # Upstream failures in one test must not leave the shared breaker open for the next
+    yahoo.breaker.record_success()
+    with patch("app.services.upstream.random.uniform", return_value=0):
+        yield
+    yahoo.breaker.record_success()
+
+
+@pytest.fixture(autouse=True)
+async def test_engine():
+    # One engine per test creates and drops the tables; every session below
+    # shares it, so no fixture tears down tables another is still using
     engine = create_async_engine(TEST_DATABASE_URL, echo=False)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
 
-    session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
-
-    async with session_factory() as session:
-        yield session
+    yield engine
 
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
-
     await engine.dispose()
 
 
+@pytest.fixture(autouse=True)
+async def stock_store_session(test_engine):
+    # Keep the durable stock and candle stores off the app database so tests don't share rows
+    session_factory = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+    with patch("app.services.stock_store.async_session", session_factory), \
+         patch("app.services.candle_store.async_session", session_factory):
+        yield session_factory
+
+
+@pytest.fixture
+async def db_session(test_engine):
+    session_factory = async_sessionmaker(test_engine, class_=AsyncSession, expire_on_commit=False)
+
+    async with session_factory() as session:
+        yield session
+
+
 @pytest.fixture
 async def client(db_session):
     async def override_get_db():
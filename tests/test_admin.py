@@ -0,0 +1,67 @@
+import asyncio
+import pytest
+from sqlalchemy import update
+
+from app.dependencies import principal_cache
+from app.models import User
+
+
+@pytest.fixture
+async def admin_client(auth_client, db_session):
+    await db_session.execute(update(User).where(User.username == "testuser").values(is_admin=True))
+    await db_session.commit()
+    principal_cache.clear()
+    return auth_client
+
+
+@pytest.mark.asyncio
+async def test_admin_routes_require_admin(auth_client):
+    res = await auth_client.get("/api/admin/tasks")
+    assert res.status_code == 403
+    # Registering can't grant it
+    await auth_client.post("/api/auth/register", json={
+        "email": "x@example.com", "username": "root", "password": "testpass123", "is_admin": True,
+    })
+    login = await auth_client.post("/api/auth/login", json={"username": "root", "password": "testpass123"})
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+    assert (await auth_client.get("/api/admin/tasks", headers=headers)).status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_profile_session_exports_folded_stacks(admin_client):
+    res = await admin_client.post("/api/admin/profile/start?seconds=5&interval_ms=2")
+    assert res.status_code == 200
+    assert (await admin_client.post("/api/admin/profile/start")).status_code == 409
+
+    async def child():
+        await asyncio.sleep(0.02)
+
+    await asyncio.gather(*(asyncio.create_task(child()) for _ in range(3)))
+    # Reading while the sampler is adding new stacks
+    for _ in range(20):
+        assert (await admin_client.get("/api/admin/profile")).status_code == 200
+        assert (await admin_client.get("/api/admin/profile/folded")).status_code == 200
+        await asyncio.sleep(0.005)
+
+    summary = (await admin_client.post("/api/admin/profile/stop")).json()
+    assert not summary["running"]
+    assert summary["samples"] > 0
+    assert summary["top_frames"]
+    assert any(c["coroutine"].endswith("child") and c["count"] == 3 for c in summary["coroutines"])
+
+    folded = (await admin_client.get("/api/admin/profile/folded")).text
+    stack, count = folded.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 0 and ";" in stack
+
+    # The task factory is restored once the session ends
+    await asyncio.sleep(0)
+    assert asyncio.get_running_loop().get_task_factory() is None
+
+
+@pytest.mark.asyncio
+async def test_task_and_thread_snapshots(admin_client):
+    tasks = (await admin_client.get("/api/admin/tasks")).json()["tasks"]
+    assert any(t["coroutine"] for t in tasks)
+
+    threads = (await admin_client.get("/api/admin/threads")).json()["threads"]
+    assert any(t["thread"] == "MainThread" for t in threads["other"])
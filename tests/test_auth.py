@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import patch, AsyncMock
 
 
 @pytest.mark.asyncio
@@ -67,3 +68,56 @@ async def test_get_me(auth_client):
 async def test_get_me_unauthorized(client):
     res = await client.get("/api/auth/me")
     assert res.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_authenticated_requests_reuse_cached_principal(auth_client, db_session):
+    from sqlalchemy import event
+
+    await auth_client.get("/api/auth/me")
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db_session.bind.sync_engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        me = await auth_client.get("/api/auth/me")
+        with patch("app.services.stocks.fetch_all_stocks", new_callable=AsyncMock, return_value=[]), \
+             patch("app.routers.stocks.fetch_all_stocks", new_callable=AsyncMock, return_value=[]):
+            await auth_client.get("/api/stocks")
+            await auth_client.get("/api/stocks")
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert me.json()["username"] == "testuser"
+    # The first /api/stocks loads the (absent) Upstox link once; everything else is cached
+    assert [s for s in statements if "FROM users" in s] == []
+    assert len([s for s in statements if "FROM upstox_tokens" in s]) == 1
+
+
+@pytest.mark.asyncio
+async def test_upstox_unlink_invalidates_principal(auth_client):
+    from app.dependencies import principal_cache
+
+    await auth_client.get("/api/auth/me")
+    user_id = (await auth_client.get("/api/auth/me")).json()["id"]
+    assert principal_cache.get(user_id) is not None
+
+    await auth_client.delete("/api/upstox/unlink")
+    assert principal_cache.get(user_id) is None
+
+
+@pytest.mark.asyncio
+async def test_login_rejected_when_hash_pool_saturated(client):
+    from app.auth import password_hasher
+
+    with patch.object(password_hasher, "max_pending", 0):
+        res = await client.post("/api/auth/register", json={
+            "email": "busy@example.com",
+            "username": "busyuser",
+            "password": "password123",
+        })
+    assert res.status_code == 503
+    assert password_hasher.stats()["rejected"] >= 1
@@ -0,0 +1,108 @@
+import pytest
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from app.services.backfill import Backfill, plan_chunks
+from app.services.candle_store import candles_read, last_bar_times
+
+
+def test_ranges_split_into_api_sized_chunks():
+    chunks = plan_chunks(date(2024, 1, 1), date(2024, 3, 10), 30)
+    assert chunks == [
+        (date(2024, 1, 1), date(2024, 1, 30)),
+        (date(2024, 1, 31), date(2024, 2, 29)),
+        (date(2024, 3, 1), date(2024, 3, 10)),
+    ]
+    assert plan_chunks(date(2024, 1, 2), date(2024, 1, 1), 30) == []
+
+
+def bar_time(day: str) -> int:
+    return int(datetime.fromisoformat(f"{day}T00:00:00+05:30").timestamp())
+
+
+def fake_history(access_token, key, interval, from_date, to_date):
+    # One daily bar per day in the range, newest first like the API
+    start, end = date.fromisoformat(from_date), date.fromisoformat(to_date)
+    days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+    return [[f"{d.isoformat()}T00:00:00+05:30", 10.0, 12.0, 9.0, 11.0 + d.day, 1000, 0] for d in reversed(days)]
+
+
+@pytest.mark.asyncio
+async def test_backfill_loads_chunks_and_resumes_from_last_bar():
+    job = Backfill(rate=1000, concurrency=4)
+    with patch("app.services.backfill.UPSTOX_HISTORY_CHUNK_DAYS", {"day": 10}), \
+         patch("app.services.backfill.get_historical_candles", side_effect=fake_history) as mock_history:
+        status = await job.run("token", ["TCS.NS", "INFY.NS"], "1d", date(2024, 1, 1), date(2024, 1, 25))
+        assert status["state"] == "finished"
+        assert (status["chunks"], status["rows"], status["failed"]) == (6, 50, 0)
+
+        bars = await candles_read("TCS.NS", "1d")
+        assert len(bars) == 25
+        assert bars.close[-1] == 36.0
+        since = bar_time("2024-01-20")
+        assert (await candles_read("TCS.NS", "1d", start=since)).close[0] == 31.0
+
+        # A rerun only re-fetches from the newest stored day onwards
+        mock_history.reset_mock()
+        status = await job.run("token", ["TCS.NS"], "1d", date(2024, 1, 1), date(2024, 1, 27))
+        assert mock_history.call_args.args[3:] == ("2024-01-25", "2024-01-27")
+        assert status["rows"] == 3
+
+    assert (await last_bar_times(["TCS.NS", "INFY.NS"], "1d"))["TCS.NS"] == bar_time("2024-01-27")
+    assert len(await candles_read("TCS.NS", "1d")) == 27
+
+
+@pytest.mark.asyncio
+async def test_failed_chunks_are_retried_then_reported():
+    job = Backfill(rate=1000, concurrency=2)
+    responses = iter([None, fake_history("t", "k", "day", "2024-01-01", "2024-01-05")])
+    with patch("app.services.backfill.BACKFILL_BACKOFF", 0), \
+         patch("app.services.backfill.get_historical_candles", side_effect=lambda *a: next(responses)):
+        status = await job.run("token", ["TCS.NS"], "1d", date(2024, 1, 1), date(2024, 1, 5))
+    assert (status["rows"], status["failed"]) == (5, 0)
+
+    with patch("app.services.backfill.BACKFILL_BACKOFF", 0), \
+         patch("app.services.backfill.get_historical_candles", return_value=None) as mock_history:
+        status = await job.run("token", ["WIPRO.NS"], "1d", date(2024, 1, 1), date(2024, 1, 5))
+    assert mock_history.call_count == 3
+    assert (status["rows"], status["failed"]) == (0, 1)
+
+
+@pytest.mark.asyncio
+async def test_any_chunk_error_is_counted_and_the_run_finishes():
+    from app.exceptions import ServiceBusy
+
+    def history(access_token, key, interval, from_date, to_date):
+        if key.endswith("INFY"):
+            raise ServiceBusy("backfill")
+        return fake_history(access_token, key, interval, from_date, to_date)
+
+    job = Backfill(rate=1000, concurrency=2)
+    with patch("app.services.backfill.get_historical_candles", side_effect=history):
+        status = await job.run("token", ["TCS.NS", "INFY.NS"], "1d", date(2024, 1, 1), date(2024, 1, 5))
+    assert (status["state"], status["rows"], status["failed"], status["done"]) == ("finished", 5, 1, 2)
+
+
+@pytest.mark.asyncio
+async def test_scheduled_update_resumes_tracked_symbols_with_an_admin_token(stock_store_session):
+    from app.models import UpstoxToken, User
+
+    async with stock_store_session() as db:
+        db.add_all([
+            User(id=1, email="a@x.com", username="admin", hashed_password="x", is_admin=True),
+            User(id=2, email="b@x.com", username="user", hashed_password="x"),
+            UpstoxToken(user_id=1, access_token="admin-token"),
+            UpstoxToken(user_id=2, access_token="user-token"),
+        ])
+        await db.commit()
+
+    job = Backfill(rate=1000, concurrency=4)
+    with patch("app.services.backfill.async_session", stock_store_session), \
+         patch("app.services.backfill.STOCK_CODES", ["TCS.NS"]), \
+         patch("app.services.backfill.INDEX_SYMBOLS", []), \
+         patch("app.services.backfill.BACKFILL_UPDATE_DAYS", 3), \
+         patch("app.services.backfill.get_historical_candles", side_effect=fake_history) as mock_history:
+        status = await job.update()
+
+    assert status["state"] == "finished" and status["rows"] == 3
+    assert {c.args[0] for c in mock_history.call_args_list} == {"admin-token"}
@@ -0,0 +1,146 @@
+import json
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+import ta
+from unittest.mock import patch
+
+from app.exceptions import InvalidBacktest
+from app.services.backtest import backtest_pool, parameter_grid, run_grid
+from app.services.candle_store import candles_load
+from app.services.yahoo import Chart
+
+
+def random_walk(n, seed=3):
+    return 100 * np.exp(np.cumsum(np.random.default_rng(seed).normal(0, 0.01, n)))
+
+
+def loop_backtest(close, position, fee):
+    """One combination, bar by bar: the reference the vectorized engine must match."""
+    equity, held, trades = 1.0, False, 0
+    for t in range(1, len(close)):
+        # The signal at yesterday's close is what's held through today's bar
+        cost = fee if position[t - 1] != held else 0.0
+        trades += bool(position[t - 1]) and not held
+        held = bool(position[t - 1])
+        equity *= 1 + held * (close[t] / close[t - 1] - 1) - cost
+    return equity - 1, trades
+
+
+def test_sweep_matches_bar_by_bar_loop():
+    close = random_walk(600)
+    series = pd.Series(close)
+
+    grid = parameter_grid("sma_cross", {"fast": [5, 10, 20], "slow": [10, 50]}, len(close))
+    assert grid.tolist() == [[5, 10], [5, 50], [10, 50], [20, 50]]  # fast >= slow is dropped
+    metrics = run_grid("sma_cross", close, grid, 0.001, 252)
+    for row, (fast, slow) in enumerate(grid.astype(int)):
+        position = (series.rolling(fast).mean() > series.rolling(slow).mean()).to_numpy()
+        total, trades = loop_backtest(close, position, 0.001)
+        assert metrics["total_return"][row] == pytest.approx(total)
+        assert metrics["trades"][row] == trades
+
+    # RSI: buy below lower, hold until above upper
+    grid = parameter_grid("rsi_threshold", {"window": [14], "lower": [30], "upper": [60]}, len(close))
+    rsi = ta.momentum.rsi(series, 14).to_numpy()
+    position, held = np.zeros(len(close), dtype=bool), False
+    for t, value in enumerate(rsi):
+        held = True if value < 30 else False if value > 60 else held
+        position[t] = held
+    total, trades = loop_backtest(close, position, 0.001)
+    metrics = run_grid("rsi_threshold", close, grid, 0.001, 252)
+    assert metrics["total_return"][0] == pytest.approx(total)
+    assert metrics["trades"][0] == trades > 0
+
+
+@pytest.mark.parametrize("strategy,params", [
+    ("momentum", {"window": [10]}),
+    ("sma_cross", {"fast": [10]}),
+    ("sma_cross", {"fast": [10.5], "slow": [50]}),
+    ("sma_cross", {"fast": [float("inf")], "slow": [50]}),
+    ("rsi_threshold", {"window": [14], "lower": [float("nan")], "upper": [70]}),
+    ("sma_cross", {"fast": [10], "slow": [5000]}),
+    ("sma_cross", {"fast": [50], "slow": [10]}),
+    ("ema_cross", {"fast": list(range(1, 101)), "slow": list(range(101, 201))}),
+])
+def test_invalid_grids_are_rejected(strategy, params):
+    with pytest.raises(InvalidBacktest):
+        parameter_grid(strategy, params, 1000)
+
+
+@pytest.mark.asyncio
+async def test_backtest_endpoint_on_stored_bars(auth_client):
+    client = auth_client
+    close = random_walk(800)
+    now = int(time.time())
+    await candles_load("BT.NS", "1d", Chart(
+        symbol="BT.NS",
+        timestamps=now - (800 - np.arange(800, dtype=np.int64)) * 86400,
+        open=close, high=close, low=close, close=close,
+        volume=np.full(800, 1000, dtype=np.int64),
+    ))
+    request = {"symbol": "bt.ns", "strategy": "ema_cross", "period": "2y",
+               "params": {"fast": [5, 10, 20], "slow": [30, 50, 100]}, "limit": 5}
+
+    with patch("app.services.stocks.get_candlestick_data_cached") as fetch:
+        inline = await client.post("/api/backtest", json=request)
+        try:
+            # Force the sweep out to the worker processes
+            with patch("app.services.backtest.INLINE_CELLS", 0):
+                pooled = await client.post("/api/backtest", json={**request, "sort": "max_drawdown"})
+        finally:
+            backtest_pool.shutdown()
+        bad = await client.post("/api/backtest", json={**request, "sort": "profit"})
+        # json.dumps writes Infinity, which the request parser accepts
+        infinite = await client.post(
+            "/api/backtest", headers={"Content-Type": "application/json"},
+            content=json.dumps({**request, "params": {"fast": [float("inf")], "slow": [50]}}),
+        )
+        fee = await client.post("/api/backtest", json={**request, "fee_bps": -1})
+    fetch.assert_not_called()
+
+    body = inline.json()
+    assert body["bars"] == 730 and body["combinations"] == 9
+    sharpes = [r["sharpe"] for r in body["results"]]
+    assert len(sharpes) == 5 and sharpes == sorted(sharpes, reverse=True)
+    assert body["buy_and_hold"]["exposure"] > 0.99 and body["buy_and_hold"]["trades"] == 1
+
+    by_params = {tuple(r["params"].values()): r for r in body["results"]}
+    pooled_results = pooled.json()["results"]
+    drawdowns = [r["max_drawdown"] for r in pooled_results]
+    assert drawdowns == sorted(drawdowns)
+    for result in pooled_results:
+        if tuple(result["params"].values()) in by_params:
+            assert result == by_params[tuple(result["params"].values())]
+    assert bad.status_code == 400 and infinite.status_code == 400
+    assert fee.status_code == 422
+
+
+@pytest.mark.asyncio
+async def test_backtest_requires_login_and_is_rate_limited(client, auth_client):
+    from app.routers.backtest import backtest_limit
+
+    request = {"symbol": "BT.NS", "strategy": "sma_cross", "params": {"fast": [5], "slow": [20]}}
+    anonymous = await client.post("/api/backtest", json={**request}, headers={"Authorization": ""})
+    assert anonymous.status_code in (401, 403)
+
+    with patch.object(backtest_limit, "limit", 2), patch.object(backtest_limit, "_calls", {}), \
+         patch("app.routers.backtest.run_backtest", return_value={}):
+        codes = [(await auth_client.post("/api/backtest", json=request)).status_code for _ in range(3)]
+    assert codes == [200, 200, 429]
+
+
+@pytest.mark.asyncio
+async def test_oversized_sweeps_are_rejected_before_running(auth_client):
+    close = random_walk(800)
+    chart = Chart(symbol="BT.NS", timestamps=np.arange(800, dtype=np.int64) * 86400, open=close, high=close,
+                  low=close, close=close, volume=np.zeros(800, dtype=np.int64))
+    request = {"symbol": "BT.NS", "strategy": "sma_cross", "params": {"fast": [5, 10], "slow": [20, 50]}}
+    with patch("app.services.backtest.load_bars", return_value=chart), \
+         patch("app.services.backtest.BACKTEST_MAX_CELLS", 3 * 800), \
+         patch("app.services.backtest.run_grid") as run:
+        res = await auth_client.post("/api/backtest", json=request)
+    assert res.status_code == 400 and "over the limit" in res.json()["detail"]
+    run.assert_not_called()
@@ -0,0 +1,53 @@
+import pytest
+from sqlalchemy import text
+from unittest.mock import patch
+
+from app.database import create_engine, engine_options
+
+
+def test_postgres_engine_options():
+    url, options = engine_options("postgresql+asyncpg://user:pw@db:5432/market_values")
+    assert url.query["prepared_statement_cache_size"] == "256"
+    assert options["connect_args"] == {"statement_cache_size": 256}
+    assert options["pool_size"] == 10
+    assert options["max_overflow"] == 20
+    assert options["pool_pre_ping"] is True
+
+
+def test_sqlite_memory_skips_pool_sizing():
+    _, options = engine_options("sqlite+aiosqlite:///:memory:")
+    assert "pool_size" not in options
+    assert options["connect_args"]["timeout"] == 5
+
+
+@pytest.mark.asyncio
+async def test_sqlite_file_engine_applies_pragmas(tmp_path):
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path / 'test.db'}")
+    async with engine.connect() as conn:
+        journal_mode = (await conn.execute(text("PRAGMA journal_mode"))).scalar()
+        busy_timeout = (await conn.execute(text("PRAGMA busy_timeout"))).scalar()
+        synchronous = (await conn.execute(text("PRAGMA synchronous"))).scalar()
+    await engine.dispose()
+
+    assert journal_mode == "wal"
+    assert busy_timeout == 5000
+    assert synchronous == 1  # NORMAL
+
+
+@pytest.mark.asyncio
+async def test_init_db_refuses_a_schema_behind_the_models(tmp_path):
+    import app.models  # noqa: F401 - registers the tables
+    from app import database
+
+    engine = create_engine(f"sqlite+aiosqlite:///{tmp_path / 'old.db'}")
+    async with engine.begin() as conn:
+        # users as created before 0005_user_is_admin
+        await conn.execute(text(
+            "CREATE TABLE users (id INTEGER PRIMARY KEY, email VARCHAR, username VARCHAR, "
+            "hashed_password VARCHAR, is_active BOOLEAN, created_at DATETIME)"
+        ))
+    with patch.object(database, "engine", engine), \
+         patch.object(database, "DATABASE_URL", f"sqlite+aiosqlite:///{tmp_path / 'old.db'}"):
+        with pytest.raises(RuntimeError, match="users.is_admin.*alembic upgrade head"):
+            await database.init_db()
+    await engine.dispose()
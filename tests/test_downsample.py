@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import AsyncMock, patch
+
+from app.services.candles import candle_time
+from app.services.downsample import downsample_candles, downsample_points, lttb_indices
+
+
+def daily_candles(n):
+    start = datetime(2020, 1, 1)
+    return [
+        {"Datetime": f"{(start + timedelta(days=d)).date()} 09:15:00+05:30", "Open": 100.0 + d,
+         "High": 102.0 + d, "Low": 99.0 + d, "Close": 101.0 + d, "Volume": 10}
+        for d in range(n)
+    ]
+
+
+def test_lttb_keeps_endpoints_and_spikes():
+    x = np.arange(1000, dtype=np.float64)
+    y = np.sin(x / 50)
+    y[437] = 25.0
+    picked = lttb_indices(x, y, 60)
+    assert len(picked) == 60 and picked[0] == 0 and picked[-1] == 999
+    assert 437 in picked
+    assert (np.diff(picked) > 0).all()
+
+    points = [{"time": int(t), "value": float(v)} for t, v in zip(x, y)]
+    assert downsample_points(points[:50], 60) == points[:50]
+    assert downsample_points(points, None) is points
+
+
+def test_candle_buckets_preserve_the_ohlc_envelope():
+    candles = daily_candles(1000)
+    thinned = downsample_candles(candles, 100)
+    assert len(thinned) == 100
+    assert thinned[0] == {**candles[0], "High": 111.0, "Close": 110.0, "Volume": 100}
+    assert thinned[-1]["Close"] == candles[-1]["Close"]
+    assert max(c["High"] for c in thinned) == max(c["High"] for c in candles)
+    assert sum(c["Volume"] for c in thinned) == 10000
+
+
+@pytest.mark.asyncio
+async def test_max_points_applies_to_candles_indicators_and_compare(client):
+    candles = daily_candles(2000)
+    with patch("app.routers.stocks.get_candlestick_data_cached", AsyncMock(return_value=candles)):
+        res = await client.get("/api/stocks/candles/TCS.NS?interval=1d&indicators=sma_20&max_points=200")
+    body = res.json()
+    assert len(body["data"]) == 200
+    # Runs of 10 bars: sma_20 starts in the second one, then has a value at every candle's time
+    times = [candle_time(c) for c in body["data"]]
+    assert [p["time"] for p in body["indicators"]["sma_20"]] == times[1:]
+    assert body["indicators"]["sma_20"][0]["value"] == 110.5  # the run's last bar, the first full average
+
+    stocks = [{"symbol": "TCS.NS"}, {"symbol": "INFY.NS"}]
+    with patch("app.services.market.fetch_all_stocks", AsyncMock(return_value=stocks)), \
+         patch("app.services.stocks.get_candlestick_data_cached", AsyncMock(return_value=candles)):
+        res = await client.get("/api/market/compare?symbols=TCS.NS,INFY.NS&max_points=300")
+    assert [len(s["normalized"]) for s in res.json()["data"]] == [300, 300]
@@ -0,0 +1,54 @@
+import asyncio
+import threading
+import pytest
+
+from app.exceptions import ServiceBusy
+from app.executors import BoundedExecutor, run_in
+
+
+@pytest.mark.asyncio
+async def test_saturated_pool_rejects_and_reports_load():
+    pool = BoundedExecutor("test", workers=1, max_pending=2)
+    release = threading.Event()
+    try:
+        running = pool.submit(release.wait)
+        queued = pool.submit(release.wait)
+        await asyncio.sleep(0.05)
+
+        with pytest.raises(ServiceBusy):
+            pool.submit(release.wait)
+        assert pool.stats() == {
+            "workers": 1, "active": 1, "queued": 1, "utilization": 1.0, "completed": 0, "rejected": 1,
+        }
+
+        release.set()
+        await asyncio.gather(running, queued)
+        assert pool.stats()["completed"] == 2
+        assert pool.stats()["active"] == 0
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_busy_pool_does_not_starve_others():
+    pool = BoundedExecutor("slow", workers=1, max_pending=4)
+    release = threading.Event()
+    try:
+        blocked = pool.submit(release.wait)
+        # market_data still has threads while "slow" is fully occupied
+        assert await asyncio.wait_for(run_in("market_data", sum, [1, 2, 3]), timeout=1) == 6
+        release.set()
+        await blocked
+    finally:
+        release.set()
+        pool.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_health_reports_executor_stats(client):
+    res = await client.get("/health")
+    assert res.status_code == 200
+    pools = res.json()["executors"]
+    assert {"market_data", "ml", "streams", "news", "bcrypt"} <= set(pools)
+    assert pools["ml"]["workers"] == 1
@@ -0,0 +1,104 @@
+import pytest
+import time
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+import numpy as np
+
+from app.services.candle_store import candles_load
+from app.services.fundamentals import FundamentalsStore, fundamentals, seconds_until
+from app.services.providers import IST
+from app.services.stock_store import INFO, store_get
+from app.services.yahoo import Chart
+
+
+def raw_info(symbol):
+    return {"longName": f"{symbol} Ltd", "sector": "IT", "marketCap": 10**12,
+            "fiftyTwoWeekHigh": 500.0, "fiftyTwoWeekLow": 100.0}
+
+
+def year_of_daily_bars(days=370):
+    now = int(time.time())
+    n = np.arange(days, dtype=np.float64)
+    return Chart(
+        symbol="TCS.NS",
+        # An hour clear of the 365-day cutoff, so a second ticking over doesn't move it
+        timestamps=now - (days - np.arange(days, dtype=np.int64)) * 86400 + 3600,
+        open=200 + n, high=210 + n, low=190 + n, close=200 + n,
+        volume=np.ones(days, dtype=np.int64),
+    )
+
+
+def test_refresh_is_scheduled_after_the_close():
+    at = datetime(2024, 1, 2, 15, 30, tzinfo=IST)
+    assert seconds_until("18:00", at) == 2.5 * 3600
+    assert seconds_until("09:00", at) == 17.5 * 3600
+
+
+@pytest.mark.asyncio
+async def test_bulk_refresh_derives_52_week_range_from_candles():
+    await candles_load("TCS.NS", "1d", year_of_daily_bars())
+    store = FundamentalsStore(["TCS.NS", "INFY.NS"], concurrency=2)
+    with patch("app.services.fundamentals.market_data.info", AsyncMock(side_effect=raw_info)):
+        assert await store.refresh() == 2
+
+    tcs, infy = store.records["TCS.NS"], store.records["INFY.NS"]
+    # Only the last 365 days count: bars 5..369
+    assert (tcs["week_52_high"], tcs["week_52_low"]) == (579.0, 195.0)
+    assert (infy["week_52_high"], infy["week_52_low"]) == (500.0, 100.0)  # no stored year, upstream's values
+    assert store.refreshed_at is not None
+
+    # A restarted worker loads the same records without going upstream
+    restarted = FundamentalsStore(["TCS.NS", "INFY.NS"], concurrency=2)
+    assert await restarted.load() == 2
+    assert restarted.records == store.records
+
+
+@pytest.mark.asyncio
+async def test_batched_info_served_from_memory(client):
+    with patch("app.services.fundamentals.market_data.info", AsyncMock(side_effect=raw_info)) as upstream:
+        await fundamentals.refresh(["TCS.NS", "INFY.NS"])
+        upstream.reset_mock()
+        res = await client.get("/api/stocks/info?symbols=INFY.NS,TCS.NS,WIPRO.NS")
+        again = await client.get("/api/stocks/info?symbols=WIPRO.NS,TCS.NS")
+
+    assert [r["name"] for r in res.json()["data"]] == ["INFY.NS Ltd", "TCS.NS Ltd", "WIPRO.NS Ltd"]
+    assert len(again.json()["data"]) == 2
+    upstream.assert_awaited_once_with("WIPRO.NS")  # only the unknown symbol, only once
+    assert (await store_get("WIPRO.NS", INFO, None))["sector"] == "IT"
+
+
+@pytest.mark.asyncio
+async def test_untracked_symbols_are_bounded_and_blank_profiles_dropped():
+    def info(symbol):
+        return {} if symbol == "BOGUS.NS" else raw_info(symbol)
+
+    store = FundamentalsStore(["TCS.NS"], concurrency=2, max_extra=2)
+    with patch("app.services.fundamentals.market_data.info", AsyncMock(side_effect=info)) as upstream:
+        records = await store.get_many(["BOGUS.NS", "A.NS", "B.NS", "C.NS", "TCS.NS"])
+        assert [r["symbol"] for r in records] == ["A.NS", "B.NS", "C.NS", "TCS.NS"]
+        assert list(store.extra) == ["C.NS", "BOGUS.NS"]  # the miss is remembered; A.NS and B.NS were evicted
+        assert await store_get("BOGUS.NS", INFO, None) is None
+
+        upstream.reset_mock()
+        await store.refresh()
+        upstream.assert_awaited_once_with("TCS.NS")  # the bulk refresh only covers tracked symbols
+
+
+@pytest.mark.asyncio
+async def test_unknown_symbols_are_remembered_as_misses():
+    def info(symbol):
+        if symbol == "DOWN.NS":
+            raise RuntimeError("upstream down")
+        return {}
+
+    store = FundamentalsStore(["TCS.NS"], concurrency=2, miss_ttl=600)
+    with patch("app.services.fundamentals.market_data.info", AsyncMock(side_effect=info)) as upstream:
+        assert await store.get_many(["BOGUS.NS", "DOWN.NS"]) == []
+        assert await store.get_many(["BOGUS.NS", "DOWN.NS"]) == []
+        assert upstream.await_count == 2
+
+        # Once the miss expires the symbol is looked up again
+        store.extra["BOGUS.NS"] = (0, None)
+        await store.get("BOGUS.NS")
+        assert upstream.await_count == 3
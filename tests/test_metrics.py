@@ -0,0 +1,64 @@
+import pytest
+from unittest.mock import patch, AsyncMock
+
+from app.cache import cache_get
+from app.metrics import Counter, Histogram, render
+
+
+@pytest.fixture
+def local_registry():
+    # Metrics made in a test register here, not in the registry /metrics renders
+    with patch("app.metrics._registry", []) as registry:
+        yield registry
+
+
+def test_histogram_renders_cumulative_buckets(local_registry):
+    latency = Histogram("test_latency_seconds", "Test latency", ("route",), buckets=(0.1, 1.0))
+    latency.labels("/a").observe(0.05)
+    latency.labels("/a").observe(0.5)
+    latency.labels("/a").observe(5)
+
+    text = latency.render()
+    assert 'test_latency_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'test_latency_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 'test_latency_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'test_latency_seconds_count{route="/a"} 3' in text
+
+
+def test_counter_escapes_label_values(local_registry):
+    requests = Counter("test_requests_total", "Test requests", ("key",))
+    requests.labels('a"b').inc(2)
+    assert 'test_requests_total{key="a\\"b"} 2.0' in requests.render()
+    assert local_registry == [requests]
+
+
+@pytest.mark.asyncio
+async def test_cache_lookups_counted_per_family():
+    with patch("app.cache.get_redis", AsyncMock(return_value=None)):
+        await cache_get("candles:TCS.NS:5m:1d")
+    assert 'cache_requests_total{family="candles",result="miss"}' in render()
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_labels_routes_by_template(client):
+    with patch("app.routers.stocks.get_stock_info", AsyncMock(return_value={"symbol": "TCS.NS"})):
+        await client.get("/api/stocks/TCS.NS/info")
+
+    res = await client.get("/metrics")
+    assert res.status_code == 200
+    assert res.headers["content-type"].startswith("text/plain")
+    assert 'route="/api/stocks/{symbol}/info"' in res.text
+    assert "TCS.NS" not in res.text
+    assert 'executor_workers{pool="market_data"} 16' in res.text
+
+
+@pytest.mark.asyncio
+async def test_failed_queries_do_not_leave_timers_on_the_connection(db_session):
+    from sqlalchemy.exc import OperationalError
+
+    conn = await db_session.connection()
+    for _ in range(3):
+        with pytest.raises(OperationalError):
+            await conn.exec_driver_sql("SELECT * FROM no_such_table")
+    await conn.exec_driver_sql("SELECT 1")
+    assert conn.sync_connection.info["query_start"] == []
@@ -0,0 +1,41 @@
+import logging
+import pytest
+from unittest.mock import patch
+
+
+def access_logs(caplog):
+    return [r for r in caplog.records if r.name == "app.middleware"]
+
+
+@pytest.mark.asyncio
+async def test_server_timing_breaks_out_db_time(client):
+    res = await client.post("/api/auth/login", json={"username": "nobody", "password": "x"})
+    timing = res.headers["server-timing"]
+    assert "db;dur=" in timing
+    assert "app;dur=" in timing
+
+
+@pytest.mark.asyncio
+async def test_access_log_is_sampled(client, caplog):
+    caplog.set_level(logging.INFO, logger="app.middleware")
+
+    with patch("app.middleware.LOG_REQUEST_SAMPLE_RATE", 0):
+        await client.get("/")
+    assert not access_logs(caplog)
+
+    with patch("app.middleware.LOG_REQUEST_SAMPLE_RATE", 1):
+        await client.get("/")
+    assert access_logs(caplog)[-1].getMessage().startswith("GET / route=/ status=200")
+
+
+@pytest.mark.asyncio
+async def test_slow_requests_always_logged(client, caplog):
+    caplog.set_level(logging.INFO, logger="app.middleware")
+
+    with patch("app.middleware.LOG_REQUEST_SAMPLE_RATE", 0), \
+         patch("app.middleware.LOG_SLOW_REQUEST_MS", 0):
+        await client.get("/api/nope")
+
+    record = access_logs(caplog)[-1]
+    assert record.levelno == logging.WARNING
+    assert "route=unmatched status=404" in record.getMessage()
@@ -0,0 +1,108 @@
+import asyncio
+import pytest
+from unittest.mock import patch
+
+from app.services.providers import MarketData, Provider, UpstoxProvider
+from app.services.upstream import CircuitBreaker
+
+
+class FakeProvider(Provider):
+    def __init__(self, name, quotes=None, delay=0.0, error=None):
+        self.name = name
+        self.breaker = CircuitBreaker(3, 30)
+        self._quotes = quotes or {}
+        self.delay = delay
+        self.error = error
+        self.calls = []
+
+    async def quotes(self, symbols):
+        self.calls.append(symbols)
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise self.error
+        return {s: self._quotes[s] for s in symbols if s in self._quotes}
+
+
+@pytest.mark.asyncio
+async def test_routes_to_healthy_fastest_and_fills_gaps():
+    slow = FakeProvider("slow", {"TCS.NS": 1, "INFY.NS": 1})
+    fast = FakeProvider("fast", {"TCS.NS": 2})
+    broken = FakeProvider("broken", error=RuntimeError("down"))
+    for _ in range(3):
+        broken.breaker.record_failure()
+    router = MarketData([broken, slow, fast])
+    router.latency = {"slow": 0.5, "fast": 0.05, "broken": 0.01}
+
+    quotes = await router.quotes(["TCS.NS", "INFY.NS"])
+
+    assert quotes == {"TCS.NS": 2, "INFY.NS": 1}
+    assert fast.calls == [["TCS.NS", "INFY.NS"]]
+    assert slow.calls == [["INFY.NS"]]  # only what the faster provider lacked
+    assert broken.calls == []
+
+
+@pytest.mark.asyncio
+async def test_hedged_read_takes_backup_when_primary_stalls():
+    stalled = FakeProvider("stalled", {"TCS.NS": 1}, delay=5)
+    backup = FakeProvider("backup", {"TCS.NS": 2}, delay=0.01)
+    router = MarketData([stalled, backup], hedge_delay=0.02)
+
+    quotes = await asyncio.wait_for(router.quotes(["TCS.NS"]), timeout=1)
+
+    assert quotes == {"TCS.NS": 2}
+    assert stalled.calls and backup.calls
+
+
+@pytest.mark.asyncio
+async def test_upstox_quotes_normalized_to_symbols():
+    response = {
+        "NSE_EQ:RELIANCE": {"instrument_token": "NSE_EQ|RELIANCE", "last_price": 2550.0, "net_change": 50.0},
+        "NSE_INDEX:Nifty 50": {"last_price": 22000.0, "ohlc": {"close": 22000.0}},
+    }
+    with patch("app.services.providers.get_market_quote", return_value=response) as mock_quote:
+        quotes = await UpstoxProvider("token").quotes(["RELIANCE.NS", "^NSEI"])
+
+    assert mock_quote.call_args.args == ("token", "NSE_EQ|RELIANCE,NSE_INDEX|Nifty 50")
+    assert quotes["RELIANCE.NS"]["previous_close"] == 2500.0
+    assert quotes["RELIANCE.NS"]["percent_change"] == 2.0
+    assert quotes["^NSEI"]["current_price"] == 22000.0
+
+
+@pytest.mark.asyncio
+async def test_bad_upstox_token_does_not_open_breaker_for_others():
+    from app.exceptions import UpstreamUnavailable
+
+    def quote(token, keys):
+        return None if token == "expired" else {}
+
+    with patch("app.services.providers.get_market_quote", side_effect=quote):
+        for _ in range(10):
+            with pytest.raises(UpstreamUnavailable):
+                await UpstoxProvider("expired").quotes(["TCS.NS"])
+        assert await UpstoxProvider("valid").quotes(["TCS.NS"]) == {}
+
+    assert not UpstoxProvider("expired").healthy
+    assert UpstoxProvider("valid").healthy
+
+
+@pytest.mark.asyncio
+async def test_user_providers_bypass_shared_cache_and_store():
+    from unittest.mock import AsyncMock
+
+    from app.services.providers import _upstox_breakers, market_data
+    from app.services.stock_store import QUOTE, store_get_many
+    from app.services.stocks import fetch_all_stocks
+
+    upstox = FakeProvider("upstox", {"TCS.NS": {"symbol": "TCS.NS", "current_price": 1.0}})
+    with patch("app.services.stocks.cache_get_json", AsyncMock(return_value=[{"symbol": "TCS.NS"}])), \
+         patch("app.services.stocks.cache_set_json", AsyncMock()) as cache_set, \
+         patch("app.services.stocks.refresh_scheduler.register") as register:
+        data = await fetch_all_stocks(["TCS.NS"], [upstox])
+
+    assert data == [{"symbol": "TCS.NS", "current_price": 1.0}]
+    cache_set.assert_not_awaited()
+    register.assert_not_called()
+    assert await store_get_many([("TCS.NS", QUOTE)], 60) == {}
+
+    stats = market_data.stats()
+    assert stats["upstox"]["healthy"] and "" not in _upstox_breakers
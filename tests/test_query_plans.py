@@ -0,0 +1,57 @@
+import os
+import sqlite3
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import select
+from sqlalchemy.dialects import sqlite
+
+from app.models import Alert, PortfolioEntry, Watchlist, WatchlistItem
+
+ALEMBIC_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "alembic")
+
+
+@pytest.fixture(scope="module")
+def migrated_db(tmp_path_factory):
+    path = tmp_path_factory.mktemp("migrations") / "plans.db"
+    config = Config()
+    config.set_main_option("script_location", ALEMBIC_DIR)
+    config.set_main_option("sqlalchemy.url", f"sqlite+aiosqlite:///{path}")
+    command.upgrade(config, "head")
+
+    conn = sqlite3.connect(path)
+    yield conn
+    conn.close()
+
+
+def _plan(conn, stmt) -> str:
+    sql = str(stmt.compile(dialect=sqlite.dialect(), compile_kwargs={"literal_binds": True}))
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    return "\n".join(row[-1] for row in rows)
+
+
+def test_migrations_create_query_indexes(migrated_db):
+    indexes = {row[0] for row in migrated_db.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+    assert {
+        "ix_alerts_active_symbol",
+        "ix_alerts_user_id",
+        "ix_portfolio_entries_user_id",
+        "ix_watchlists_user_id",
+        "ix_watchlist_items_watchlist_id",
+    } <= indexes
+
+
+@pytest.mark.parametrize("stmt, index", [
+    (
+        select(Alert).where(Alert.is_active == True, Alert.symbol.in_(["RELIANCE.NS", "TCS.NS"])),
+        "ix_alerts_active_symbol",
+    ),
+    (select(Alert).where(Alert.user_id == 1).order_by(Alert.id.desc()), "ix_alerts_user_id"),
+    (select(PortfolioEntry).where(PortfolioEntry.user_id == 1), "ix_portfolio_entries_user_id"),
+    (select(Watchlist).where(Watchlist.user_id == 1), "ix_watchlists_user_id"),
+    (select(WatchlistItem).where(WatchlistItem.watchlist_id.in_([1, 2])), "ix_watchlist_items_watchlist_id"),
+])
+def test_hot_queries_use_indexes(migrated_db, stmt, index):
+    plan = _plan(migrated_db, stmt)
+    assert "SEARCH" in plan and f"USING INDEX {index}" in plan
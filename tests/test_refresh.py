@@ -0,0 +1,71 @@
+import pytest
+from unittest.mock import patch, AsyncMock
+
+from app.cache import key_hits
+from app.services.refresh import RefreshAheadScheduler
+
+
+@pytest.fixture
+def scheduler():
+    key_hits.clear()
+    return RefreshAheadScheduler()
+
+
+@pytest.mark.asyncio
+async def test_popular_key_refreshed_before_expiry(scheduler):
+    loader = AsyncMock(return_value={"fresh": True})
+    scheduler.register("market:overview", loader, 30)
+    key_hits["market:overview"] = 10
+
+    with patch("app.services.refresh.get_redis", AsyncMock(return_value=object())), \
+         patch("app.services.refresh.cache_ttl", AsyncMock(return_value=3)), \
+         patch("app.services.refresh.cache_lock", AsyncMock(return_value=True)), \
+         patch("app.services.refresh.cache_set_json", AsyncMock()) as mock_set:
+        due = await scheduler.tick()
+
+    assert due == ["market:overview"]
+    loader.assert_awaited_once()
+    mock_set.assert_awaited_once_with("market:overview", {"fresh": True}, 30)
+
+
+@pytest.mark.asyncio
+async def test_cold_or_fresh_keys_not_refreshed(scheduler):
+    cold = AsyncMock(return_value=[1])
+    fresh = AsyncMock(return_value=[2])
+    scheduler.register("candles:TCS.NS:1d:6mo", cold, 300)
+    scheduler.register("market:sectors", fresh, 30)
+    key_hits["candles:TCS.NS:1d:6mo"] = 1
+    key_hits["market:sectors"] = 10
+
+    with patch("app.services.refresh.get_redis", AsyncMock(return_value=object())), \
+         patch("app.services.refresh.cache_ttl", AsyncMock(return_value=25)), \
+         patch("app.services.refresh.cache_set_json", AsyncMock()):
+        due = await scheduler.tick()
+
+    assert due == []
+    cold.assert_not_awaited()
+    fresh.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+async def test_registry_evicts_coldest_key(scheduler):
+    with patch("app.services.refresh.CACHE_REFRESH_MAX_KEYS", 2):
+        scheduler.register("a", AsyncMock(), 10)
+        scheduler.register("b", AsyncMock(), 10)
+        key_hits["a"] = 5
+        scheduler._update_scores()
+        scheduler.register("c", AsyncMock(), 10)
+
+    assert scheduler.is_popular("a")
+    assert "b" not in scheduler._entries
+    assert "c" in scheduler._entries
+
+
+@pytest.mark.asyncio
+async def test_warm_calls_configured_loaders(scheduler):
+    with patch("app.services.market.get_market_overview", AsyncMock()) as overview, \
+         patch("app.services.stocks.get_candlestick_data_cached", AsyncMock()) as candles:
+        await scheduler.warm(["market:overview", "candles:RELIANCE.NS:5m:5d", "bogus"])
+
+    overview.assert_awaited_once()
+    candles.assert_awaited_once_with("RELIANCE.NS", "5m", "5d")
@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from datetime import datetime
+from unittest.mock import AsyncMock, patch
+
+from app.services.candle_store import candles_load
+from app.services.resample import chart_from_records, resample, window
+from app.services.ticks import IST
+from app.services.stocks import get_candlestick_data_cached
+from app.services.yahoo import Chart
+
+# 2024-01-02 09:15:00 IST, a Tuesday
+OPEN = int(datetime(2024, 1, 2, 9, 15, tzinfo=IST).timestamp())
+
+
+def minute_bars(start: int, minutes: int) -> Chart:
+    n = np.arange(minutes, dtype=np.float64)
+    return Chart(
+        symbol="TCS.NS",
+        timestamps=start + np.arange(minutes, dtype=np.int64) * 60,
+        open=100 + n, high=101 + n, low=99 + n, close=100.5 + n,
+        volume=np.full(minutes, 10, dtype=np.int64),
+        gmtoffset=19800,
+    )
+
+
+def daily_bars(start: int, days: int) -> Chart:
+    chart = minute_bars(start, days)
+    chart.timestamps = start + np.arange(days, dtype=np.int64) * 86400
+    return chart
+
+
+def test_intraday_bars_aggregate_per_session_bucket():
+    bars = resample(minute_bars(OPEN, 375), "1h").records()
+    assert len(bars) == 7  # 09:15 ... 14:15, then the 15:15 stub to the close
+    assert bars[0] == {
+        "Datetime": "2024-01-02 09:15:00+05:30", "Open": 100.0, "High": 160.0, "Low": 99.0, "Close": 159.5,
+        "Volume": 600,
+    }
+    assert bars[-1]["Datetime"] == "2024-01-02 15:15:00+05:30" and bars[-1]["Volume"] == 150
+
+    # A missing first minute still lands in the 09:15 bar; pre-open bars are dropped
+    sparse = resample(minute_bars(OPEN - 120, 10), "5m").records()
+    assert [b["Datetime"][11:16] for b in sparse] == ["09:15", "09:20"]
+    assert sparse[0]["Open"] == 102.0 and sparse[0]["Volume"] == 50
+
+
+def test_calendar_bars_and_period_windows():
+    days = daily_bars(OPEN, 60)  # 2024-01-02 .. 2024-03-01
+    weeks = resample(days, "1wk")
+    assert weeks.records()[1]["Datetime"] == "2024-01-08 09:15:00+05:30"  # Monday
+    assert weeks.volume[0] == 60  # Tue..Sun of the first week
+    months = resample(days, "1mo").records()
+    assert [m["Datetime"][:10] for m in months] == ["2024-01-02", "2024-02-01", "2024-03-01"]
+    assert (months[1]["Open"], months[1]["Close"]) == (130.0, 158.5)
+
+    two_days = minute_bars(OPEN, 1500)  # runs past midnight into 2024-01-03
+    assert len(window(two_days, "1d")) == 1500 - 885
+    assert len(window(two_days, "5d")) == 1500
+    assert len(window(days, "1mo")) == 31
+
+
+@pytest.mark.asyncio
+async def test_timeframes_share_one_base_fetch():
+    base = minute_bars(OPEN, 375).records()
+    with patch("app.services.stocks.cache_get_json", AsyncMock(return_value=None)), \
+         patch("app.services.stocks.get_candlestick_data", AsyncMock(return_value=base)) as upstream:
+        five = await get_candlestick_data_cached("TCS.NS", "5m", "5d")
+        fifteen = await get_candlestick_data_cached("TCS.NS", "15m", "5d")
+
+    upstream.assert_awaited_once_with("TCS.NS", "1m", "5d", None)
+    assert (len(five), len(fifteen)) == (75, 25)
+    assert fifteen[0]["Close"] == five[2]["Close"] == 114.5
+
+
+@pytest.mark.asyncio
+async def test_long_periods_extend_base_from_candle_store():
+    recent = minute_bars(OPEN + 30 * 86400, 375)
+    base = recent.records()
+    with patch("app.services.stocks.cache_get_json", AsyncMock(return_value=None)), \
+         patch("app.services.stocks.get_candlestick_data", AsyncMock(return_value=base)) as upstream:
+        # Nothing stored yet: a month of hourly bars is fetched directly, without loading the base first
+        await get_candlestick_data_cached("TCS.NS", "1h", "1mo")
+        upstream.assert_awaited_once_with("TCS.NS", "1h", "1mo", None)
+
+        # With January backfilled, the base series plus stored bars cover it: one base fetch, no direct one
+        await candles_load("TCS.NS", "1m", minute_bars(OPEN + 86400, 375))
+        upstream.reset_mock()
+        hourly = await get_candlestick_data_cached("TCS.NS", "1h", "1mo")
+
+    upstream.assert_awaited_once_with("TCS.NS", "1m", "5d", None)
+    assert [h["Datetime"][:10] for h in hourly[::7]] == ["2024-01-03", "2024-02-01"]
+    assert chart_from_records("TCS.NS", hourly).volume.sum() == 2 * 375 * 10
@@ -0,0 +1,19 @@
+import json
+import numpy as np
+
+from app.responses import FastJSONResponse
+
+
+def test_fast_response_serializes_numpy_and_datetimes():
+    from datetime import datetime, timezone
+
+    res = FastJSONResponse({
+        "closes": np.array([1.5, 2.5]),
+        "volume": np.int64(10),
+        "at": datetime(2024, 1, 1, tzinfo=timezone.utc),
+    })
+    body = json.loads(res.body)
+    assert body["closes"] == [1.5, 2.5]
+    assert body["volume"] == 10
+    assert body["at"].startswith("2024-01-01T00:00:00")
+    assert res.media_type == "application/json"
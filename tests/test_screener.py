@@ -0,0 +1,94 @@
+import asyncio
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+import ta
+from unittest.mock import AsyncMock, patch
+
+from app.exceptions import InvalidScreen
+from app.services.candle_store import candles_load
+from app.services.indicators import ema, rsi, sma
+from app.services.screener import Screener, field_names
+from app.services.yahoo import Chart
+
+
+def daily(symbol, closes):
+    n = len(closes)
+    closes = np.asarray(closes, dtype=np.float64)
+    return Chart(
+        symbol=symbol,
+        timestamps=int(time.time()) - (n - np.arange(n, dtype=np.int64)) * 86400,
+        open=closes, high=closes + 1, low=closes - 1, close=closes,
+        volume=np.full(n, 1000, dtype=np.int64),
+    )
+
+
+def test_matrix_indicators_match_ta_per_symbol():
+    rng = np.random.default_rng(7)
+    series = 100 + np.cumsum(rng.normal(size=(3, 260)), axis=1)
+    series[2, :40] = np.nan  # listed later than the others
+    for row in series:
+        listed = pd.Series(row[~np.isnan(row)])
+        tail = -len(listed)
+        assert np.allclose(sma(row, 50)[tail:], ta.trend.sma_indicator(listed, 50), equal_nan=True)
+        assert np.allclose(ema(row, 20)[tail:], ta.trend.ema_indicator(listed, 20), equal_nan=True)
+        assert np.allclose(rsi(row, 14)[tail:], ta.momentum.rsi(listed, 14), equal_nan=True)
+    # The matrix form gives each row its own result
+    assert np.allclose(rsi(series, 14)[2], rsi(series[2], 14), equal_nan=True)
+
+
+@pytest.mark.parametrize("expression", [
+    "__import__('os').system('true')",
+    "close.__class__ > 1",
+    "close > 'a'",
+    "sma_99999 > 1",
+    "foo_20 > 1",
+    "close + 1",
+    "[close][0] > 1",
+    "close if rsi_14 else sma_20",
+])
+def test_unsafe_or_invalid_filters_are_rejected(expression):
+    with pytest.raises(InvalidScreen):
+        field_names(expression)
+
+
+@pytest.mark.asyncio
+async def test_screen_filters_universe_in_one_pass(client):
+    up = np.linspace(100, 200, 260)
+    down = np.linspace(200, 100, 260)
+    dip = np.r_[np.full(240, 150.0), np.linspace(150, 120, 20)]
+    for symbol, closes in [("UP.NS", up), ("DOWN.NS", down), ("DIP.NS", dip)]:
+        await candles_load(symbol, "1d", daily(symbol, closes))
+
+    screener = Screener([], sessions=300, max_age=300)
+    with patch("app.routers.market.screener", screener):
+        res = await client.get("/api/market/screener", params={"filter": "close > sma_200 and rsi_14 > 50"})
+        oversold = await client.get("/api/market/screener", params={"filter": "rsi_14 < 30", "sort": "-change"})
+        chained = await client.get("/api/market/screener", params={"filter": "100 < close < 150"})
+        bad = await client.get("/api/market/screener", params={"filter": "open(close)"})
+
+    body = res.json()
+    assert body["universe"] == 3
+    assert [r["symbol"] for r in body["results"]] == ["UP.NS"]
+    assert body["results"][0]["close"] == 200.0 and body["results"][0]["sma_200"] is not None
+    assert [r["symbol"] for r in oversold.json()["results"]] == ["DOWN.NS", "DIP.NS"]
+    assert {r["symbol"] for r in chained.json()["results"]} == {"DIP.NS"}
+    assert bad.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_first_requests_share_one_build_and_cold_fields_are_bounded():
+    screener = Screener([], sessions=300, max_age=300)
+    charts = {"UP.NS": daily("UP.NS", np.linspace(100, 200, 260))}
+    with patch.object(screener, "load", AsyncMock(return_value=charts)) as load:
+        await asyncio.gather(*(screener.screen("close > 0") for _ in range(5)))
+    load.assert_awaited_once()
+
+    with patch("app.services.screener.SCREENER_MAX_FIELDS", 2):
+        for n in (10, 20, 30):
+            await screener.screen(f"ema_{n} > 0")
+        await screener.screen("ema_20 > 0")
+        await screener.screen("sma_5 > 0")
+    assert list(screener.universe._cold) == ["ema_20", "sma_5"]
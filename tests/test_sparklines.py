@@ -0,0 +1,68 @@
+import httpx
+import numpy as np
+import pytest
+from datetime import datetime
+from unittest.mock import patch
+
+from app.services.sparklines import SparklineSnapshot, session_grid
+from app.services.ticks import IST
+from app.services.yahoo import Chart, YahooClient
+
+# 2024-01-02 09:15:00 IST
+OPEN = int(datetime(2024, 1, 2, 9, 15, tzinfo=IST).timestamp())
+DAY = (OPEN + 19800) // 86400
+
+
+def intraday(symbol, minutes, closes):
+    return {
+        "meta": {"symbol": symbol, "gmtoffset": 19800, "chartPreviousClose": 99.0},
+        "timestamp": [OPEN + m * 60 for m in minutes],
+        "indicators": {"quote": [{"close": closes, "open": closes, "high": closes, "low": closes, "volume": [1] * len(closes)}]},
+    }
+
+
+def test_session_grid_carries_last_close_forward():
+    chart = Chart(
+        symbol="TCS.NS",
+        timestamps=np.array([OPEN - 86400, OPEN + 60, OPEN + 95 * 60, OPEN + 100 * 60, OPEN + 200 * 60]),
+        open=np.zeros(5), high=np.zeros(5), low=np.zeros(5),
+        close=np.array([1.0, 10.0, 11.0, 12.0, 13.0]),
+        volume=np.zeros(5, dtype=np.int64),
+    )
+    grid = session_grid(chart, DAY, 25)  # 15-minute slots
+    assert grid[0] == 10.0
+    assert grid[6] == 12.0  # 10:45-11:00 holds two bars; the last one wins
+    assert (grid[7:13] == 12.0).all()
+    assert grid[13] == 13.0
+    assert np.isnan(grid[14:]).all()
+
+
+@pytest.mark.asyncio
+async def test_sparklines_served_from_shared_snapshot(client):
+    requests = []
+
+    def spark_api(request: httpx.Request) -> httpx.Response:
+        symbols = request.url.params["symbols"].split(",")
+        requests.append(symbols)
+        result = [
+            {"symbol": s, "response": [intraday(s, [0, 5, 30], [100.0, 101.0, 102.5])]}
+            for s in symbols if s != "BOGUS.NS"
+        ]
+        return httpx.Response(200, json={"spark": {"result": result, "error": None}})
+
+    snapshot = SparklineSnapshot(["TCS.NS", "INFY.NS"], points=25, interval=60)
+    with patch("app.services.sparklines.yahoo_client", YahooClient(transport=httpx.MockTransport(spark_api))), \
+         patch("app.routers.stocks.sparkline_snapshot", snapshot):
+        res = await client.get("/api/stocks/sparklines?symbols=INFY.NS,TCS.NS")
+        again = await client.get("/api/stocks/sparklines?symbols=TCS.NS,BOGUS.NS")
+
+    # Symbols outside the tracked universe are never fetched
+    assert requests == [["TCS.NS", "INFY.NS"]]
+    body = res.json()
+    assert body["date"] == "2024-01-02"
+    assert body["symbols"] == ["INFY.NS", "TCS.NS"]
+    assert body["times"][:2] == [OPEN, OPEN + 900]
+    assert body["close"][0][:3] == [101.0, 101.0, 102.5]
+    assert body["close"][0][3] is None
+    assert body["previous_close"] == [99.0, 99.0]
+    assert again.json()["symbols"] == ["TCS.NS"]
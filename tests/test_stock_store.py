@@ -0,0 +1,75 @@
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch, AsyncMock
+from sqlalchemy import select, update
+
+from app.models import StockCache
+from app.services.stock_store import QUOTE, prefetch, store_get, store_put
+from app.services.stocks import fetch_all_stocks, get_candlestick_data_cached
+
+CANDLES = [{"Datetime": "2024-01-01 09:15:00+05:30", "Open": 1, "High": 2, "Low": 0.5, "Close": 1.5, "Volume": 10}]
+
+
+def quote(symbol, price):
+    return {"symbol": symbol, "current_price": price, "previous_close": price, "change": 0, "percent_change": 0}
+
+
+async def age_rows(session_factory, seconds):
+    async with session_factory() as db:
+        await db.execute(update(StockCache).values(
+            fetched_at=datetime.now(timezone.utc) - timedelta(seconds=seconds)
+        ))
+        await db.commit()
+
+
+@pytest.mark.asyncio
+async def test_upsert_keeps_one_row_per_series(stock_store_session):
+    await store_put("TCS.NS", QUOTE, quote("TCS.NS", 1))
+    await store_put("TCS.NS", QUOTE, quote("TCS.NS", 2))
+
+    async with stock_store_session() as db:
+        rows = (await db.execute(select(StockCache))).scalars().all()
+    assert len(rows) == 1
+    assert (await store_get("TCS.NS", QUOTE, 60))["current_price"] == 2
+
+    await age_rows(stock_store_session, 120)
+    assert await store_get("TCS.NS", QUOTE, 60) is None
+
+
+@pytest.mark.asyncio
+async def test_cold_cache_served_from_store():
+    upstream = AsyncMock(side_effect=lambda symbols, providers=None: {s: quote(s, 100) for s in symbols})
+    with patch("app.services.stocks.cache_get_json", AsyncMock(return_value=None)), \
+         patch("app.services.stocks.fetch_quotes", upstream):
+        first = await fetch_all_stocks(["TCS.NS", "INFY.NS"])
+        second = await fetch_all_stocks(["TCS.NS", "INFY.NS"])
+
+    assert first == second
+    assert upstream.await_count == 1  # only the first call reaches upstream
+
+
+@pytest.mark.asyncio
+async def test_upstream_failure_serves_stale_copy(stock_store_session):
+    await store_put("TCS.NS", QUOTE, quote("TCS.NS", 100))
+    await store_put("TCS.NS", "candles:5m:1d", CANDLES)
+    await age_rows(stock_store_session, 3600)
+
+    with patch("app.services.stocks.cache_get_json", AsyncMock(return_value=None)), \
+         patch("app.services.stocks.fetch_quotes", AsyncMock(return_value={})), \
+         patch("app.services.stocks.get_candlestick_data", side_effect=RuntimeError("rate limited")):
+        quotes = await fetch_all_stocks(["TCS.NS", "INFY.NS"])
+        candles = await get_candlestick_data_cached("TCS.NS", "5m", "1d")
+
+    assert quotes == [quote("TCS.NS", 100)]
+    assert candles == CANDLES
+
+
+@pytest.mark.asyncio
+async def test_prefetch_seeds_recent_candles(stock_store_session):
+    await store_put("TCS.NS", QUOTE, quote("TCS.NS", 100))
+    await store_put("TCS.NS", "candles:1d:6mo", CANDLES)
+
+    with patch("app.services.stock_store.cache_set_json", AsyncMock()) as mock_set:
+        assert await prefetch() == 1
+
+    mock_set.assert_awaited_once_with("candles:TCS.NS:1d:6mo", CANDLES, 300)
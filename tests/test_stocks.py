@@ -1,38 +1,60 @@
+import json
 import pytest
-from unittest.mock import patch, MagicMock
-import pandas as pd
-
-
-def mock_yfinance_ticker(symbol):
-    mock = MagicMock()
-    dates = pd.date_range("2024-01-01", periods=2, freq="D")
-    mock.history.return_value = pd.DataFrame({
-        "Open": [100.0, 102.0],
-        "High": [105.0, 106.0],
-        "Low": [99.0, 101.0],
-        "Close": [103.0, 104.0],
-        "Volume": [1000000, 1200000],
-    }, index=dates)
-    mock.info = {
-        "longName": "Test Stock",
-        "sector": "Technology",
-        "industry": "Software",
-        "marketCap": 1000000000,
+from unittest.mock import patch, AsyncMock
+import httpx
+
+from app.services.yahoo import YahooClient
+
+
+def chart_result(symbol, closes=(103.0, 104.0)):
+    n = len(closes)
+    return {
+        "meta": {"symbol": symbol, "gmtoffset": 19800, "chartPreviousClose": 100.0},
+        "timestamp": [1704080700 + 86400 * i for i in range(n)],
+        "indicators": {"quote": [{
+            "open": [100.0 + i for i in range(n)],
+            "high": [105.0 + i for i in range(n)],
+            "low": [99.0 + i for i in range(n)],
+            "close": list(closes),
+            "volume": [1000000 + i for i in range(n)],
+        }]},
     }
-    return mock
+
+
+def mock_yahoo_api(request: httpx.Request) -> httpx.Response:
+    path = request.url.path
+    if path.startswith("/v8/finance/chart/"):
+        symbol = path.rsplit("/", 1)[-1]
+        return httpx.Response(200, json={"chart": {"result": [chart_result(symbol)], "error": None}})
+    if path == "/v7/finance/spark":
+        symbols = request.url.params["symbols"].split(",")
+        result = [{"symbol": s, "response": [chart_result(s)]} for s in symbols]
+        return httpx.Response(200, json={"spark": {"result": result, "error": None}})
+    if path == "/v1/test/getcrumb":
+        return httpx.Response(200, text="crumb")
+    if path.startswith("/v10/finance/quoteSummary/"):
+        return httpx.Response(200, json={"quoteSummary": {"result": [{
+            "price": {"longName": "Test Stock", "marketCap": {"raw": 1000000000, "fmt": "1B"}},
+            "assetProfile": {"sector": "Technology", "industry": "Software"},
+        }], "error": None}})
+    return httpx.Response(404)
+
+
+def mock_yahoo_client():
+    return YahooClient(transport=httpx.MockTransport(mock_yahoo_api))
 
 
 @pytest.mark.asyncio
-@patch("app.services.stocks.yf.Ticker", side_effect=mock_yfinance_ticker)
-async def test_get_stocks(mock_ticker, client):
+@patch("app.services.providers.yahoo_client", new_callable=mock_yahoo_client)
+async def test_get_stocks(mock_client, client):
     res = await client.get("/api/stocks")
     assert res.status_code == 200
     assert "data" in res.json()
 
 
 @pytest.mark.asyncio
-@patch("app.services.stocks.yf.Ticker", side_effect=mock_yfinance_ticker)
-async def test_get_candles(mock_ticker, client):
+@patch("app.services.providers.yahoo_client", new_callable=mock_yahoo_client)
+async def test_get_candles(mock_client, client):
     res = await client.get("/api/stocks/candles/RELIANCE.NS?interval=5m")
     assert res.status_code == 200
     assert "data" in res.json()
@@ -46,15 +68,47 @@ async def test_invalid_interval(client):
 
 
 @pytest.mark.asyncio
-@patch("app.services.stocks.yf.Ticker", side_effect=mock_yfinance_ticker)
-async def test_search(mock_ticker, client):
+@patch("app.services.providers.yahoo_client", new_callable=mock_yahoo_client)
+async def test_search(mock_client, client):
     res = await client.get("/api/stocks/search?q=reliance")
     assert res.status_code == 200
     assert "results" in res.json()
 
 
 @pytest.mark.asyncio
-@patch("app.services.stocks.yf.Ticker", side_effect=mock_yfinance_ticker)
-async def test_stock_info(mock_ticker, client):
+@patch("app.services.providers.yahoo_client", new_callable=mock_yahoo_client)
+async def test_stock_info(mock_client, client):
     res = await client.get("/api/stocks/RELIANCE.NS/info")
     assert res.status_code == 200
+    assert res.json()["name"] == "Test Stock"
+
+
+def mock_candles(n=10):
+    return [
+        {"Datetime": f"2024-01-{d + 1:02d} 00:00:00+05:30", "Open": 100.0 + d, "High": 101.0 + d,
+         "Low": 99.0 + d, "Close": 100.5 + d, "Volume": 1000}
+        for d in range(n)
+    ]
+
+
+@pytest.mark.asyncio
+@patch("app.routers.stocks.get_candlestick_data_cached", new_callable=AsyncMock, return_value=mock_candles())
+async def test_candles_cursor_pagination(mock_candles_fn, client):
+    res = await client.get("/api/stocks/candles/RELIANCE.NS?interval=1d&limit=4")
+    body = res.json()
+    assert [c["Close"] for c in body["data"]] == [106.5, 107.5, 108.5, 109.5]
+    assert body["page"]["next_after"] is None
+
+    older = await client.get(f"/api/stocks/candles/RELIANCE.NS?interval=1d&limit=4&before={body['page']['next_before']}")
+    assert [c["Close"] for c in older.json()["data"]] == [102.5, 103.5, 104.5, 105.5]
+
+
+@pytest.mark.asyncio
+@patch("app.routers.stocks.get_candlestick_data_cached", new_callable=AsyncMock, return_value=mock_candles())
+async def test_candles_ndjson_stream(mock_candles_fn, client):
+    res = await client.get("/api/stocks/candles/RELIANCE.NS?interval=1d&format=ndjson&indicators=sma_3")
+    assert res.headers["content-type"] == "application/x-ndjson"
+    frames = [json.loads(line) for line in res.text.splitlines()]
+    assert [f["type"] for f in frames] == ["meta", "candles", "indicator", "end"]
+    assert len(frames[1]["data"]) == 10
+    assert frames[2]["name"] == "sma_3"
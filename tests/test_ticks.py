@@ -0,0 +1,111 @@
+import pytest
+from datetime import datetime
+
+from app.services.ticks import IST, TickAggregator, session_bucket
+
+# 2024-01-02 09:15:00 IST
+OPEN = int(datetime(2024, 1, 2, 9, 15, tzinfo=IST).timestamp())
+
+
+def feed(key, ts, price, vtt):
+    return {"type": "live_feed", "feeds": {key: {"fullFeed": {"marketFF": {
+        "ltpc": {"ltp": price, "ltt": str(ts * 1000), "ltq": "5"},
+        "vtt": str(vtt),
+    }}}}}
+
+
+def test_session_buckets_align_to_the_open():
+    assert session_bucket(OPEN + 59 * 60, 3600) == OPEN  # 10:14 is in the 09:15 hour
+    assert session_bucket(OPEN + 61 * 60, 3600) == OPEN + 3600
+    assert session_bucket(OPEN + 7 * 60 + 30, 300) == OPEN + 300
+    assert session_bucket(OPEN - 60, 60) is None  # pre-open
+    assert session_bucket(OPEN + 375 * 60, 60) is None  # 15:30 close
+
+
+def test_ticks_build_ohlcv_bars_from_day_volume():
+    agg = TickAggregator({"1m": 60, "5m": 300}, capacity=8)
+    agg.ingest(feed("NSE_EQ|RELIANCE", OPEN + 5, 100.0, 1000))
+    agg.ingest(feed("NSE_EQ|RELIANCE", OPEN + 20, 103.0, 1040))
+    agg.ingest(feed("NSE_EQ|RELIANCE", OPEN + 50, 99.0, 1100))
+    agg.ingest(feed("NSE_EQ|RELIANCE", OPEN + 50, 99.0, 1100))  # same tick via a second user's stream
+    agg.ingest(feed("NSE_EQ|RELIANCE", OPEN + 70, 101.0, 1150))
+
+    bars = agg.bars("RELIANCE.NS", "1m")
+    assert bars[0] == {
+        "Datetime": "2024-01-02 09:15:00+05:30", "Open": 100.0, "High": 103.0, "Low": 99.0, "Close": 99.0,
+        "Volume": 105,  # first tick's own quantity, then day-volume deltas
+    }
+    assert bars[1]["Close"] == 101.0 and bars[1]["Volume"] == 50
+    assert agg.bars("RELIANCE.NS", "5m")[0]["Volume"] == 155
+
+
+def test_interleaved_streams_count_volume_once():
+    agg = TickAggregator({"1m": 60}, capacity=8)
+    fast, slow = [], []
+    for i, vtt in enumerate([1000, 1040, 1100]):
+        tick = feed("NSE_EQ|RELIANCE", OPEN + 5 + i * 20, 100.0 + i, vtt)
+        fast.append(tick)
+        slow.append(tick)
+    # The second user's stream lags a tick or two behind the first
+    for message in [fast[0], fast[1], slow[0], fast[2], slow[1], slow[2]]:
+        agg.ingest(message)
+    assert agg.bars("RELIANCE.NS", "1m")[0]["Volume"] == 105
+    assert agg.bars("RELIANCE.NS", "1m")[0]["Close"] == 102.0
+
+    # The next session starts the day total over
+    agg.ingest(feed("NSE_EQ|RELIANCE", OPEN + 86400 + 5, 104.0, 30))
+    agg.ingest(feed("NSE_EQ|RELIANCE", OPEN + 86400 + 10, 104.5, 45))
+    assert agg.bars("RELIANCE.NS", "1m")[-1]["Volume"] == 45
+
+
+def test_ring_keeps_latest_bars_and_merges_over_history():
+    agg = TickAggregator({"1m": 60}, capacity=3)
+    for minute in range(5):
+        agg.add_tick("TCS.NS", OPEN + minute * 60, 10.0 + minute)
+    live = agg.bars("TCS.NS", "1m")
+    assert [b["Close"] for b in live] == [12.0, 13.0, 14.0]
+
+    history = [
+        {"Datetime": f"2024-01-02 09:{15 + m}:00+05:30", "Open": 1.0, "High": 20.0, "Low": 0.5, "Close": 2.0, "Volume": 7}
+        for m in range(4)
+    ]
+    merged = agg.merge("TCS.NS", "1m", history)
+    assert [b["Close"] for b in merged] == [2.0, 2.0, 12.0, 13.0, 14.0]
+    # History knew the whole 09:17 bar; the live one only saw its last trade
+    assert merged[2] == {**live[0], "Open": 1.0, "High": 20.0, "Low": 0.5, "Volume": 7}
+
+
+@pytest.mark.asyncio
+async def test_listeners_get_latest_bar_per_subscription():
+    agg = TickAggregator({"1m": 60}, capacity=8)
+    listener = agg.listen()
+    listener.keys.add(("TCS.NS", "1m"))
+
+    agg.add_tick("TCS.NS", OPEN, 10.0)
+    agg.add_tick("TCS.NS", OPEN + 1, 11.0)
+    agg.add_tick("INFY.NS", OPEN, 50.0)
+
+    updates = await listener.get()
+    assert list(updates) == [("TCS.NS", "1m")]
+    assert updates[("TCS.NS", "1m")]["Close"] == 11.0
+
+
+def test_candle_socket_rejects_unknown_symbols_and_caps_subscriptions():
+    from unittest.mock import patch
+
+    from starlette.testclient import TestClient
+
+    from app.main import app
+    from app.services.ticks import tick_aggregator
+
+    with patch("app.main.LIVE_CANDLE_MAX_SUBSCRIPTIONS", 2), \
+         TestClient(app).websocket_connect("/ws/candles") as ws:
+        ws.send_json({"type": "subscribe", "symbol": "NOPE.NS", "interval": "5m"})
+        assert ws.receive_json()["message"] == "Unknown symbol: NOPE.NS"
+        ws.send_json({"type": "subscribe", "symbol": "TCS.NS", "interval": "1d"})
+        assert ws.receive_json()["message"] == "Invalid interval: 1d"
+        for symbol in ("TCS.NS", "INFY.NS", "TCS.NS", "WIPRO.NS"):
+            ws.send_json({"type": "subscribe", "symbol": symbol, "interval": "5m"})
+        assert "At most 2 subscriptions" in ws.receive_json()["message"]
+        (listener,) = tick_aggregator._listeners
+        assert listener.keys == {("TCS.NS", "5m"), ("INFY.NS", "5m")}
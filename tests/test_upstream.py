@@ -0,0 +1,82 @@
+import time
+import pytest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch, AsyncMock, MagicMock
+from sqlalchemy import update
+
+from app.exceptions import UpstreamUnavailable
+from app.models import StockCache
+from app.services.stock_store import QUOTE, store_put
+from app.services.stocks import fetch_all_stocks
+from app.services.upstream import CircuitBreaker, TokenBucket, Upstream, yahoo
+
+
+def make_upstream(threshold=3, reset_timeout=30, retries=2):
+    return Upstream(
+        "test",
+        "market_data",
+        TokenBucket(1000, 1000),
+        CircuitBreaker(threshold, reset_timeout),
+        retries=retries,
+        backoff_base=0.5,
+        backoff_max=8,
+    )
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_waits_once_burst_is_spent():
+    bucket = TokenBucket(rate=20, capacity=2)
+    start = time.monotonic()
+    for _ in range(3):
+        await bucket.acquire()
+    assert time.monotonic() - start >= 0.04
+
+
+@pytest.mark.asyncio
+async def test_retries_with_jittered_async_backoff():
+    upstream = make_upstream()
+    fn = MagicMock(side_effect=[RuntimeError("429"), RuntimeError("429"), "ok"])
+
+    with patch("app.services.upstream.asyncio.sleep", AsyncMock()) as mock_sleep:
+        assert await upstream.call(fn, "TCS.NS") == "ok"
+
+    assert fn.call_count == 3
+    delays = [call.args[0] for call in mock_sleep.await_args_list]
+    assert 0 <= delays[0] <= 0.5 and 0 <= delays[1] <= 1.0
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_breaker_opens_then_probes_after_reset():
+    upstream = make_upstream(threshold=2, reset_timeout=0.05, retries=0)
+    failing = MagicMock(side_effect=RuntimeError("503"))
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await upstream.call(failing)
+    assert upstream.breaker.state == CircuitBreaker.OPEN
+
+    # Open: fail fast without touching upstream
+    with pytest.raises(UpstreamUnavailable):
+        await upstream.call(failing)
+    assert failing.call_count == 2
+
+    time.sleep(0.06)
+    assert await upstream.call(MagicMock(return_value="ok")) == "ok"
+    assert upstream.breaker.state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.asyncio
+async def test_open_breaker_serves_last_known_quotes(stock_store_session):
+    await store_put("TCS.NS", QUOTE, {"symbol": "TCS.NS", "current_price": 3500})
+    async with stock_store_session() as db:
+        await db.execute(update(StockCache).values(fetched_at=datetime.now(timezone.utc) - timedelta(hours=1)))
+        await db.commit()
+
+    with patch.object(yahoo.breaker, "allow", return_value=False), \
+         patch("app.services.stocks.cache_get_json", AsyncMock(return_value=None)), \
+         patch("app.services.providers.yahoo_client.spark", AsyncMock()) as mock_spark:
+        data = await fetch_all_stocks(["TCS.NS"])
+
+    mock_spark.assert_not_called()
+    assert data == [{"symbol": "TCS.NS", "current_price": 3500}]
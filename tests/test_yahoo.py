@@ -0,0 +1,66 @@
+import pytest
+from unittest.mock import patch
+import httpx
+import numpy as np
+
+from app.services.stocks import fetch_quotes
+from app.services.yahoo import YahooClient, parse_chart
+
+
+def test_chart_parses_into_arrays_and_drops_empty_bars():
+    chart = parse_chart("TCS.NS", {
+        "meta": {"gmtoffset": 19800},
+        "timestamp": [1704080700, 1704081000, 1704081300],
+        "indicators": {"quote": [{
+            "open": [10.0, None, 12.0], "high": [11.0, None, 13.0], "low": [9.0, None, 11.0],
+            "close": [10.5, None, 12.5], "volume": [100, None, None],
+        }]},
+    })
+
+    assert chart.close.dtype == np.float64
+    assert chart.timestamps.tolist() == [1704080700, 1704081300]
+    assert chart.volume.tolist() == [100, 0]
+    assert chart.records()[0] == {
+        "Datetime": "2024-01-01 09:15:00+05:30", "Open": 10.0, "High": 11.0, "Low": 9.0, "Close": 10.5, "Volume": 100,
+    }
+
+
+@pytest.mark.asyncio
+async def test_quotes_are_fetched_in_spark_batches():
+    requests = []
+
+    def handler(request):
+        symbols = request.url.params["symbols"].split(",")
+        requests.append(symbols)
+        result = [
+            {"symbol": s, "response": [{"timestamp": [1, 2], "indicators": {"quote": [{"close": [100.0, 110.0]}]}}]}
+            for s in symbols if s != "GONE.NS"
+        ]
+        return httpx.Response(200, json={"spark": {"result": result, "error": None}})
+
+    symbols = [f"S{i}.NS" for i in range(24)] + ["GONE.NS"]
+    with patch("app.services.providers.yahoo_client", YahooClient(transport=httpx.MockTransport(handler))):
+        quotes = await fetch_quotes(symbols)
+
+    assert [len(batch) for batch in requests] == [20, 5]
+    assert len(quotes) == 24 and "GONE.NS" not in quotes
+    assert quotes["S0.NS"]["percent_change"] == 10.0
+
+
+@pytest.mark.asyncio
+async def test_info_refreshes_expired_crumb():
+    crumbs = iter(["old", "new"])
+
+    def handler(request):
+        if request.url.path == "/v1/test/getcrumb":
+            return httpx.Response(200, text=next(crumbs))
+        if request.url.path.startswith("/v10/finance/quoteSummary/"):
+            if request.url.params["crumb"] == "old":
+                return httpx.Response(401)
+            return httpx.Response(200, json={"quoteSummary": {"result": [{
+                "summaryDetail": {"trailingPE": {"raw": 28.4, "fmt": "28.40"}, "fiftyTwoWeekHigh": {}},
+            }]}})
+        return httpx.Response(404)
+
+    client = YahooClient(transport=httpx.MockTransport(handler))
+    assert await client.info("TCS.NS") == {"trailingPE": 28.4}